@@ -5,26 +5,56 @@ from __future__ import annotations
 from dataclasses import dataclass
 from datetime import datetime, timedelta
 import logging
+import time
 from typing import Any
 
-from aiohttp.client_exceptions import ClientConnectorError
-from aioschluter import (
-    ApiError,
-    InvalidSessionIdError,
-    InvalidUserPasswordError,
-    SchluterApi,
-)
+from aioschluter import InvalidSessionIdError, Thermostat
+from aioschluter.const import REGULATION_MODE_SCHEDULE
 import async_timeout
 
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import CONF_PASSWORD, CONF_USERNAME, Platform
-from homeassistant.core import HomeAssistant
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
 from homeassistant.core_config import Config
+from homeassistant.helpers.event import async_call_later
 from homeassistant.exceptions import ConfigEntryAuthFailed
-from homeassistant.helpers.aiohttp_client import async_get_clientsession
-from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
-
-from .const import DOMAIN
+from homeassistant.helpers.update_coordinator import (
+    DataUpdateCoordinator,
+    UpdateFailed,
+)
+from homeassistant.util import dt as dt_util
+
+from .api import SchluterClient
+from .commands import SchluterCommandStore
+from .const import (
+    CONF_FAST_DURATION,
+    CONF_FAST_INTERVAL,
+    CONF_IDLE_INTERVAL,
+    CONF_NORMAL_INTERVAL,
+    CONF_STALE_WINDOW,
+    DEFAULT_FAST_DURATION,
+    DEFAULT_FAST_INTERVAL,
+    DEFAULT_IDLE_INTERVAL,
+    DEFAULT_NORMAL_INTERVAL,
+    DEFAULT_STALE_WINDOW,
+    DOMAIN,
+    MAX_POLL_INTERVAL,
+    SCHEDULE_REFRESH_INTERVAL,
+    SCHEDULE_TRANSITION_DELAY,
+    SNAPSHOT_FIELDS,
+    UNCHANGED_NOTIFY_INTERVAL,
+)
+from .metrics import SchluterMetrics
+from .model import SchluterAccountSummary, SchluterThermostatView
+from .resilience import SchluterResilience, SchluterUnreachable
+from .runtime import SchluterRuntimeStats
+from .schedule import SchluterSchedule, parse_tz_offset
+from .scheduler import SchluterScheduler, async_get_scheduler
+from .services import async_setup_services
+from .session import SchluterSession, async_get_session_store
+from .snapshot import SchluterSnapshotStore
+from .statistics import SchluterStatisticsImporter
+from .write_queue import SchluterWriteQueue
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -32,6 +62,7 @@ PLATFORMS = [Platform.CLIMATE, Platform.SENSOR]
 
 
 async def async_setup(hass: HomeAssistant, config: Config) -> bool:
+    async_setup_services(hass)
     return True
 
 
@@ -39,11 +70,23 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     username: str = entry.data[CONF_USERNAME]
     password: str = entry.data[CONF_PASSWORD]
 
-    websession = async_get_clientsession(hass)
-    api = SchluterApi(websession)
+    scheduler = async_get_scheduler(hass)
+    api = SchluterClient(scheduler.async_get_clientsession(), entry.entry_id)
+    metrics = SchluterMetrics()
+    resilience = SchluterResilience(scheduler.rate_limit)
+    session = SchluterSession(hass, api, metrics, username, password)
 
-    coordinator = SchluterDataUpdateCoordinator(hass, api, username, password)
-    await coordinator.async_config_entry_first_refresh()
+    coordinator = SchluterDataUpdateCoordinator(
+        hass, entry, api, session, metrics, resilience, scheduler
+    )
+    await coordinator.commands.async_load()
+    await coordinator.runtime.async_load()
+    await coordinator.statistics.async_load()
+    # Start from the last known state and refresh it in the background, so
+    # a slow or unreachable cloud does not hold up the startup
+    restored = await coordinator.async_restore_snapshot()
+    if not restored:
+        await coordinator.async_config_entry_first_refresh()
 
     hass.data.setdefault(DOMAIN, {})[entry.entry_id] = SchluterData(
         api=api,
@@ -53,6 +96,15 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
     entry.async_on_unload(entry.add_update_listener(update_listener))
 
+    if restored:
+        entry.async_create_background_task(
+            hass, coordinator.async_refresh(), f"{DOMAIN} first refresh"
+        )
+    # Import the hours buffered while Home Assistant was stopped
+    entry.async_create_background_task(
+        hass, coordinator.statistics.async_import(), f"{DOMAIN} statistics import"
+    )
+
     return True
 
 
@@ -62,72 +114,617 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     return unload_ok
 
 
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    await async_get_session_store(hass).async_remove(entry.data[CONF_USERNAME])
+    await SchluterSnapshotStore(hass, entry.entry_id).async_remove()
+    await SchluterCommandStore(hass, entry.entry_id).async_remove_store()
+    await SchluterRuntimeStats(hass, entry.entry_id).async_remove()
+    await SchluterStatisticsImporter(hass, entry.entry_id).async_remove()
+
+
 async def update_listener(hass: HomeAssistant, entry: ConfigEntry) -> None:
     await hass.config_entries.async_reload(entry.entry_id)
 
 
-class SchluterDataUpdateCoordinator(DataUpdateCoordinator[dict[str, Any]]):
+class SchluterDataUpdateCoordinator(
+    DataUpdateCoordinator[dict[str, SchluterThermostatView]]
+):
     def __init__(
         self,
         hass: HomeAssistant,
-        api: SchluterApi,
-        username: str,
-        password: str,
+        entry: ConfigEntry,
+        api: SchluterClient,
+        session: SchluterSession,
+        metrics: SchluterMetrics,
+        resilience: SchluterResilience,
+        scheduler: SchluterScheduler | None = None,
     ) -> None:
-        self._username = username
-        self._password = password
         self._api = api
-        self._sessionid: str | None = None
+        self.session = session
+        self.metrics = metrics
+        self.resilience = resilience
+        self._scheduler = scheduler
+
+        options = entry.options
+        # Options saved before MAX_POLL_INTERVAL was enforced may exceed it
+        self._fast_interval = timedelta(
+            seconds=min(
+                options.get(CONF_FAST_INTERVAL, DEFAULT_FAST_INTERVAL),
+                MAX_POLL_INTERVAL,
+            )
+        )
+        self._normal_interval = timedelta(
+            seconds=min(
+                options.get(CONF_NORMAL_INTERVAL, DEFAULT_NORMAL_INTERVAL),
+                MAX_POLL_INTERVAL,
+            )
+        )
+        self._idle_interval = timedelta(
+            seconds=min(
+                options.get(CONF_IDLE_INTERVAL, DEFAULT_IDLE_INTERVAL),
+                MAX_POLL_INTERVAL,
+            )
+        )
+        self._fast_duration: float = options.get(
+            CONF_FAST_DURATION, DEFAULT_FAST_DURATION
+        )
+        self._stale_window: float = options.get(
+            CONF_STALE_WINDOW, DEFAULT_STALE_WINDOW
+        )
+        self._stale_expired = False
+        self._unsub_stale_expiry: CALLBACK_TYPE | None = None
+        self._fast_until = 0.0
+        # View and source fields of every thermostat at the last refresh
+        self._snapshot: dict[str, tuple[SchluterThermostatView, tuple[Any, ...]]] = {}
+        # Thermostats returned by the last fetch, the client returns the same
+        # object again while the payload of a thermostat does not change
+        self._sources: dict[str, Thermostat] = {}
+        self._skip_notification = False
+        self._last_notified = 0.0
+        self._refresh_listeners: list[CALLBACK_TYPE] = []
+        self._changed_fields: dict[str, frozenset[str]] | None = None
+        self._write_queues: dict[str, SchluterWriteQueue] = {}
+        self.commands = SchluterCommandStore(hass, entry.entry_id)
+        self._replaying_commands = False
+        self._snapshot_store = SchluterSnapshotStore(hass, entry.entry_id)
+        self.runtime = SchluterRuntimeStats(hass, entry.entry_id)
+        self.statistics = SchluterStatisticsImporter(hass, entry.entry_id)
 
         super().__init__(
             hass,
             _LOGGER,
+            config_entry=entry,
             name=DOMAIN,
-            update_interval=timedelta(minutes=1),
+            update_interval=self._normal_interval,
         )
 
-    async def _async_update_data(self) -> dict[str, Any]:
-        try:
-            async with async_timeout.timeout(10):
-                if self._sessionid is None:
-                    self._sessionid = await self._api.async_get_sessionid(
-                        self._username,
-                        self._password,
-                    )
+        if scheduler is not None:
+            scheduler.async_register(self)
+
+        # Entities notified and skipped by the most recent refresh
+        self.notified_entities = 0
+        self.skipped_entities = 0
+        # True while the data was restored from the snapshot or the latest
+        # refresh failed, i.e. the data was not confirmed by the cloud
+        self.is_stale = False
+        # When the data was fetched from the cloud
+        self.data_updated: datetime | None = None
+        # Totals of all thermostats, updated with the data
+        self.summary = SchluterAccountSummary({})
+        # Weekly schedules and the next set-point change of the thermostats
+        # following them
+        self.schedules: dict[str, SchluterSchedule] = {}
+        self.transitions: dict[str, tuple[datetime, float]] = {}
+        self._schedules_updated: float | None = None
+        self._next_transition: datetime | None = None
+        self._unsub_transition: CALLBACK_TYPE | None = None
+
+    @property
+    def current_interval(self) -> timedelta | None:
+        """Return the polling interval currently in use."""
+        return self.update_interval
+
+    async def async_restore_snapshot(self) -> bool:
+        """Use the thermostats saved by the last successful refresh as data.
+
+        Returns False when there is no snapshot to start from.
+        """
+        if (snapshot := await self._snapshot_store.async_load()) is None:
+            return False
+        await self.session.async_load()
+        thermostats, self.data_updated = snapshot
+        self.data = {
+            serial_number: SchluterThermostatView(thermostat)
+            for serial_number, thermostat in thermostats.items()
+        }
+        self.summary = SchluterAccountSummary(self.data)
+        self.is_stale = True
+        _LOGGER.debug(
+            "Restored %s thermostats from %s", len(self.data), self.data_updated
+        )
+        return True
+
+    @property
+    def snapshot_age(self) -> float | None:
+        """Return the seconds since the data was fetched from the cloud."""
+        if self.data_updated is None:
+            return None
+        return (dt_util.utcnow() - self.data_updated).total_seconds()
+
+    @property
+    def data_available(self) -> bool:
+        """Return True while entities may serve the data.
+
+        After a failed refresh the last good data is served until it is
+        older than the stale window.
+        """
+        if self.last_update_success:
+            return True
+        age = self.snapshot_age
+        return not self._stale_expired and age is not None and age < self._stale_window
+
+    @callback
+    def async_note_write(self) -> None:
+        """Poll fast for a short burst after a thermostat was changed."""
+        self._fast_until = time.monotonic() + self._fast_duration
+        self.update_interval = self._fast_interval
+
+    @callback
+    def async_get_write_queue(self, serial_number: str) -> SchluterWriteQueue:
+        """Return the write queue of a thermostat."""
+        if (queue := self._write_queues.get(serial_number)) is None:
+            queue = self._write_queues[serial_number] = SchluterWriteQueue(
+                self.hass, self._api, self, serial_number
+            )
+        return queue
+
+    async def async_shutdown(self) -> None:
+        """Cancel pending writes together with the scheduled refresh."""
+        await super().async_shutdown()
+        self._async_cancel_stale_expiry()
+        self._async_cancel_transition_refresh()
+        await self.runtime.async_save()
+        await self.statistics.async_save()
+        self.session.async_shutdown()
+        for queue in self._write_queues.values():
+            queue.async_shutdown()
+        if self._scheduler is not None:
+            await self._scheduler.async_unregister(self)
+
+    @callback
+    def _schedule_refresh(self) -> None:
+        """Schedule the next refresh on the slot of this account."""
+        if self._scheduler is None or self.update_interval is None:
+            super()._schedule_refresh()
+            return
+        if self.config_entry.pref_disable_polling:
+            return
+        self._async_unsub_refresh()
+        interval = self.update_interval.total_seconds()
+        self._unsub_refresh = async_call_later(
+            self.hass,
+            interval
+            + self._scheduler.phase_delay(self, interval, self.hass.loop.time()),
+            self._async_slot_refresh,
+        )
 
-                expiration_timestamp = (
-                    self._api.sessionid_timestamp + timedelta(days=1)
+    @callback
+    def _async_slot_refresh(self, _now: datetime) -> None:
+        self.config_entry.async_create_background_task(
+            self.hass,
+            self._handle_refresh_interval(),
+            f"{DOMAIN} refresh",
+            eager_start=True,
+        )
+
+    @callback
+    def async_add_refresh_listener(
+        self, refresh_callback: CALLBACK_TYPE
+    ) -> CALLBACK_TYPE:
+        """Call back after every refresh, even one that left the entities alone."""
+        self._refresh_listeners.append(refresh_callback)
+
+        @callback
+        def _remove() -> None:
+            self._refresh_listeners.remove(refresh_callback)
+
+        return _remove
+
+    @callback
+    def _async_refresh_finished(self) -> None:
+        for refresh_callback in list(self._refresh_listeners):
+            refresh_callback()
+
+    @callback
+    def async_update_listeners(self) -> None:
+        """Notify only the entities whose source fields changed.
+
+        Every listener is notified when no diff is available, e.g. after the
+        first refresh, a failed refresh or a manual data update. No listener
+        is notified after a refresh that returned the very same thermostats.
+        """
+        if self._skip_notification:
+            self._skip_notification = False
+            self._changed_fields = None
+            self.notified_entities = 0
+            self.skipped_entities = len(self._listeners)
+            return
+        self._last_notified = time.monotonic()
+        with self.metrics.phase("entities"):
+            self._async_update_changed_listeners()
+
+    @callback
+    def _async_update_changed_listeners(self) -> None:
+        changed_fields = self._changed_fields
+        self._changed_fields = None
+        if changed_fields is None or not self.last_update_success:
+            super().async_update_listeners()
+            return
+
+        notified = skipped = 0
+        for update_callback, context in list(self._listeners.values()):
+            if context is not None:
+                thermostat_id, source_fields = context
+                if source_fields is not None and not (
+                    source_fields & changed_fields.get(thermostat_id, frozenset())
+                ):
+                    skipped += 1
+                    continue
+            update_callback()
+            notified += 1
+
+        self.notified_entities = notified
+        self.skipped_entities = skipped
+        _LOGGER.debug(
+            "Updated %s entities, skipped %s unchanged entities", notified, skipped
+        )
+
+    def _diff_snapshot(
+        self, data: dict[str, SchluterThermostatView]
+    ) -> dict[str, frozenset[str]]:
+        """Return the fields that changed per thermostat since the last refresh.
+
+        A view kept from the last refresh is unchanged and not compared.
+        """
+        snapshot: dict[str, tuple[SchluterThermostatView, tuple[Any, ...]]] = {}
+        changed_fields: dict[str, frozenset[str]] = {}
+        for thermostat_id, thermostat in data.items():
+            previous = self._snapshot.get(thermostat_id)
+            if previous is not None and previous[0] is thermostat:
+                snapshot[thermostat_id] = previous
+                continue
+            current = tuple(getattr(thermostat, field) for field in SNAPSHOT_FIELDS)
+            snapshot[thermostat_id] = (thermostat, current)
+            if previous is None:
+                changed_fields[thermostat_id] = frozenset(SNAPSHOT_FIELDS)
+            elif previous[1] != current:
+                changed_fields[thermostat_id] = frozenset(
+                    field
+                    for field, old, new in zip(SNAPSHOT_FIELDS, previous[1], current)
+                    if old != new
                 )
-                if expiration_timestamp <= datetime.now():
-                    self._sessionid = await self._api.async_get_sessionid(
-                        self._username,
-                        self._password,
-                    )
+        for thermostat_id in self._snapshot.keys() - snapshot.keys():
+            changed_fields[thermostat_id] = frozenset(SNAPSHOT_FIELDS)
+        self._snapshot = snapshot
+        return changed_fields
+
+    def _next_interval(
+        self, data: dict[str, SchluterThermostatView], unchanged: bool
+    ) -> timedelta:
+        """Pick the polling interval based on the latest thermostat data."""
+        if time.monotonic() < self._fast_until:
+            return self._fast_interval
+        if any(thermostat.is_heating for thermostat in data.values()):
+            return self._normal_interval
+        if unchanged:
+            return self._idle_interval
+        return self._normal_interval
+
+    async def _async_update_data(self) -> dict[str, SchluterThermostatView]:
+        self.metrics.start_poll()
+        try:
+            thermostats = await self._async_fetch_thermostats()
+        except Exception as err:
+            self.metrics.finish_poll(type(err).__name__)
+            # Back off instead of polling a failing cloud at the usual pace
+            self.update_interval = timedelta(seconds=self.resilience.retry_delay())
+            self.is_stale = True
+            self._async_schedule_stale_expiry()
+            raise
+        self.metrics.finish_poll("ok")
+        data, unchanged = self._async_build_views(thermostats)
+        # Entities keep their state while the very same thermostats come back,
+        # they are only notified now and then for the energy sensors
+        self._skip_notification = (
+            unchanged
+            and self.last_update_success
+            and not self.is_stale
+            and time.monotonic() - self._last_notified < UNCHANGED_NOTIFY_INTERVAL
+        )
+
+        self._async_cancel_stale_expiry()
+        self._stale_expired = False
+        self.is_stale = False
+        self.data_updated = dt_util.utcnow()
+        if not unchanged:
+            self.summary = SchluterAccountSummary(data)
+        self.runtime.async_add(data, self.data_updated)
+        self.statistics.async_add(data, self.data_updated)
+        if self.statistics.has_completed_hours(self.data_updated):
+            self.config_entry.async_create_background_task(
+                self.hass, self.statistics.async_import(), f"{DOMAIN} statistics import"
+            )
+        changed_fields = {} if unchanged else self._diff_snapshot(data)
+        # Saved even without changes to keep the time of the data current
+        self._snapshot_store.async_delay_save(self._api.payloads, self.data_updated)
+
+        interval = self._next_interval(data, not changed_fields)
+        if interval != self.update_interval:
+            _LOGGER.debug("Changing polling interval to %s", interval)
+            self.update_interval = interval
+
+        # The next set-point of a schedule moves on without any change of the
+        # thermostat data, the climate entity shows it as an attribute
+        for serial_number in self._async_update_transitions(data):
+            changed_fields[serial_number] = changed_fields.get(
+                serial_number, frozenset()
+            ) | {"schedule"}
+        if changed_fields:
+            self._skip_notification = False
+        # Without a successful previous refresh every entity has to be updated
+        self._changed_fields = changed_fields if self.last_update_success else None
+
+        if self.commands and not self._replaying_commands:
+            self.config_entry.async_create_background_task(
+                self.hass,
+                self._async_replay_commands(data),
+                f"{DOMAIN} queued commands",
+            )
+        if self._schedules_due(data):
+            self.config_entry.async_create_background_task(
+                self.hass, self._async_update_schedules(data), f"{DOMAIN} schedules"
+            )
+        return data
+
+    @callback
+    def _async_build_views(
+        self, thermostats: dict[str, Thermostat]
+    ) -> tuple[dict[str, SchluterThermostatView], bool]:
+        """Return the views of a fetch and whether all of them are unchanged.
+
+        The view of a thermostat the client returned as the same object is
+        kept. When every view is kept the previous data is returned as is.
+        """
+        previous = self.data or {}
+        data: dict[str, SchluterThermostatView] = {}
+        reused = 0
+        for serial_number, thermostat in thermostats.items():
+            if (
+                thermostat is self._sources.get(serial_number)
+                and (view := previous.get(serial_number)) is not None
+            ):
+                reused += 1
+            else:
+                view = SchluterThermostatView(thermostat)
+            data[serial_number] = view
+        self._sources = thermostats
+        unchanged = bool(data) and reused == len(data) == len(previous)
+        self.metrics.record_fingerprints(unchanged, reused, len(data))
+        return (previous if unchanged else data), unchanged
+
+    async def _async_replay_commands(
+        self, data: dict[str, SchluterThermostatView]
+    ) -> None:
+        """Write the commands queued while the cloud was unreachable.
 
-                return await self._api.async_get_current_thermostats(self._sessionid)
+        Commands of thermostats the account no longer has and commands the
+        cloud rejects are dropped, as retrying them cannot succeed.
+        """
+        self._replaying_commands = True
+        replayed = 0
+        try:
+            for serial_number, command in self.commands.oldest_first():
+                if self.commands.get(serial_number) is not command:
+                    # Written or replaced by a newer change during the replay
+                    continue
+                if serial_number not in data:
+                    _LOGGER.warning(
+                        "Dropping queued change to unknown thermostat %s",
+                        serial_number,
+                    )
+                    await self.commands.async_remove(serial_number, command)
+                    continue
+                try:
+                    await self.async_get_write_queue(
+                        serial_number
+                    ).async_write_queued(command)
+                except SchluterUnreachable as err:
+                    _LOGGER.debug("Stopped writing queued commands: %s", err)
+                    break
+                except UpdateFailed as err:
+                    _LOGGER.warning(
+                        "Dropping queued change to thermostat %s rejected by the "
+                        "Schluter cloud: %s",
+                        serial_number,
+                        err,
+                    )
+                    await self.commands.async_remove(serial_number, command)
+                    continue
+                except ConfigEntryAuthFailed:
+                    # The next refresh starts the reauthentication
+                    break
+                replayed += 1
+        finally:
+            self._replaying_commands = False
+        if replayed:
+            _LOGGER.info("Wrote %s queued thermostat commands", replayed)
+            self.async_note_write()
+            await self.async_request_refresh()
+
+    def _schedules_due(self, data: dict[str, SchluterThermostatView]) -> bool:
+        if self._schedules_updated is not None and (
+            time.monotonic() - self._schedules_updated < SCHEDULE_REFRESH_INTERVAL
+        ):
+            return False
+        return any(
+            thermostat.regulation_mode == REGULATION_MODE_SCHEDULE
+            for thermostat in data.values()
+        )
 
-        except InvalidSessionIdError:
+    async def _async_update_schedules(
+        self, data: dict[str, SchluterThermostatView]
+    ) -> None:
+        """Fetch the schedules of the thermostats following one.
+
+        Schedules are a best effort, a thermostat whose schedule cannot be
+        fetched is refreshed at the usual pace only. The calls count towards
+        the circuit breaker like any other and are skipped while it is open.
+        """
+        if self.resilience.is_open:
+            # Fetched by the next refresh once the cloud is reachable again
+            return
+        self._schedules_updated = time.monotonic()
+        for serial_number, thermostat in data.items():
+            if thermostat.regulation_mode != REGULATION_MODE_SCHEDULE:
+                continue
             try:
-                self._sessionid = await self._api.async_get_sessionid(
-                    self._username,
-                    self._password,
+                async with self.resilience.async_guard(), async_timeout.timeout(10):
+                    sessionid = await self.session.async_get_sessionid()
+                    try:
+                        with self.metrics.api_call("schedule"):
+                            payload = await self._api.async_get_schedule(
+                                sessionid, serial_number
+                            )
+                    except InvalidSessionIdError:
+                        sessionid = await self.session.async_renew(sessionid)
+                        with self.metrics.api_call("schedule"):
+                            payload = await self._api.async_get_schedule(
+                                sessionid, serial_number
+                            )
+            except SchluterUnreachable as err:
+                _LOGGER.debug("Could not fetch the schedules: %s", err)
+                break
+            except (ConfigEntryAuthFailed, UpdateFailed) as err:
+                _LOGGER.debug(
+                    "Could not fetch the schedule of %s: %s", serial_number, err
                 )
-                return await self._api.async_get_current_thermostats(self._sessionid)
+                continue
+            try:
+                schedule = SchluterSchedule(payload) if payload else None
+            except (KeyError, TypeError, ValueError):
+                _LOGGER.debug("Ignoring invalid schedule of %s", serial_number)
+                schedule = None
+            if schedule:
+                self.schedules[serial_number] = schedule
+            else:
+                self.schedules.pop(serial_number, None)
+
+        if self.data is None:
+            return
+        if changed := self._async_update_transitions(self.data):
+            self._changed_fields = dict.fromkeys(changed, frozenset({"schedule"}))
+            self.async_update_listeners()
+
+    @callback
+    def _async_update_transitions(
+        self, data: dict[str, SchluterThermostatView]
+    ) -> set[str]:
+        """Refresh right after the next set-point change of a schedule.
+
+        Returns the thermostats whose next set-point change moved.
+        """
+        now = dt_util.utcnow()
+        transitions: dict[str, tuple[datetime, float]] = {}
+        for serial_number, thermostat in data.items():
+            if (
+                thermostat.regulation_mode != REGULATION_MODE_SCHEDULE
+                or (schedule := self.schedules.get(serial_number)) is None
+            ):
+                continue
+            # The clock times of a schedule are those of the thermostat
+            time_zone = parse_tz_offset(
+                self._api.payloads.get(serial_number, {}).get("TZOffset")
+            )
+            if (transition := schedule.next_transition(now, time_zone)) is not None:
+                transitions[serial_number] = transition
+        changed = {
+            serial_number
+            for serial_number in transitions.keys() | self.transitions.keys()
+            if transitions.get(serial_number) != self.transitions.get(serial_number)
+        }
+        self.transitions = transitions
+
+        next_transition = min((when for when, _ in transitions.values()), default=None)
+        if next_transition == self._next_transition:
+            return changed
+        self._async_cancel_transition_refresh()
+        self._next_transition = next_transition
+        if next_transition is not None:
+            self._unsub_transition = async_call_later(
+                self.hass,
+                (next_transition - now).total_seconds() + SCHEDULE_TRANSITION_DELAY,
+                self._async_transition_refresh,
+            )
+        return changed
+
+    async def _async_transition_refresh(self, _now: datetime) -> None:
+        self._unsub_transition = None
+        self._next_transition = None
+        _LOGGER.debug("Refreshing after a scheduled set-point change")
+        await self.async_refresh()
+
+    @callback
+    def _async_cancel_transition_refresh(self) -> None:
+        if self._unsub_transition is not None:
+            self._unsub_transition()
+            self._unsub_transition = None
+
+    @callback
+    def _async_schedule_stale_expiry(self) -> None:
+        if self._unsub_stale_expiry is not None or (age := self.snapshot_age) is None:
+            return
+        self._unsub_stale_expiry = async_call_later(
+            self.hass, max(self._stale_window - age, 0), self._async_stale_expired
+        )
 
-            except InvalidUserPasswordError as err:
-                raise ConfigEntryAuthFailed from err
+    @callback
+    def _async_cancel_stale_expiry(self) -> None:
+        if self._unsub_stale_expiry is not None:
+            self._unsub_stale_expiry()
+            self._unsub_stale_expiry = None
+
+    @callback
+    def _async_stale_expired(self, _now: datetime) -> None:
+        self._unsub_stale_expiry = None
+        self._stale_expired = True
+        _LOGGER.warning(
+            "No data from the Schluter cloud for %s seconds, "
+            "marking thermostats unavailable",
+            self._stale_window,
+        )
+        self._changed_fields = None
+        self.async_update_listeners()
 
-            except (ApiError, ClientConnectorError) as err:
-                raise UpdateFailed(err) from err
+    async def _async_get_current_thermostats(self, sessionid: str) -> dict[str, Any]:
+        with self.metrics.phase("fetch"), self.metrics.api_call("thermostats"):
+            return await self._api.async_get_current_thermostats(sessionid)
 
-        except InvalidUserPasswordError as err:
-            raise ConfigEntryAuthFailed from err
+    async def _async_setup(self) -> None:
+        await self.session.async_load()
 
-        except (ApiError, ClientConnectorError) as err:
-            raise UpdateFailed(err) from err
+    async def _async_fetch_thermostats(self) -> dict[str, Any]:
+        async with self.resilience.async_guard(), async_timeout.timeout(10):
+            with self.metrics.phase("session"):
+                sessionid = await self.session.async_get_sessionid()
+            try:
+                return await self._async_get_current_thermostats(sessionid)
+            except InvalidSessionIdError:
+                with self.metrics.phase("session"):
+                    sessionid = await self.session.async_renew(sessionid)
+                return await self._async_get_current_thermostats(sessionid)
 
 
 @dataclass
 class SchluterData:
-    api: SchluterApi
+    api: SchluterClient
     coordinator: SchluterDataUpdateCoordinator
\ No newline at end of file
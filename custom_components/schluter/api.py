@@ -0,0 +1,148 @@
+"""Schluter API client used by the integration."""
+from __future__ import annotations
+
+from collections.abc import Awaitable, Callable
+from http import HTTPStatus
+import time
+from typing import Any, TypeVar
+
+import aioschluter
+from aioschluter import ApiError, InvalidSessionIdError, SchluterApi, Thermostat
+
+from .trace import SchluterTraceRecorder, redact_payload
+
+_T = TypeVar("_T")
+
+
+class SchluterClient(SchluterApi):
+    """SchluterApi that keeps the raw payloads of the last thermostat fetch.
+
+    The payloads can be turned back into Thermostat objects, which is how
+    the last known state is persisted across restarts. A thermostat whose
+    payload did not change since the previous fetch is returned as the same
+    object. While a recorder is attached every call is added to its trace.
+    """
+
+    def __init__(self, session, account: str = "") -> None:
+        """Initialize the client."""
+        super().__init__(session)
+        self.account = account
+        self.payloads: dict[str, dict[str, Any]] = {}
+        self._thermostats: dict[str, Thermostat] = {}
+        self.recorder: SchluterTraceRecorder | None = None
+
+    async def async_get_sessionid(self, username, password) -> str | None:
+        """Log in, the session ID is not recorded."""
+        return await self._async_call(
+            "login", super().async_get_sessionid, (username, password)
+        )
+
+    async def async_get_current_thermostats(self, sessionid) -> dict[str, Any]:
+        """Get the current state of all thermostats."""
+        return await self._async_call(
+            "thermostats",
+            super().async_get_current_thermostats,
+            (sessionid,),
+            trace_result=lambda thermostats: [
+                redact_payload(payload) for payload in self.payloads.values()
+            ],
+        )
+
+    async def async_set_temperature(self, sessionid, serialnumber, temperature) -> bool:
+        """Set the target temperature of a thermostat."""
+        return await self._async_call(
+            "set_temperature",
+            super().async_set_temperature,
+            (sessionid, serialnumber, temperature),
+            {"serial_number": serialnumber, "temperature": temperature},
+            lambda success: success,
+        )
+
+    async def async_set_regulation_mode(self, sessionid, serialnumber, mode) -> bool:
+        """Set the regulation mode of a thermostat."""
+        return await self._async_call(
+            "set_regulation_mode",
+            super().async_set_regulation_mode,
+            (sessionid, serialnumber, mode),
+            {"serial_number": serialnumber, "regulation_mode": mode},
+            lambda success: success,
+        )
+
+    async def async_get_schedule(
+        self, sessionid, serialnumber
+    ) -> dict[str, Any] | None:
+        """Get the weekly schedule of a thermostat, None if it reports none."""
+        return await self._async_call(
+            "schedule",
+            self._async_get_schedule,
+            (sessionid, serialnumber),
+            {"serial_number": serialnumber},
+            lambda schedule: schedule,
+        )
+
+    async def _async_get_schedule(
+        self, sessionid: str, serialnumber: str
+    ) -> dict[str, Any] | None:
+        # aioschluter has no call for the schedule, it is part of the state
+        # of a single thermostat
+        params = {"sessionId": sessionid, "serialnumber": serialnumber}
+        async with self._session.get(
+            aioschluter.API_SET_THERMOSTAT_URL, params=params
+        ) as resp:
+            if resp.status == HTTPStatus.UNAUTHORIZED:
+                raise InvalidSessionIdError(
+                    "An invalid or expired sessionid was supplied"
+                )
+            if resp.status != HTTPStatus.OK:
+                raise ApiError(f"Invalid Response: {resp.status}")
+            data = await resp.json()
+        return data.get("Schedule")
+
+    def _extract_thermostats_from_data(self, data: dict[str, Any]) -> dict[str, Any]:
+        payloads = {
+            thermostat["SerialNumber"]: thermostat
+            for group in data["Groups"]
+            for thermostat in group["Thermostats"]
+        }
+        # The previous payload is the fingerprint of a thermostat, comparing
+        # it costs less than parsing the payload again
+        thermostats: dict[str, Thermostat] = {}
+        for serial_number, payload in payloads.items():
+            if (
+                thermostat := self._thermostats.get(serial_number)
+            ) is None or self.payloads.get(serial_number) != payload:
+                thermostat = Thermostat(payload)
+            thermostats[serial_number] = thermostat
+        self.payloads = payloads
+        self._thermostats = thermostats
+        return thermostats
+
+    async def _async_call(
+        self,
+        call: str,
+        method: Callable[..., Awaitable[_T]],
+        args: tuple[Any, ...],
+        request: dict[str, Any] | None = None,
+        trace_result: Callable[[_T], Any] | None = None,
+    ) -> _T:
+        """Call the cloud, recording the call while a recorder is attached.
+
+        Only the request and the result passed through ``trace_result`` end
+        up in the trace, never the arguments themselves.
+        """
+        if (recorder := self.recorder) is None:
+            return await method(*args)
+        started = time.monotonic()
+        try:
+            result = await method(*args)
+        except Exception as err:
+            recorder.record(self.account, call, started, request, error=err)
+            raise
+        recorder.record(
+            self.account,
+            call,
+            started,
+            request,
+            trace_result(result) if trace_result is not None else None,
+        )
+        return result
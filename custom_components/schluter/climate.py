@@ -1,16 +1,12 @@
 """Support for Schluter DITRA-HEAT-E-WIFI Thermostats."""
 from __future__ import annotations
 
+from collections.abc import Awaitable
+from datetime import datetime
 import logging
+from typing import Any
 
-from aiohttp.client_exceptions import ClientConnectorError
-from aioschluter import (
-    ApiError,
-    InvalidSessionIdError,
-    InvalidUserPasswordError,
-    SchluterApi,
-    Thermostat,
-)
+from aioschluter import SchluterApi
 from aioschluter.const import (
     REGULATION_MODE_AWAY,
     REGULATION_MODE_MANUAL,
@@ -26,16 +22,13 @@ from homeassistant.components.climate.const import (
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import ATTR_TEMPERATURE
 from homeassistant.const import UnitOfTemperature
-from homeassistant.core import HomeAssistant
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
 from homeassistant.exceptions import ConfigEntryAuthFailed
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
-from homeassistant.helpers.update_coordinator import (
-    DataUpdateCoordinator,
-    UpdateFailed,
-)
+from homeassistant.helpers.event import async_call_later
 
-from . import SchluterData
-from .const import DOMAIN
+from . import SchluterData, SchluterDataUpdateCoordinator
+from .const import DOMAIN, OPTIMISTIC_TIMEOUT
 from .entity import SchluterEntity
 
 _LOGGER = logging.getLogger(__name__)
@@ -64,13 +57,25 @@ class SchluterThermostat(SchluterEntity, ClimateEntity):
         | ClimateEntityFeature.TURN_OFF
     )
     _enable_turn_on_off_backwards_compatibility: bool = False
+    _source_fields = frozenset(
+        {
+            "temperature",
+            "set_point_temp",
+            "regulation_mode",
+            "is_heating",
+            "is_online",
+            "min_temp",
+            "max_temp",
+            "schedule",
+        }
+    )
 
-    coordinator: DataUpdateCoordinator[dict[str, dict[str, Thermostat]]]
+    coordinator: SchluterDataUpdateCoordinator
 
     def __init__(
         self,
         api: SchluterApi,
-        coordinator: DataUpdateCoordinator[dict[str, dict[str, Thermostat]]],
+        coordinator: SchluterDataUpdateCoordinator,
         thermostat_id: str,
     ) -> None:
         """Initialize Schluter Thermostat."""
@@ -79,35 +84,16 @@ class SchluterThermostat(SchluterEntity, ClimateEntity):
         self._name = coordinator.data[thermostat_id].name
         self._attr_unique_id = thermostat_id
         self._serial_number = coordinator.data[thermostat_id].serial_number
+        self._optimistic_hvac_mode: HVACMode | None = None
+        self._optimistic_target_temperature: float | None = None
+        self._unsub_optimistic: CALLBACK_TYPE | None = None
         ClimateEntity.__init__(self)
 
-    @property
-    def device_info(self):
-        """Information about this entity/device."""
-        return {
-            "identifiers": {(DOMAIN, self._attr_unique_id)},
-            # If desired, the name for the device could be different to the entity
-            "name": self._name,
-            "sw_version": self.coordinator.data[self._attr_unique_id].sw_version,
-            "model": "DITRA-HEAT-E-Wifi",
-            "manufacturer": "Schluter",
-        }
-
     @property
     def hvac_mode(self):
-        if (
-            self.coordinator.data[self._attr_unique_id].regulation_mode
-            == REGULATION_MODE_SCHEDULE
-        ):
-            self._attr_hvac_mode = HVACMode.AUTO
-        elif (
-            self.coordinator.data[self._attr_unique_id].regulation_mode
-            == REGULATION_MODE_MANUAL
-        ):
-            self._attr_hvac_mode = HVACMode.HEAT
-        else:
-            self._attr_hvac_mode = HVACMode.OFF
-        return self._attr_hvac_mode
+        if self._optimistic_hvac_mode is not None:
+            return self._optimistic_hvac_mode
+        return self._thermostat.hvac_mode
 
     @property
     def unique_id(self):
@@ -127,36 +113,62 @@ class SchluterThermostat(SchluterEntity, ClimateEntity):
     @property
     def current_temperature(self):
         """Return the current temperature."""
-        return self.coordinator.data[self._attr_unique_id].temperature
+        return self._thermostat.temperature
 
     @property
     def hvac_action(self) -> HVACAction:
         """Return current operation. Can only be heating or idle."""
-        if self.coordinator.data[self._attr_unique_id].is_heating:
-            return HVACAction.HEATING
-        return HVACAction.IDLE
+        return self._thermostat.hvac_action
 
     @property
     def target_temperature(self):
         """Return the temperature we try to reach."""
-        return self.coordinator.data[self._attr_unique_id].set_point_temp
+        if self._optimistic_target_temperature is not None:
+            return self._optimistic_target_temperature
+        return self._thermostat.set_point_temp
 
     @property
     def min_temp(self):
         """Identify min_temp in Schluter API."""
-        return self.coordinator.data[self._attr_unique_id].min_temp
+        return self._thermostat.min_temp
 
     @property
     def max_temp(self):
         """Identify max_temp in Schluter API."""
-        return self.coordinator.data[self._attr_unique_id].max_temp
+        return self._thermostat.max_temp
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any] | None:
+        """Add the next set-point change of the schedule."""
+        attributes = super().extra_state_attributes
+        if (
+            transition := self.coordinator.transitions.get(self._thermostat_id)
+        ) is None:
+            return attributes
+        when, temperature = transition
+        return {
+            **(attributes or {}),
+            "next_set_point": temperature,
+            "next_transition": when.isoformat(),
+        }
+
+    async def async_will_remove_from_hass(self) -> None:
+        """Stop waiting for a pending confirmation."""
+        await super().async_will_remove_from_hass()
+        self._cancel_optimistic_timeout()
+
+    @callback
+    def _update_thermostat(self) -> None:
+        """Drop optimistic values once the cloud reports them."""
+        super()._update_thermostat()
+        self._async_confirm_optimistic_state()
 
     async def async_set_hvac_mode(self, hvac_mode: HVACMode) -> None:
         """Set the hvac mode"""
-        if hvac_mode == self._attr_hvac_mode:
+        if hvac_mode == self.hvac_mode:
             return
 
-        serial_number = self.coordinator.data[self._attr_unique_id].serial_number
+        serial_number = self._serial_number
         _LOGGER.debug(
             "Setting HVAC mode of thermostat: %s to: %s", self._name, hvac_mode
         )
@@ -168,37 +180,108 @@ class SchluterThermostat(SchluterEntity, ClimateEntity):
         else:
             regulation_mode = REGULATION_MODE_AWAY
 
-        try:
-            await self._api.async_set_regulation_mode(
-                self._api.sessionid, serial_number, regulation_mode
-            )
-            # self._attr_hvac_mode = hvac_mode
-            await self.coordinator.async_request_refresh()
-        except (
-            InvalidUserPasswordError,
-            InvalidSessionIdError,
-        ) as err:
-            raise ConfigEntryAuthFailed from err
-        except (ApiError, ClientConnectorError) as err:
-            raise UpdateFailed(err) from err
+        self._optimistic_hvac_mode = hvac_mode
+        self._async_write_optimistic_state(
+            self.coordinator.async_get_write_queue(
+                serial_number
+            ).async_set_regulation_mode(regulation_mode)
+        )
 
     async def async_set_temperature(self, **kwargs):
         """Set new target temperature."""
         target_temp = kwargs.get(ATTR_TEMPERATURE)
-        serial_number = self.coordinator.data[self._attr_unique_id].serial_number
+        serial_number = self._serial_number
         _LOGGER.debug("Setting thermostat temperature: %s", target_temp)
 
+        if target_temp is not None:
+            # Setting a temperature switches the thermostat to manual
+            self._optimistic_target_temperature = target_temp
+            self._optimistic_hvac_mode = HVACMode.HEAT
+            self._async_write_optimistic_state(
+                self.coordinator.async_get_write_queue(
+                    serial_number
+                ).async_set_temperature(target_temp)
+            )
+
+    @callback
+    def _async_write_optimistic_state(self, write: Awaitable[None]) -> None:
+        """Show the requested state now and write it in the background."""
+        self._cancel_optimistic_timeout()
+        self._async_start_optimistic_timeout()
+        self.async_write_ha_state()
+        self.hass.async_create_background_task(
+            self._async_write(write),
+            name=f"{DOMAIN} write {self._serial_number}",
+        )
+
+    async def _async_write(self, write: Awaitable[None]) -> None:
         try:
-            if target_temp is not None:
-                await self._api.async_set_temperature(
-                    self._api.sessionid, serial_number, target_temp
-                )
-                # self._attr_hvac_mode = HVACMode.HEAT
-                await self.coordinator.async_request_refresh()
-        except (
-            InvalidUserPasswordError,
-            InvalidSessionIdError,
-        ) as err:
-            raise ConfigEntryAuthFailed from err
-        except (ApiError, ClientConnectorError) as err:
-            raise UpdateFailed(err) from err
+            await write
+        except ConfigEntryAuthFailed:
+            self._async_rollback("authentication failed")
+            self.coordinator.config_entry.async_start_reauth(self.hass)
+        except Exception as err:  # pylint: disable=broad-except
+            self._async_rollback(str(err))
+        else:
+            # Entities are not notified when the refresh after the write
+            # brings no change, as when the change was already in effect
+            self._async_confirm_optimistic_state()
+
+    @callback
+    def _async_confirm_optimistic_state(self) -> None:
+        data = self._thermostat
+        if (
+            self._optimistic_target_temperature is not None
+            and round(self._optimistic_target_temperature * 2) / 2
+            == data.set_point_temp
+        ):
+            self._optimistic_target_temperature = None
+        if (
+            self._optimistic_hvac_mode is not None
+            and self._optimistic_hvac_mode == data.hvac_mode
+        ):
+            self._optimistic_hvac_mode = None
+        if (
+            self._optimistic_target_temperature is None
+            and self._optimistic_hvac_mode is None
+        ):
+            self._cancel_optimistic_timeout()
+
+    @callback
+    def _async_start_optimistic_timeout(self) -> None:
+        self._unsub_optimistic = async_call_later(
+            self.hass, OPTIMISTIC_TIMEOUT, self._async_optimistic_timeout
+        )
+
+    @callback
+    def _async_optimistic_timeout(self, _now: datetime) -> None:
+        self._unsub_optimistic = None
+        if self.coordinator.commands.get(self._serial_number) is not None:
+            # Queued until the cloud is reachable, keep showing the change
+            # until it is written or dropped
+            self._async_start_optimistic_timeout()
+            return
+        self._async_rollback(
+            f"not confirmed by the Schluter cloud within {OPTIMISTIC_TIMEOUT} seconds"
+        )
+
+    @callback
+    def _async_rollback(self, reason: str) -> None:
+        if (
+            self._optimistic_target_temperature is None
+            and self._optimistic_hvac_mode is None
+        ):
+            return
+        _LOGGER.warning(
+            "Rolling back change to thermostat %s, %s", self._name, reason
+        )
+        self._cancel_optimistic_timeout()
+        self._optimistic_target_temperature = None
+        self._optimistic_hvac_mode = None
+        self.async_write_ha_state()
+
+    @callback
+    def _cancel_optimistic_timeout(self) -> None:
+        if self._unsub_optimistic is not None:
+            self._unsub_optimistic()
+            self._unsub_optimistic = None
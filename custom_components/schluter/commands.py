@@ -0,0 +1,138 @@
+"""Thermostat commands kept until the Schluter cloud accepted them."""
+from __future__ import annotations
+
+from dataclasses import dataclass, field, replace
+from datetime import datetime
+import logging
+from typing import Any
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util
+
+from .const import COMMAND_STORAGE_KEY, COMMAND_STORAGE_VERSION
+
+_LOGGER = logging.getLogger(__name__)
+
+
+@dataclass
+class SchluterCommand:
+    """Set-point and regulation mode requested for a thermostat.
+
+    Later requests win. A mode requested before a set-point is superseded,
+    as setting a temperature switches the thermostat to manual.
+    """
+
+    temperature: float | None = None
+    regulation_mode: int | None = None
+    mode_after_temperature: bool = False
+    queued: datetime = field(default_factory=dt_util.utcnow)
+
+    def set_temperature(self, temperature: float) -> None:
+        """Request a new target temperature."""
+        self.temperature = temperature
+        self.mode_after_temperature = False
+
+    def set_regulation_mode(self, regulation_mode: int) -> None:
+        """Request a new regulation mode."""
+        self.regulation_mode = regulation_mode
+        self.mode_after_temperature = self.temperature is not None
+
+    def merged(self, newer: SchluterCommand) -> SchluterCommand:
+        """Return this command with a newer one applied on top of it."""
+        command = replace(self)
+        if newer.regulation_mode is not None and not newer.mode_after_temperature:
+            command.set_regulation_mode(newer.regulation_mode)
+        if newer.temperature is not None:
+            command.set_temperature(newer.temperature)
+        if newer.regulation_mode is not None and newer.mode_after_temperature:
+            command.set_regulation_mode(newer.regulation_mode)
+        return command
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the command to be stored."""
+        return {
+            "temperature": self.temperature,
+            "regulation_mode": self.regulation_mode,
+            "mode_after_temperature": self.mode_after_temperature,
+            "queued": self.queued.isoformat(),
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> SchluterCommand:
+        """Return a command stored by ``as_dict``."""
+        queued = dt_util.parse_datetime(data["queued"])
+        if queued is None:
+            raise ValueError("Invalid queued time")
+        return cls(
+            temperature=data["temperature"],
+            regulation_mode=data["regulation_mode"],
+            mode_after_temperature=data["mode_after_temperature"],
+            queued=queued,
+        )
+
+
+class SchluterCommandStore:
+    """Commands the cloud could not be reached for, one per thermostat."""
+
+    def __init__(self, hass: HomeAssistant, entry_id: str) -> None:
+        """Initialize the command store."""
+        self._store: Store[dict[str, Any]] = Store(
+            hass, COMMAND_STORAGE_VERSION, f"{COMMAND_STORAGE_KEY}.{entry_id}"
+        )
+        self._commands: dict[str, SchluterCommand] = {}
+
+    def __len__(self) -> int:
+        """Return the number of queued commands."""
+        return len(self._commands)
+
+    @property
+    def oldest(self) -> datetime | None:
+        """Return when the oldest queued command was requested."""
+        return min(
+            (command.queued for command in self._commands.values()), default=None
+        )
+
+    def get(self, serial_number: str) -> SchluterCommand | None:
+        """Return the queued command of a thermostat."""
+        return self._commands.get(serial_number)
+
+    def oldest_first(self) -> list[tuple[str, SchluterCommand]]:
+        """Return the queued commands in the order they were requested."""
+        return sorted(self._commands.items(), key=lambda item: item[1].queued)
+
+    async def async_load(self) -> None:
+        """Restore the commands queued before the restart."""
+        if (data := await self._store.async_load()) is None:
+            return
+        for serial_number, command in data.items():
+            try:
+                self._commands[serial_number] = SchluterCommand.from_dict(command)
+            except (KeyError, TypeError, ValueError):
+                _LOGGER.warning("Ignoring invalid queued command for %s", serial_number)
+
+    async def async_put(self, serial_number: str, command: SchluterCommand) -> None:
+        """Queue the command of a thermostat, replacing an older one."""
+        self._commands[serial_number] = command
+        await self._store.async_save(self._data_to_save())
+
+    async def async_remove(self, serial_number: str, command: SchluterCommand) -> None:
+        """Drop a command once written, unless it was replaced meanwhile."""
+        if self._commands.get(serial_number) is not command:
+            return
+        del self._commands[serial_number]
+        await self._store.async_save(self._data_to_save())
+
+    async def async_remove_store(self) -> None:
+        """Delete the queued commands of a removed entry."""
+        await self._store.async_remove()
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the queued commands for diagnostics."""
+        return self._data_to_save()
+
+    def _data_to_save(self) -> dict[str, Any]:
+        return {
+            serial_number: command.as_dict()
+            for serial_number, command in self._commands.items()
+        }
@@ -13,10 +13,35 @@ import voluptuous as vol
 
 from homeassistant import config_entries
 from homeassistant.const import CONF_PASSWORD, CONF_USERNAME
+from homeassistant.core import callback
 from homeassistant.data_entry_flow import FlowResult
 from homeassistant.helpers.aiohttp_client import async_get_clientsession
-
-from .const import DOMAIN
+from homeassistant.util import dt as dt_util
+
+from .const import (
+    CONF_COST_CYCLE,
+    CONF_FAST_DURATION,
+    CONF_FAST_INTERVAL,
+    CONF_HEARTBEAT,
+    CONF_IDLE_INTERVAL,
+    CONF_NORMAL_INTERVAL,
+    CONF_POWER_DEADBAND,
+    CONF_STALE_WINDOW,
+    CONF_TEMPERATURE_DEADBAND,
+    COST_CYCLES,
+    DEFAULT_COST_CYCLE,
+    DEFAULT_FAST_DURATION,
+    DEFAULT_FAST_INTERVAL,
+    DEFAULT_HEARTBEAT,
+    DEFAULT_IDLE_INTERVAL,
+    DEFAULT_NORMAL_INTERVAL,
+    DEFAULT_POWER_DEADBAND,
+    DEFAULT_STALE_WINDOW,
+    DEFAULT_TEMPERATURE_DEADBAND,
+    DOMAIN,
+    MAX_POLL_INTERVAL,
+)
+from .session import async_get_session_store
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -36,6 +61,14 @@ class SchluterConfigFlowHandler(
 
     VERSION = 1
 
+    @staticmethod
+    @callback
+    def async_get_options_flow(
+        config_entry: config_entries.ConfigEntry,
+    ) -> SchluterOptionsFlowHandler:
+        """Get the options flow for this handler."""
+        return SchluterOptionsFlowHandler()
+
     async def async_step_user(
         self, user_input: dict[str, Any] | None = None
     ) -> FlowResult:
@@ -89,7 +122,7 @@ class SchluterConfigFlowHandler(
         websession = async_get_clientsession(self.hass)
         schluter = SchluterApi(websession)
         try:
-            await schluter.async_get_sessionid(username, password)
+            sessionid = await schluter.async_get_sessionid(username, password)
         except (ApiError, ClientConnectorError, asyncio.TimeoutError, ClientError):
             return None, "cannot_connect"
         except InvalidUserPasswordError:
@@ -97,4 +130,66 @@ class SchluterConfigFlowHandler(
         except Exception:  # pylint: disable=broad-except
             _LOGGER.exception("Unexpected exception")
             return None, "unknown"
+        # Hand the session over to the config entry so setup does not log in again
+        await async_get_session_store(self.hass).async_save(
+            username, sessionid, dt_util.utcnow()
+        )
         return username, None
+
+
+class SchluterOptionsFlowHandler(config_entries.OptionsFlow):
+    """Handle the polling options for schluter."""
+
+    async def async_step_init(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        """Manage the polling intervals."""
+        if user_input is not None:
+            return self.async_create_entry(title="", data=user_input)
+
+        options = self.config_entry.options
+        # The energy sensors do not integrate over gaps longer than
+        # ENERGY_MAX_GAP, see MAX_POLL_INTERVAL
+        schema = vol.Schema(
+            {
+                vol.Required(
+                    CONF_FAST_INTERVAL,
+                    default=options.get(CONF_FAST_INTERVAL, DEFAULT_FAST_INTERVAL),
+                ): vol.All(vol.Coerce(int), vol.Range(min=5, max=MAX_POLL_INTERVAL)),
+                vol.Required(
+                    CONF_FAST_DURATION,
+                    default=options.get(CONF_FAST_DURATION, DEFAULT_FAST_DURATION),
+                ): vol.All(vol.Coerce(int), vol.Range(min=0)),
+                vol.Required(
+                    CONF_NORMAL_INTERVAL,
+                    default=options.get(CONF_NORMAL_INTERVAL, DEFAULT_NORMAL_INTERVAL),
+                ): vol.All(vol.Coerce(int), vol.Range(min=10, max=MAX_POLL_INTERVAL)),
+                vol.Required(
+                    CONF_IDLE_INTERVAL,
+                    default=options.get(CONF_IDLE_INTERVAL, DEFAULT_IDLE_INTERVAL),
+                ): vol.All(vol.Coerce(int), vol.Range(min=10, max=MAX_POLL_INTERVAL)),
+                vol.Required(
+                    CONF_STALE_WINDOW,
+                    default=options.get(CONF_STALE_WINDOW, DEFAULT_STALE_WINDOW),
+                ): vol.All(vol.Coerce(int), vol.Range(min=0)),
+                vol.Required(
+                    CONF_TEMPERATURE_DEADBAND,
+                    default=options.get(
+                        CONF_TEMPERATURE_DEADBAND, DEFAULT_TEMPERATURE_DEADBAND
+                    ),
+                ): vol.All(vol.Coerce(float), vol.Range(min=0, max=5)),
+                vol.Required(
+                    CONF_POWER_DEADBAND,
+                    default=options.get(CONF_POWER_DEADBAND, DEFAULT_POWER_DEADBAND),
+                ): vol.All(vol.Coerce(int), vol.Range(min=0)),
+                vol.Required(
+                    CONF_HEARTBEAT,
+                    default=options.get(CONF_HEARTBEAT, DEFAULT_HEARTBEAT),
+                ): vol.All(vol.Coerce(int), vol.Range(min=60)),
+                vol.Required(
+                    CONF_COST_CYCLE,
+                    default=options.get(CONF_COST_CYCLE, DEFAULT_COST_CYCLE),
+                ): vol.In(COST_CYCLES),
+            }
+        )
+        return self.async_show_form(step_id="init", data_schema=schema)
@@ -1,6 +1,144 @@
 """Constants for the schluter integration."""
+from datetime import timedelta
 
 DOMAIN = "schluter"
 ZERO_WATTS = 0
 PRESET_MANUAL = "On Manual"
 PRESET_SCHEDULE = "On Schedule"
+
+# Options for the adaptive polling schedule, all values in seconds
+CONF_FAST_INTERVAL = "fast_interval"
+CONF_NORMAL_INTERVAL = "normal_interval"
+CONF_IDLE_INTERVAL = "idle_interval"
+CONF_FAST_DURATION = "fast_duration"
+# Seconds the last good state is served while refreshes fail
+CONF_STALE_WINDOW = "stale_window"
+
+DEFAULT_FAST_INTERVAL = 10
+DEFAULT_NORMAL_INTERVAL = 60
+DEFAULT_IDLE_INTERVAL = 300
+DEFAULT_FAST_DURATION = 60
+DEFAULT_STALE_WINDOW = 900
+
+# Sensors only write a value that moved past their deadband, at the latest
+# after the heartbeat in seconds
+CONF_TEMPERATURE_DEADBAND = "temperature_deadband"
+CONF_POWER_DEADBAND = "power_deadband"
+CONF_HEARTBEAT = "heartbeat"
+
+DEFAULT_TEMPERATURE_DEADBAND = 0.0
+DEFAULT_POWER_DEADBAND = 0
+DEFAULT_HEARTBEAT = 3600
+
+# The cost sensors start over at the beginning of every cycle
+CONF_COST_CYCLE = "cost_cycle"
+COST_CYCLE_DAILY = "daily"
+COST_CYCLE_MONTHLY = "monthly"
+COST_CYCLE_YEARLY = "yearly"
+COST_CYCLES = (COST_CYCLE_DAILY, COST_CYCLE_MONTHLY, COST_CYCLE_YEARLY)
+DEFAULT_COST_CYCLE = COST_CYCLE_MONTHLY
+
+# Seconds to collect thermostat writes before they are sent to the cloud
+WRITE_COALESCE_DELAY = 1.0
+
+# Thermostat commands the cloud could not be reached for, replayed after
+# the next successful refresh
+COMMAND_STORAGE_KEY = "schluter.commands"
+COMMAND_STORAGE_VERSION = 1
+
+# Seconds to wait for the cloud to confirm an optimistic thermostat change
+OPTIMISTIC_TIMEOUT = 60
+
+# Session IDs issued by the Schluter cloud are valid for one day
+SESSION_STORAGE_KEY = "schluter.sessions"
+SESSION_STORAGE_VERSION = 1
+SESSION_LIFETIME = timedelta(days=1)
+SESSION_RENEW_MARGIN = timedelta(hours=1)
+SESSION_RENEW_RETRY = 300
+
+# Seconds between two power samples above which no energy is integrated
+ENERGY_MAX_GAP = 900
+
+# Seconds entities are left alone at most while the cloud keeps reporting the
+# same thermostats, well below ENERGY_MAX_GAP so the energy sensors still
+# get a sample in time
+UNCHANGED_NOTIFY_INTERVAL = ENERGY_MAX_GAP / 2
+
+# Longest polling interval in seconds: refreshes are never further apart than
+# the interval, and an unchanged refresh may skip notifying the entities for up
+# to UNCHANGED_NOTIFY_INTERVAL, which together must stay within ENERGY_MAX_GAP
+MAX_POLL_INTERVAL = int(ENERGY_MAX_GAP - UNCHANGED_NOTIFY_INTERVAL)
+
+# Rolling windows of the heating runtime statistics as bucket length in
+# seconds and number of buckets, stored like the snapshot
+RUNTIME_WINDOWS = {
+    "1h": (60, 60),
+    "24h": (900, 96),
+    "7d": (3600, 168),
+}
+RUNTIME_STORAGE_KEY = "schluter.runtime"
+RUNTIME_STORAGE_VERSION = 1
+RUNTIME_SAVE_DELAY = 300
+
+# Hourly energy and cost buffered until they are imported as external
+# statistics, hours are imported in chunks of this many
+STATISTICS_STORAGE_KEY = "schluter.statistics"
+STATISTICS_STORAGE_VERSION = 1
+STATISTICS_SAVE_DELAY = 300
+STATISTICS_IMPORT_CHUNK = 500
+STATISTICS_MAX_PENDING_HOURS = 24 * 31
+
+# Seconds between two fetches of the weekly schedules, and after a
+# scheduled set-point change until the thermostats are refreshed
+SCHEDULE_REFRESH_INTERVAL = 6 * 60 * 60
+SCHEDULE_TRANSITION_DELAY = 30
+
+# Thermostat fields compared between refreshes to find changed entities
+SNAPSHOT_FIELDS = (
+    "name",
+    "temperature",
+    "set_point_temp",
+    "regulation_mode",
+    "is_online",
+    "is_heating",
+    "min_temp",
+    "max_temp",
+    "kwh_charge",
+    "load_measured_watt",
+    "sw_version",
+)
+
+# Upper bounds in seconds of the latency histograms and number of polls kept
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+POLL_TIMELINES = 20
+
+# Backoff in seconds after failed calls to the Schluter cloud, the circuit
+# opens after this many consecutive failures
+BACKOFF_BASE = 30
+BACKOFF_MAX = 900
+CIRCUIT_FAILURE_THRESHOLD = 3
+# Seconds to back off after a 429 response without a usable Retry-After
+RATE_LIMIT_DEFAULT = 60
+
+# Last known thermostat payloads, restored to start without the cloud
+SNAPSHOT_STORAGE_KEY = "schluter.snapshot"
+SNAPSHOT_STORAGE_VERSION = 1
+SNAPSHOT_SAVE_DELAY = 300
+
+# Connection pool shared by all accounts. Idle connections are kept longer
+# than the normal polling interval so polls reuse them.
+MAX_CONCURRENT_REQUESTS = 4
+KEEPALIVE_TIMEOUT = 90
+DNS_CACHE_TTL = 300
+
+# Thermostats written at the same time by the bulk services
+BULK_WRITE_CONCURRENCY = 4
+
+# Seconds the Schluter API traffic is recorded by default
+DEFAULT_TRACE_DURATION = 600
+
+# Coordinator refreshes profiled by default, seconds until a profile is
+# stopped anyway and functions listed per section of its summary
+DEFAULT_PROFILE_CYCLES = 5
+PROFILE_TIMEOUT = 3600
+PROFILE_SUMMARY_LINES = 40
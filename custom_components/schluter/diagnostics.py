@@ -0,0 +1,56 @@
+"""Diagnostics support for the schluter integration."""
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import CONF_PASSWORD, CONF_USERNAME
+from homeassistant.core import HomeAssistant
+
+from . import SchluterData
+from .const import DOMAIN, SNAPSHOT_FIELDS
+from .trace import redact_message
+
+TO_REDACT = {CONF_USERNAME, CONF_PASSWORD, "session_id", "title", "unique_id"}
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    data: SchluterData = hass.data[DOMAIN][entry.entry_id]
+    coordinator = data.coordinator
+    session = coordinator.session
+
+    return {
+        "entry": async_redact_data(entry.as_dict(), TO_REDACT),
+        "coordinator": {
+            "last_update_success": coordinator.last_update_success,
+            "stale": coordinator.is_stale,
+            "data_updated": coordinator.data_updated.isoformat()
+            if coordinator.data_updated
+            else None,
+            "last_exception": redact_message(repr(coordinator.last_exception))
+            if coordinator.last_exception
+            else None,
+            "update_interval": coordinator.current_interval.total_seconds()
+            if coordinator.current_interval
+            else None,
+            "notified_entities": coordinator.notified_entities,
+            "skipped_entities": coordinator.skipped_entities,
+        },
+        "session": {
+            "valid": session.is_valid,
+            "expires": session.expires.isoformat() if session.expires else None,
+        },
+        "circuit": coordinator.resilience.as_dict(),
+        "metrics": coordinator.metrics.as_dict(),
+        "queued_commands": coordinator.commands.as_dict(),
+        "thermostats": {
+            thermostat_id: {
+                field: getattr(thermostat, field) for field in SNAPSHOT_FIELDS
+            }
+            for thermostat_id, thermostat in (coordinator.data or {}).items()
+        },
+    }
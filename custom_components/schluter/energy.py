@@ -0,0 +1,96 @@
+"""Energy accounting helpers for the schluter integration."""
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+
+from homeassistant.util import dt as dt_util
+
+from .const import COST_CYCLE_DAILY, COST_CYCLE_MONTHLY, ENERGY_MAX_GAP
+
+
+class EnergyIntegrator:
+    """Integrate power samples into kWh using the trapezoidal rule.
+
+    Only the running total and the previous sample are kept. Samples that
+    are further apart than ``max_gap`` seconds are not integrated, so a
+    hole in the data never turns into a made-up jump of the total.
+    """
+
+    __slots__ = ("total", "_last_power", "_last_timestamp", "_max_gap")
+
+    def __init__(self, total: float = 0.0, max_gap: float = ENERGY_MAX_GAP) -> None:
+        """Initialize the integrator."""
+        self.total = total
+        self._last_power: float | None = None
+        self._last_timestamp: float | None = None
+        self._max_gap = max_gap
+
+    def add(self, power: float, timestamp: float) -> float:
+        """Add a power sample in W taken at a monotonic timestamp in seconds.
+
+        Returns the energy in kWh added to the total by this sample.
+        """
+        energy = 0.0
+        if self._last_timestamp is not None and self._last_power is not None:
+            elapsed = timestamp - self._last_timestamp
+            if 0 < elapsed <= self._max_gap:
+                energy = (self._last_power + power) / 2 * elapsed / 3_600_000
+                self.total += energy
+        self._last_power = power
+        self._last_timestamp = timestamp
+        return energy
+
+    def reset_sample(self) -> None:
+        """Forget the previous sample, e.g. while the thermostat is unavailable."""
+        self._last_power = None
+        self._last_timestamp = None
+
+
+def cycle_bounds(now: datetime, cycle: str) -> tuple[datetime, datetime]:
+    """Return the local start and end of the cost cycle ``now`` falls into."""
+    today = dt_util.as_local(now).date()
+    if cycle == COST_CYCLE_DAILY:
+        start = today
+        end = today + timedelta(days=1)
+    elif cycle == COST_CYCLE_MONTHLY:
+        start = today.replace(day=1)
+        end = (start + timedelta(days=32)).replace(day=1)
+    else:
+        start = today.replace(month=1, day=1)
+        end = start.replace(year=start.year + 1)
+    return dt_util.start_of_local_day(start), dt_util.start_of_local_day(end)
+
+
+class CostAccumulator:
+    """Sum costs since the start of the current daily, monthly or yearly cycle.
+
+    The end of the cycle is looked up once per cycle, adding a cost is a
+    comparison and an addition otherwise.
+    """
+
+    __slots__ = ("total", "last_reset", "_cycle", "_next_reset")
+
+    def __init__(self, cycle: str) -> None:
+        """Initialize the accumulator."""
+        self.total = 0.0
+        self.last_reset: datetime | None = None
+        self._cycle = cycle
+        self._next_reset: datetime | None = None
+
+    def add(self, cost: float, now: datetime) -> None:
+        """Add a cost incurred up to ``now``, starting over in a new cycle."""
+        if self._next_reset is None or now >= self._next_reset:
+            start, self._next_reset = cycle_bounds(now, self._cycle)
+            if self.last_reset != start:
+                self.total = 0.0
+                self.last_reset = start
+        self.total += cost
+
+    def restore(self, total: float, last_reset: datetime) -> None:
+        """Restore the cost of the cycle that started at ``last_reset``.
+
+        The total is dropped by the next ``add`` if that cycle is over.
+        """
+        self.total = total
+        self.last_reset = last_reset
+        self._next_reset = None
@@ -1,22 +1,72 @@
 """Shared entity helpers for Schluter integration."""
 from __future__ import annotations
 
+from homeassistant.core import callback
+from homeassistant.helpers.device_registry import DeviceInfo
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
+from .model import SchluterThermostatView
+
 
 class SchluterEntity(CoordinatorEntity):
     """Base entity that provides consistent availability semantics."""
 
+    # Thermostat fields the entity state is derived from. The coordinator
+    # only notifies the entity when one of them changed, None means always.
+    _source_fields: frozenset[str] | None = None
+
     def __init__(self, coordinator, thermostat_id: str) -> None:
-        super().__init__(coordinator)
+        super().__init__(coordinator, context=(thermostat_id, self._source_fields))
         self._thermostat_id = thermostat_id
+        # View of the thermostat built by the latest refresh, entity
+        # properties read from it instead of looking it up every time
+        self._thermostat: SchluterThermostatView = coordinator.data[thermostat_id]
+
+    async def async_added_to_hass(self) -> None:
+        """Pick up a refresh that happened while the entity was added."""
+        await super().async_added_to_hass()
+        self._update_thermostat()
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Pick up the thermostat view of the latest refresh."""
+        self._update_thermostat()
+        super()._handle_coordinator_update()
+
+    @callback
+    def _update_thermostat(self) -> None:
+        if (thermostat := self.coordinator.data.get(self._thermostat_id)) is not None:
+            self._thermostat = thermostat
+
+    @property
+    def extra_state_attributes(self) -> dict[str, bool | str] | None:
+        """Flag states the cloud has not confirmed with the time of their data.
+
+        A timestamp rather than an age keeps the attributes, and so the
+        state, unchanged while refreshes keep failing.
+        """
+        if not self.coordinator.is_stale:
+            return None
+        attributes: dict[str, bool | str] = {"stale": True}
+        if (data_updated := self.coordinator.data_updated) is not None:
+            attributes["data_updated"] = data_updated.isoformat()
+        return attributes
+
+    @property
+    def device_info(self) -> DeviceInfo:
+        """Return information to link this entity."""
+        return self._thermostat.device_info
 
     @property
     def available(self) -> bool:
-        """Return True only when coordinator and device are available."""
+        """Return True while the data is fresh enough and the device online.
+
+        The last good data is served within the stale window of the
+        coordinator, so a failed refresh does not make every entity flap.
+        """
         obj = self.coordinator.data.get(self._thermostat_id)
         return (
-            self.coordinator.last_update_success
+            self.coordinator.data_available
             and obj is not None
             and getattr(obj, "is_online", True)
-        )
\ No newline at end of file
+        )
@@ -0,0 +1,202 @@
+"""Runtime metrics of the schluter integration."""
+from __future__ import annotations
+
+from bisect import bisect_left
+from collections import Counter, deque
+from collections.abc import Iterator
+from contextlib import contextmanager
+from datetime import datetime
+import time
+from typing import Any
+
+from aiohttp.client_exceptions import ClientConnectorError
+from aioschluter import ApiError, InvalidSessionIdError, InvalidUserPasswordError
+
+from homeassistant.util import dt as dt_util
+
+from .const import LATENCY_BUCKETS, POLL_TIMELINES
+
+
+class LatencyHistogram:
+    """Count latencies in fixed buckets."""
+
+    __slots__ = ("counts", "total", "count")
+
+    def __init__(self) -> None:
+        """Initialize the histogram."""
+        self.counts = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, seconds: float) -> None:
+        """Add a latency in seconds."""
+        self.counts[bisect_left(LATENCY_BUCKETS, seconds)] += 1
+        self.total += seconds
+        self.count += 1
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the histogram for diagnostics."""
+        buckets = {
+            f"<={bucket}s": count
+            for bucket, count in zip(LATENCY_BUCKETS, self.counts)
+        }
+        buckets[f">{LATENCY_BUCKETS[-1]}s"] = self.counts[-1]
+        return {
+            "count": self.count,
+            "average": self.total / self.count if self.count else None,
+            "buckets": buckets,
+        }
+
+
+class PollTimeline:
+    """Phases of a single coordinator poll."""
+
+    __slots__ = ("started", "phases", "outcome")
+
+    def __init__(self) -> None:
+        """Initialize the timeline."""
+        self.started = dt_util.utcnow()
+        self.phases: list[tuple[str, float]] = []
+        self.outcome = "pending"
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the timeline for diagnostics."""
+        return {
+            "started": self.started.isoformat(),
+            "phases": [
+                {"phase": phase, "duration": round(duration, 4)}
+                for phase, duration in self.phases
+            ],
+            "outcome": self.outcome,
+        }
+
+
+def _outcome(err: BaseException) -> str:
+    if isinstance(err, InvalidUserPasswordError):
+        return "invalid_auth"
+    if isinstance(err, InvalidSessionIdError):
+        return "invalid_session"
+    if isinstance(err, ApiError):
+        return "api_error"
+    if isinstance(err, ClientConnectorError):
+        return "cannot_connect"
+    if isinstance(err, TimeoutError):
+        return "timeout"
+    return type(err).__name__
+
+
+class SchluterMetrics:
+    """Collect latencies, API call outcomes and poll timelines of an account."""
+
+    def __init__(self) -> None:
+        """Initialize the metrics."""
+        self.phase_latency: dict[str, LatencyHistogram] = {}
+        self.api_calls: Counter[tuple[str, str]] = Counter()
+        self.session_renewals = 0
+        # State writes skipped by sensors within their deadband, by sensor kind
+        self.suppressed_writes: Counter[str] = Counter()
+        # Fetches and thermostats whose payload repeated the previous one
+        self.fingerprint_hits: Counter[str] = Counter()
+        self.fingerprint_checks: Counter[str] = Counter()
+        self.last_success: datetime | None = None
+        self.timelines: deque[PollTimeline] = deque(maxlen=POLL_TIMELINES)
+        self._poll: PollTimeline | None = None
+
+    @property
+    def api_errors(self) -> int:
+        """Return the number of API calls that failed."""
+        return sum(
+            count for (_, outcome), count in self.api_calls.items() if outcome != "ok"
+        )
+
+    @property
+    def last_poll(self) -> PollTimeline | None:
+        """Return the timeline of the most recent poll."""
+        return self.timelines[-1] if self.timelines else None
+
+    def fingerprint_hit_rate(self, kind: str) -> float | None:
+        """Return the share of unchanged ``responses`` or ``thermostats`` in %."""
+        if not (checks := self.fingerprint_checks[kind]):
+            return None
+        return self.fingerprint_hits[kind] / checks * 100
+
+    def record_fingerprints(self, unchanged: bool, reused: int, total: int) -> None:
+        """Count a fetch and how many of its thermostats were unchanged."""
+        self.fingerprint_checks["responses"] += 1
+        self.fingerprint_hits["responses"] += unchanged
+        self.fingerprint_checks["thermostats"] += total
+        self.fingerprint_hits["thermostats"] += reused
+
+    def start_poll(self) -> PollTimeline:
+        """Start the timeline of a new poll."""
+        self._poll = PollTimeline()
+        self.timelines.append(self._poll)
+        return self._poll
+
+    def finish_poll(self, outcome: str) -> None:
+        """Finish the timeline of the current poll."""
+        if self._poll is None:
+            return
+        self._poll.outcome = outcome
+        if outcome == "ok":
+            self.last_success = self._poll.started
+        self._poll = None
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """Time a phase of the current poll."""
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            self.record_phase(name, time.monotonic() - start)
+
+    def record_phase(self, name: str, duration: float) -> None:
+        """Record how long a phase took."""
+        if (histogram := self.phase_latency.get(name)) is None:
+            histogram = self.phase_latency[name] = LatencyHistogram()
+        histogram.observe(duration)
+        if (poll := self._poll or self.last_poll) is not None:
+            poll.phases.append((name, duration))
+
+    @contextmanager
+    def api_call(self, endpoint: str) -> Iterator[None]:
+        """Count a call to a Schluter endpoint by its outcome."""
+        try:
+            yield
+        except Exception as err:
+            self.api_calls[(endpoint, _outcome(err))] += 1
+            raise
+        self.api_calls[(endpoint, "ok")] += 1
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return all metrics for diagnostics."""
+        return {
+            "phase_latency": {
+                name: histogram.as_dict()
+                for name, histogram in self.phase_latency.items()
+            },
+            "api_calls": [
+                {"endpoint": endpoint, "outcome": outcome, "count": count}
+                for (endpoint, outcome), count in sorted(self.api_calls.items())
+            ],
+            "session_renewals": self.session_renewals,
+            "suppressed_writes": dict(self.suppressed_writes),
+            "fingerprints": {
+                kind: {
+                    "checks": checks,
+                    "hits": self.fingerprint_hits[kind],
+                    "hit_rate": self.fingerprint_hit_rate(kind),
+                }
+                for kind, checks in self.fingerprint_checks.items()
+            },
+            "last_success": self.last_success.isoformat()
+            if self.last_success
+            else None,
+            "seconds_since_last_success": (
+                (dt_util.utcnow() - self.last_success).total_seconds()
+                if self.last_success
+                else None
+            ),
+            "polls": [timeline.as_dict() for timeline in self.timelines],
+        }
@@ -0,0 +1,116 @@
+"""Compact per-thermostat view model shared by all entities of a thermostat."""
+from __future__ import annotations
+
+from collections.abc import Mapping
+
+from aioschluter import Thermostat
+from aioschluter.const import REGULATION_MODE_MANUAL, REGULATION_MODE_SCHEDULE
+
+from homeassistant.components.climate import HVACAction, HVACMode
+from homeassistant.helpers.device_registry import DeviceInfo
+
+from .const import DOMAIN, ZERO_WATTS
+
+
+class SchluterThermostatView:
+    """State of a thermostat with everything entities derive precomputed.
+
+    The coordinator builds one view per thermostat and refresh, so entity
+    properties are plain attribute reads.
+    """
+
+    __slots__ = (
+        "serial_number",
+        "name",
+        "group_id",
+        "group_name",
+        "temperature",
+        "set_point_temp",
+        "regulation_mode",
+        "manual_temp",
+        "is_online",
+        "is_heating",
+        "min_temp",
+        "max_temp",
+        "kwh_charge",
+        "load_measured_watt",
+        "sw_version",
+        "hvac_mode",
+        "hvac_action",
+        "power",
+        "device_info",
+    )
+
+    def __init__(self, thermostat: Thermostat) -> None:
+        """Initialize the view from a thermostat reported by the cloud."""
+        self.serial_number: str = thermostat.serial_number
+        self.name: str = thermostat.name
+        self.group_id: int = thermostat.group_id
+        self.group_name: str = thermostat.group_name
+        self.temperature: float = thermostat.temperature
+        self.set_point_temp: float = thermostat.set_point_temp
+        self.regulation_mode: int = thermostat.regulation_mode
+        self.manual_temp: float = thermostat.manual_temp
+        self.is_online: bool = thermostat.is_online
+        self.is_heating: bool = thermostat.is_heating
+        self.min_temp: float = thermostat.min_temp
+        self.max_temp: float = thermostat.max_temp
+        self.kwh_charge: float = thermostat.kwh_charge
+        self.load_measured_watt: int = thermostat.load_measured_watt
+        self.sw_version: str = thermostat.sw_version
+
+        if self.regulation_mode == REGULATION_MODE_SCHEDULE:
+            self.hvac_mode = HVACMode.AUTO
+        elif self.regulation_mode == REGULATION_MODE_MANUAL:
+            self.hvac_mode = HVACMode.HEAT
+        else:
+            self.hvac_mode = HVACMode.OFF
+        if self.is_heating:
+            self.hvac_action = HVACAction.HEATING
+            self.power = self.load_measured_watt
+        else:
+            self.hvac_action = HVACAction.IDLE
+            self.power = ZERO_WATTS
+        self.device_info = DeviceInfo(
+            identifiers={(DOMAIN, self.serial_number)},
+            name=self.name,
+            sw_version=self.sw_version,
+            model="DITRA-HEAT-E-Wifi",
+            manufacturer="Schluter",
+        )
+
+
+class SchluterAccountSummary:
+    """Totals of all thermostats of an account, computed in a single pass."""
+
+    __slots__ = (
+        "thermostats",
+        "power",
+        "priced_power",
+        "heating",
+        "offline",
+        "average_temperature",
+    )
+
+    def __init__(self, data: Mapping[str, SchluterThermostatView]) -> None:
+        """Initialize the summary from the views of a refresh."""
+        power = heating = offline = 0
+        temperature = priced_power = 0.0
+        for thermostat in data.values():
+            if not thermostat.is_online:
+                offline += 1
+                continue
+            power += thermostat.power
+            priced_power += thermostat.power * thermostat.kwh_charge
+            heating += thermostat.is_heating
+            temperature += thermostat.temperature
+        online = len(data) - offline
+        self.thermostats = len(data)
+        self.power: int = power
+        # Power weighted by the price per kWh, integrates to the cost
+        self.priced_power: float = priced_power
+        self.heating: int = heating
+        self.offline: int = offline
+        self.average_temperature: float | None = (
+            round(temperature / online, 1) if online else None
+        )
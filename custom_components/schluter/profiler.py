@@ -0,0 +1,151 @@
+"""Profile the schluter integration for a number of coordinator refreshes."""
+from __future__ import annotations
+
+import cProfile
+from collections.abc import Callable
+from datetime import datetime
+import io
+import logging
+import pstats
+from typing import TYPE_CHECKING
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers.event import async_call_later
+
+from .const import PROFILE_SUMMARY_LINES, PROFILE_TIMEOUT
+
+if TYPE_CHECKING:
+    from . import SchluterDataUpdateCoordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+# Entry ID, start, outcome and phase durations of a profiled poll
+_Poll = tuple[str, datetime, str, tuple[tuple[str, float], ...]]
+
+
+class SchluterProfiler:
+    """Run cProfile on the event loop until every account refreshed enough.
+
+    Everything the loop runs meanwhile is profiled, which covers the
+    refreshes, the session handling, the entity properties and the state
+    writes. The profile is written as a ``.prof`` file for tools like
+    snakeviz, together with a text summary of the hottest functions and
+    the poll phases timed by the metrics of each account.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        coordinators: list[SchluterDataUpdateCoordinator],
+        cycles: int,
+        path: str,
+        on_done: Callable[[], None],
+    ) -> None:
+        """Initialize the profiler, ``path`` is used without its extension."""
+        self._hass = hass
+        self._coordinators = coordinators
+        self._cycles = cycles
+        self._remaining = {id(coordinator): cycles for coordinator in coordinators}
+        self._on_done = on_done
+        self.profile_path = f"{path}.prof"
+        self.summary_path = f"{path}.txt"
+        self._profile = cProfile.Profile()
+        self._unsubs: list[CALLBACK_TYPE] = []
+
+    @callback
+    def async_start(self) -> None:
+        """Start profiling."""
+        try:
+            self._profile.enable()
+        except ValueError as err:
+            raise HomeAssistantError(f"Cannot start profiling: {err}") from err
+        for coordinator in self._coordinators:
+            self._unsubs.append(
+                coordinator.async_add_refresh_listener(
+                    self._cycle_callback(coordinator)
+                )
+            )
+        self._unsubs.append(
+            async_call_later(self._hass, PROFILE_TIMEOUT, self._async_timeout)
+        )
+        _LOGGER.info(
+            "Profiling the next %s refreshes of every Schluter account", self._cycles
+        )
+
+    def _cycle_callback(
+        self, coordinator: SchluterDataUpdateCoordinator
+    ) -> CALLBACK_TYPE:
+        @callback
+        def _async_cycle() -> None:
+            key = id(coordinator)
+            if self._remaining.get(key, 0) > 0:
+                self._remaining[key] -= 1
+            if not any(self._remaining.values()):
+                # Refresh listeners run before the entities are notified,
+                # stop once they wrote the state of the last refresh
+                self._hass.loop.call_soon(self._async_stop)
+
+        return _async_cycle
+
+    @callback
+    def _async_timeout(self, _now: datetime) -> None:
+        _LOGGER.warning(
+            "Stopping the profile after %s seconds before all refreshes were seen",
+            PROFILE_TIMEOUT,
+        )
+        self._async_stop()
+
+    @callback
+    def _async_stop(self) -> None:
+        if not self._unsubs:
+            return
+        self._profile.disable()
+        for unsub in self._unsubs:
+            unsub()
+        self._unsubs = []
+        # The timelines keep changing on the loop, the summary is built from
+        # a copy in the executor
+        polls = [
+            (
+                coordinator.config_entry.entry_id,
+                timeline.started,
+                timeline.outcome,
+                tuple(timeline.phases),
+            )
+            for coordinator in self._coordinators
+            for timeline in list(coordinator.metrics.timelines)[-self._cycles :]
+        ]
+        self._hass.async_create_task(
+            self._async_write(polls), "schluter profile", eager_start=False
+        )
+        self._on_done()
+
+    async def _async_write(self, polls: list[_Poll]) -> None:
+        await self._hass.async_add_executor_job(self._write, polls)
+        _LOGGER.info(
+            "Wrote the Schluter profile to %s and %s",
+            self.profile_path,
+            self.summary_path,
+        )
+
+    def _write(self, polls: list[_Poll]) -> None:
+        self._profile.dump_stats(self.profile_path)
+        with open(self.summary_path, "w", encoding="utf-8") as file:
+            file.write(self._summary(polls))
+
+    def _summary(self, polls: list[_Poll]) -> str:
+        stream = io.StringIO()
+        stats = pstats.Stats(self._profile, stream=stream)
+        stats.sort_stats(pstats.SortKey.CUMULATIVE)
+        stream.write("Schluter integration\n")
+        stats.print_stats("schluter", PROFILE_SUMMARY_LINES)
+        stream.write("\nAll functions\n")
+        stats.print_stats(PROFILE_SUMMARY_LINES)
+        stream.write("\nPoll phases\n")
+        for entry_id, started, outcome, phases in polls:
+            durations = ", ".join(
+                f"{phase} {duration * 1000:.1f} ms" for phase, duration in phases
+            )
+            stream.write(f"{entry_id} {started.isoformat()} {outcome}: {durations}\n")
+        return stream.getvalue()
@@ -0,0 +1,223 @@
+"""Backoff and circuit breaker for calls to the Schluter cloud."""
+from __future__ import annotations
+
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from email.utils import parsedate_to_datetime
+import logging
+import math
+import random
+import re
+import time
+from types import SimpleNamespace
+from typing import Any
+
+from aiohttp import ClientError, ClientSession, TraceConfig, TraceRequestEndParams
+from aioschluter import ApiError, InvalidSessionIdError, InvalidUserPasswordError
+
+from homeassistant.exceptions import ConfigEntryAuthFailed
+from homeassistant.helpers.update_coordinator import UpdateFailed
+from homeassistant.util import dt as dt_util
+
+from .const import (
+    BACKOFF_BASE,
+    BACKOFF_MAX,
+    CIRCUIT_FAILURE_THRESHOLD,
+    RATE_LIMIT_DEFAULT,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+HTTP_TOO_MANY_REQUESTS = 429
+HTTP_SERVER_ERROR = 500
+
+# aioschluter only keeps the status of a failed response in the message
+_API_ERROR_STATUS = re.compile(r": (\d{3})$")
+
+
+class SchluterUnreachable(UpdateFailed):
+    """The Schluter cloud could not be reached or failed on its side.
+
+    Raised instead of a plain UpdateFailed for connection errors, timeouts,
+    server errors, rate limiting and calls rejected by the open circuit,
+    which are all worth retrying later. Other API errors mean the cloud
+    answered and rejected the call.
+    """
+
+
+def is_server_error(err: ApiError) -> bool:
+    """Return True when an API error came from a 5xx or 429 response."""
+    if (match := _API_ERROR_STATUS.search(str(err))) is None:
+        return False
+    status = int(match.group(1))
+    return status >= HTTP_SERVER_ERROR or status == HTTP_TOO_MANY_REQUESTS
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    """Return the seconds a Retry-After header asks to wait."""
+    if not value:
+        return None
+    try:
+        seconds = float(value)
+    except ValueError:
+        pass
+    else:
+        return max(seconds, 0.0) if math.isfinite(seconds) else None
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max((retry_at - dt_util.utcnow()).total_seconds(), 0.0)
+
+
+class SchluterRateLimit:
+    """Track the Retry-After of 429 responses of the Schluter cloud.
+
+    Responses are only visible to aioschluter, which turns a 429 into a
+    plain ApiError. The trace config of the client session lets us read
+    the Retry-After header before that happens.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the rate limit."""
+        self.until = 0.0
+        self.trace_config = TraceConfig()
+        self.trace_config.on_request_end.append(self._async_on_request_end)
+
+    @property
+    def remaining(self) -> float:
+        """Return the seconds the cloud asked us to wait."""
+        return max(self.until - time.monotonic(), 0.0)
+
+    async def _async_on_request_end(
+        self,
+        session: ClientSession,
+        context: SimpleNamespace,
+        params: TraceRequestEndParams,
+    ) -> None:
+        if params.response.status != HTTP_TOO_MANY_REQUESTS:
+            return
+        retry_after = parse_retry_after(params.response.headers.get("Retry-After"))
+        if retry_after is None:
+            retry_after = RATE_LIMIT_DEFAULT
+        self.until = max(self.until, time.monotonic() + retry_after)
+
+
+class SchluterResilience:
+    """Back off from the Schluter cloud while it is failing.
+
+    Failed calls are retried after an exponentially growing delay with
+    jitter. After ``threshold`` consecutive failures the circuit opens and
+    every call fails fast until the delay has passed, then a single call is
+    let through as a probe whose outcome closes or re-opens the circuit. A
+    429 response opens the circuit right away for at least the time the
+    cloud asked for in its Retry-After header.
+    """
+
+    def __init__(
+        self,
+        rate_limit: SchluterRateLimit,
+        threshold: int = CIRCUIT_FAILURE_THRESHOLD,
+        base: float = BACKOFF_BASE,
+        maximum: float = BACKOFF_MAX,
+    ) -> None:
+        """Initialize the circuit breaker."""
+        self._threshold = threshold
+        self._base = base
+        self._maximum = maximum
+        self.failures = 0
+        self._open_until: float | None = None
+        self._probing = False
+        self._rate_limit = rate_limit
+
+    @property
+    def is_open(self) -> bool:
+        """Return True while calls to the cloud fail fast."""
+        return self._open_until is not None
+
+    def retry_delay(self) -> float:
+        """Return the seconds until the cloud should be called again."""
+        if self._open_until is not None:
+            return max(self._open_until - time.monotonic(), 0.0)
+        return self._backoff()
+
+    @asynccontextmanager
+    async def async_guard(self) -> AsyncIterator[None]:
+        """Guard calls to the cloud and translate their errors.
+
+        Raises ConfigEntryAuthFailed for rejected credentials,
+        SchluterUnreachable when the cloud could not be reached, including a
+        call rejected because the circuit is open, and UpdateFailed for any
+        other failure.
+        """
+        self._acquire()
+        try:
+            yield
+        except InvalidUserPasswordError as err:
+            self._probing = False
+            raise ConfigEntryAuthFailed from err
+        except (ClientError, TimeoutError) as err:
+            self._record_failure()
+            raise SchluterUnreachable(err) from err
+        except ApiError as err:
+            self._record_failure()
+            if is_server_error(err):
+                raise SchluterUnreachable(err) from err
+            raise UpdateFailed(err) from err
+        except InvalidSessionIdError as err:
+            self._record_failure()
+            raise UpdateFailed(err) from err
+        except BaseException:
+            self._probing = False
+            raise
+        self._record_success()
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the circuit state for diagnostics."""
+        return {
+            "open": self.is_open,
+            "failures": self.failures,
+            "retry_in": round(self.retry_delay(), 1) if self.is_open else None,
+            "rate_limited_for": round(self._rate_limit.remaining, 1),
+        }
+
+    def _backoff(self) -> float:
+        delay = min(self._maximum, self._base * 2 ** max(self.failures - 1, 0))
+        delay = random.uniform(delay / 2, delay)
+        return max(delay, self._rate_limit.remaining)
+
+    def _acquire(self) -> None:
+        if self._open_until is None:
+            return
+        remaining = self._open_until - time.monotonic()
+        if remaining > 0 or self._probing:
+            raise SchluterUnreachable(
+                f"Schluter cloud unavailable, retrying in {max(remaining, 0):.0f} s"
+            )
+        self._probing = True
+
+    def _record_failure(self) -> None:
+        self._probing = False
+        self.failures += 1
+        now = time.monotonic()
+        if (
+            self._open_until is None
+            and self.failures < self._threshold
+            and not self._rate_limit.remaining
+        ):
+            return
+        delay = self._backoff()
+        if self._open_until is None:
+            _LOGGER.warning(
+                "Schluter cloud failed %s times, backing off for %.0f s",
+                self.failures,
+                delay,
+            )
+        self._open_until = now + delay
+
+    def _record_success(self) -> None:
+        if self._open_until is not None:
+            _LOGGER.info("Schluter cloud is reachable again")
+        self._probing = False
+        self._open_until = None
+        self.failures = 0
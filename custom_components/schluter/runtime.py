@@ -0,0 +1,262 @@
+"""Heating runtime statistics of the Schluter thermostats."""
+from __future__ import annotations
+
+from datetime import date, datetime
+import logging
+from typing import Any
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util
+
+from .const import (
+    ENERGY_MAX_GAP,
+    RUNTIME_SAVE_DELAY,
+    RUNTIME_STORAGE_KEY,
+    RUNTIME_STORAGE_VERSION,
+    RUNTIME_WINDOWS,
+)
+from .model import SchluterThermostatView
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class RuntimeWindow:
+    """Heating time, observed time and energy over a rolling window.
+
+    The window is split into fixed buckets kept in a ring next to running
+    totals, so adding a sample and reading the window take constant time.
+    """
+
+    __slots__ = (
+        "heating",
+        "observed",
+        "energy",
+        "_bucket_seconds",
+        "_bucket",
+        "_heating",
+        "_observed",
+        "_energy",
+    )
+
+    def __init__(self, bucket_seconds: int, buckets: int) -> None:
+        """Initialize an empty window."""
+        # Running totals in seconds and watt seconds
+        self.heating = 0.0
+        self.observed = 0.0
+        self.energy = 0.0
+        self._bucket_seconds = bucket_seconds
+        self._bucket: int | None = None
+        self._heating = [0.0] * buckets
+        self._observed = [0.0] * buckets
+        self._energy = [0.0] * buckets
+
+    @property
+    def duty_cycle(self) -> float | None:
+        """Return the share of the observed time spent heating in percent."""
+        if not self.observed:
+            return None
+        return self.heating / self.observed * 100
+
+    @property
+    def average_power(self) -> float | None:
+        """Return the average power drawn over the observed time in W."""
+        if not self.observed:
+            return None
+        return self.energy / self.observed
+
+    def add(
+        self, timestamp: float, duration: float, heating: bool, power: float
+    ) -> None:
+        """Add an interval of ``duration`` seconds that ended at ``timestamp``."""
+        self.advance(timestamp)
+        slot = self._slot()
+        heating_seconds = duration if heating else 0.0
+        self._heating[slot] += heating_seconds
+        self._observed[slot] += duration
+        self._energy[slot] += power * duration
+        self.heating += heating_seconds
+        self.observed += duration
+        self.energy += power * duration
+
+    def advance(self, timestamp: float) -> None:
+        """Drop the buckets that fell out of the window at ``timestamp``."""
+        bucket = int(timestamp // self._bucket_seconds)
+        if self._bucket is None:
+            self._bucket = bucket
+            return
+        # Each bucket is cleared at most once per lap of the ring
+        for expired in range(
+            self._bucket + 1, min(bucket, self._bucket + len(self._heating)) + 1
+        ):
+            slot = expired % len(self._heating)
+            self.heating -= self._heating[slot]
+            self.observed -= self._observed[slot]
+            self.energy -= self._energy[slot]
+            self._heating[slot] = self._observed[slot] = self._energy[slot] = 0.0
+        if bucket - self._bucket >= len(self._heating):
+            # Drop the rounding errors of the running totals with the last lap
+            self.heating = self.observed = self.energy = 0.0
+        self._bucket = max(bucket, self._bucket)
+
+    def _slot(self) -> int:
+        assert self._bucket is not None
+        return self._bucket % len(self._heating)
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the buckets to be stored.
+
+        The bucket lists are handed out as they are, they are serialized
+        in one go and copying or rounding them would cost more than the
+        larger file on every unload of many thermostats.
+        """
+        return {
+            "bucket": self._bucket,
+            "heating": self._heating,
+            "observed": self._observed,
+            "energy": self._energy,
+        }
+
+    def restore(self, data: dict[str, Any]) -> None:
+        """Restore the buckets stored by ``as_dict``."""
+        if len(data["heating"]) != len(self._heating):
+            raise ValueError("Bucket count changed")
+        self._bucket = data["bucket"]
+        self._heating = list(map(float, data["heating"]))
+        self._observed = list(map(float, data["observed"]))
+        self._energy = list(map(float, data["energy"]))
+        self.heating = sum(self._heating)
+        self.observed = sum(self._observed)
+        self.energy = sum(self._energy)
+
+
+class HeatingRuntime:
+    """Rolling duty cycles and the heating time of the day of a thermostat.
+
+    Every sample accounts the interval since the previous sample with the
+    heating state of the previous sample. Samples further apart than
+    ``max_gap`` seconds only start a new interval.
+    """
+
+    __slots__ = ("windows", "heating_today", "_today", "_last", "_max_gap")
+
+    def __init__(self, max_gap: float = ENERGY_MAX_GAP) -> None:
+        """Initialize empty statistics."""
+        self.windows = {
+            key: RuntimeWindow(bucket_seconds, buckets)
+            for key, (bucket_seconds, buckets) in RUNTIME_WINDOWS.items()
+        }
+        # Seconds spent heating since local midnight
+        self.heating_today = 0.0
+        self._today: date | None = None
+        self._last: tuple[float, bool, float] | None = None
+        self._max_gap = max_gap
+
+    def add(
+        self, timestamp: float, today: date, thermostat: SchluterThermostatView
+    ) -> None:
+        """Add a sample of the thermostat taken at a POSIX timestamp.
+
+        ``today`` is the local date of the timestamp.
+        """
+        if today != self._today:
+            self._today = today
+            self.heating_today = 0.0
+
+        duration = 0.0
+        heating, power = False, 0.0
+        if self._last is not None:
+            last_timestamp, heating, power = self._last
+            duration = timestamp - last_timestamp
+            if not 0 < duration <= self._max_gap:
+                duration = 0.0
+        for window in self.windows.values():
+            if duration:
+                window.add(timestamp, duration, heating, power)
+            else:
+                window.advance(timestamp)
+        if heating and duration:
+            # An interval crossing midnight only counts from midnight on
+            midnight = dt_util.start_of_local_day(today).timestamp()
+            self.heating_today += min(duration, max(timestamp - midnight, 0.0))
+
+        if thermostat.is_online:
+            self._last = (timestamp, thermostat.is_heating, thermostat.power)
+        else:
+            self._last = None
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the statistics to be stored."""
+        return {
+            "windows": {key: window.as_dict() for key, window in self.windows.items()},
+            "today": self._today.isoformat() if self._today else None,
+            "heating_today": round(self.heating_today, 1),
+        }
+
+    def restore(self, data: dict[str, Any]) -> None:
+        """Restore the statistics stored by ``as_dict``."""
+        for key, window in self.windows.items():
+            if (window_data := data["windows"].get(key)) is not None:
+                window.restore(window_data)
+        if data["today"] is not None:
+            self._today = date.fromisoformat(data["today"])
+            self.heating_today = float(data["heating_today"])
+
+
+class SchluterRuntimeStats:
+    """Heating runtime of every thermostat of an entry, kept in a store."""
+
+    def __init__(self, hass: HomeAssistant, entry_id: str) -> None:
+        """Initialize the statistics."""
+        self._store: Store[dict[str, Any]] = Store(
+            hass, RUNTIME_STORAGE_VERSION, f"{RUNTIME_STORAGE_KEY}.{entry_id}"
+        )
+        self._runtimes: dict[str, HeatingRuntime] = {}
+
+    def get(self, serial_number: str) -> HeatingRuntime | None:
+        """Return the statistics of a thermostat."""
+        return self._runtimes.get(serial_number)
+
+    async def async_load(self) -> None:
+        """Restore the statistics saved before the restart."""
+        if (data := await self._store.async_load()) is None:
+            return
+        for serial_number, runtime_data in data.items():
+            runtime = HeatingRuntime()
+            try:
+                runtime.restore(runtime_data)
+            except (KeyError, TypeError, ValueError):
+                _LOGGER.warning(
+                    "Ignoring invalid runtime statistics of %s", serial_number
+                )
+                continue
+            self._runtimes[serial_number] = runtime
+
+    @callback
+    def async_add(
+        self, data: dict[str, SchluterThermostatView], timestamp: datetime
+    ) -> None:
+        """Add the thermostats of a refresh and save them, coalescing saves."""
+        posix = timestamp.timestamp()
+        today = dt_util.as_local(timestamp).date()
+        for serial_number, thermostat in data.items():
+            if (runtime := self._runtimes.get(serial_number)) is None:
+                runtime = self._runtimes[serial_number] = HeatingRuntime()
+            runtime.add(posix, today, thermostat)
+        self._store.async_delay_save(self._data_to_save, RUNTIME_SAVE_DELAY)
+
+    async def async_save(self) -> None:
+        """Save the statistics right away, e.g. before the entry is unloaded."""
+        if self._runtimes:
+            await self._store.async_save(self._data_to_save())
+
+    async def async_remove(self) -> None:
+        """Delete the statistics of a removed entry."""
+        await self._store.async_remove()
+
+    @callback
+    def _data_to_save(self) -> dict[str, Any]:
+        return {
+            serial_number: runtime.as_dict()
+            for serial_number, runtime in self._runtimes.items()
+        }
@@ -0,0 +1,92 @@
+"""Weekly schedules of the Schluter thermostats."""
+from __future__ import annotations
+
+from bisect import bisect_right
+from datetime import datetime, timedelta, timezone, tzinfo
+import re
+from typing import Any
+
+from homeassistant.util import dt as dt_util
+
+SECONDS_PER_DAY = 24 * 60 * 60
+
+_TZ_OFFSET = re.compile(r"^([+-])(\d{2}):(\d{2})$")
+
+
+def parse_tz_offset(value: str | None) -> tzinfo | None:
+    """Return the time zone of a TZOffset like ``-05:00``, None if invalid."""
+    if not value or (match := _TZ_OFFSET.match(value)) is None:
+        return None
+    sign, hours, minutes = match.groups()
+    offset = timedelta(hours=int(hours), minutes=int(minutes))
+    return timezone(-offset if sign == "-" else offset)
+
+
+class SchluterSchedule:
+    """Set-point changes of a weekly schedule, sorted by time of the week.
+
+    The cloud reports the schedule as days numbered from 1 for Monday, each
+    with events at a clock time of the thermostat. Inactive events are
+    ignored.
+    """
+
+    __slots__ = ("_seconds", "_temperatures")
+
+    def __init__(self, payload: dict[str, Any]) -> None:
+        """Initialize the schedule from the payload of the cloud."""
+        events: list[tuple[int, float]] = []
+        for day in payload["Days"]:
+            weekday = int(day["WeekDayGrpNo"]) - 1
+            for event in day["Events"]:
+                if not event.get("Active", True):
+                    continue
+                hours, minutes, *seconds = (
+                    int(part) for part in event["Clock"].split(":")
+                )
+                event_day = weekday + 1 if event.get("EventIsOnNextDay") else weekday
+                events.append(
+                    (
+                        (event_day % 7) * SECONDS_PER_DAY
+                        + hours * 3600
+                        + minutes * 60
+                        + sum(seconds),
+                        event["Temperature"] / 100,
+                    )
+                )
+        events.sort()
+        self._seconds = [second for second, _ in events]
+        self._temperatures = [temperature for _, temperature in events]
+
+    def __bool__(self) -> bool:
+        """Return True when the schedule has any set-point change."""
+        return bool(self._seconds)
+
+    def next_transition(
+        self, now: datetime, time_zone: tzinfo | None = None
+    ) -> tuple[datetime, float] | None:
+        """Return when the set-point changes next after ``now`` and to what.
+
+        The clock times are read in ``time_zone``, the one of the thermostat,
+        falling back to the time zone of Home Assistant.
+        """
+        if not self._seconds:
+            return None
+        local = now.astimezone(time_zone) if time_zone else dt_util.as_local(now)
+        week_start = local.replace(
+            hour=0, minute=0, second=0, microsecond=0
+        ) - timedelta(days=local.weekday())
+        second = (
+            local.weekday() * SECONDS_PER_DAY
+            + local.hour * 3600
+            + local.minute * 60
+            + local.second
+        )
+        index = bisect_right(self._seconds, second)
+        if index == len(self._seconds):
+            # The next change is the first one of the following week
+            index = 0
+            week_start += timedelta(days=7)
+        return (
+            week_start + timedelta(seconds=self._seconds[index]),
+            self._temperatures[index],
+        )
@@ -0,0 +1,97 @@
+"""Poll scheduling shared by all Schluter accounts."""
+from __future__ import annotations
+
+from aiohttp import ClientSession, TCPConnector
+from aiohttp.hdrs import USER_AGENT
+
+from homeassistant.const import EVENT_HOMEASSISTANT_CLOSE
+from homeassistant.core import Event, HomeAssistant, callback
+from homeassistant.helpers.aiohttp_client import SERVER_SOFTWARE
+from homeassistant.helpers.json import json_dumps
+from homeassistant.util import ssl as ssl_util
+
+from .const import DNS_CACHE_TTL, DOMAIN, KEEPALIVE_TIMEOUT, MAX_CONCURRENT_REQUESTS
+from .resilience import SchluterRateLimit
+
+DATA_SCHEDULER = f"{DOMAIN}_scheduler"
+
+# Seconds before its slot a refresh still counts as being on it
+SLOT_TOLERANCE = 1.0
+
+
+class SchluterScheduler:
+    """Spread the polls of all accounts over their interval.
+
+    Every registered coordinator owns a slot. The refreshes of slot i out
+    of n are aligned to i/n of the update interval by moving them earlier,
+    so accounts polling at the same interval never hit the cloud at the
+    same moment. All accounts
+    share one HTTP session whose connection pool caps the concurrent
+    requests and keeps connections alive between polls.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the scheduler."""
+        self._hass = hass
+        self._members: list[object] = []
+        self._session: ClientSession | None = None
+        self.rate_limit = SchluterRateLimit()
+        hass.bus.async_listen_once(EVENT_HOMEASSISTANT_CLOSE, self._async_close_session)
+
+    @callback
+    def async_get_clientsession(self) -> ClientSession:
+        """Return the HTTP session shared by all accounts."""
+        if self._session is None:
+            self._session = ClientSession(
+                connector=TCPConnector(
+                    limit=MAX_CONCURRENT_REQUESTS,
+                    keepalive_timeout=KEEPALIVE_TIMEOUT,
+                    ttl_dns_cache=DNS_CACHE_TTL,
+                    ssl=ssl_util.get_default_context(),
+                ),
+                headers={USER_AGENT: SERVER_SOFTWARE},
+                json_serialize=json_dumps,
+                trace_configs=[self.rate_limit.trace_config],
+            )
+        return self._session
+
+    @callback
+    def async_register(self, member: object) -> None:
+        """Give a coordinator a slot."""
+        self._members.append(member)
+
+    async def async_unregister(self, member: object) -> None:
+        """Free the slot of a coordinator, closing the session after the last."""
+        if member in self._members:
+            self._members.remove(member)
+        if not self._members:
+            await self._async_close_session()
+
+    def phase_delay(self, member: object, interval: float, now: float) -> float:
+        """Return the seconds to add to the interval to hit the member's slot.
+
+        The result is never positive, a refresh is only moved earlier. Two
+        refreshes are never further apart than the interval, which keeps
+        them within the gap the energy sensors integrate over.
+        """
+        if len(self._members) < 2 or member not in self._members or interval <= 0:
+            return 0.0
+        offset = interval * self._members.index(member) / len(self._members)
+        until_slot = (offset - now) % interval
+        if until_slot < SLOT_TOLERANCE:
+            # Already on the slot, the refresh just fired a little early
+            return 0.0
+        return until_slot - interval
+
+    async def _async_close_session(self, _event: Event | None = None) -> None:
+        if self._session is not None:
+            session, self._session = self._session, None
+            await session.close()
+
+
+@callback
+def async_get_scheduler(hass: HomeAssistant) -> SchluterScheduler:
+    """Return the scheduler shared by all Schluter accounts."""
+    if (scheduler := hass.data.get(DATA_SCHEDULER)) is None:
+        scheduler = hass.data[DATA_SCHEDULER] = SchluterScheduler(hass)
+    return scheduler
@@ -1,229 +1,791 @@
 """Break out the temperature of the thermostat into a separate sensor entity."""
-from aioschluter import Thermostat
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import datetime
+import time
 
 from homeassistant.components.sensor import (
+    RestoreSensor,
     SensorDeviceClass,
     SensorEntity,
+    SensorEntityDescription,
     SensorStateClass,
 )
-from homeassistant.const import UnitOfTemperature, UnitOfEnergy, UnitOfPower
-from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
-
-from . import SchluterData
-from .const import DOMAIN, ZERO_WATTS
+from homeassistant.components.sensor.const import ATTR_LAST_RESET
+from homeassistant.const import (
+    PERCENTAGE,
+    STATE_UNAVAILABLE,
+    EntityCategory,
+    UnitOfEnergy,
+    UnitOfPower,
+    UnitOfTemperature,
+    UnitOfTime,
+)
+from homeassistant.core import CALLBACK_TYPE, callback
+from homeassistant.helpers.entity import Entity
+from homeassistant.helpers.event import async_call_later
+from homeassistant.helpers.update_coordinator import (
+    CoordinatorEntity,
+    DataUpdateCoordinator,
+)
+from homeassistant.util import dt as dt_util
+
+from . import SchluterData, SchluterDataUpdateCoordinator
+from .const import (
+    CONF_COST_CYCLE,
+    CONF_HEARTBEAT,
+    CONF_POWER_DEADBAND,
+    CONF_TEMPERATURE_DEADBAND,
+    DEFAULT_COST_CYCLE,
+    DEFAULT_HEARTBEAT,
+    DEFAULT_POWER_DEADBAND,
+    DEFAULT_TEMPERATURE_DEADBAND,
+    DOMAIN,
+)
+from .energy import CostAccumulator, EnergyIntegrator
 from .entity import SchluterEntity
+from .model import SchluterAccountSummary, SchluterThermostatView
+from .runtime import HeatingRuntime
 
 
-async def async_setup_entry(hass, config_entry, async_add_entities):
-    """Add sensors for passed config_entry in HA."""
-    data: SchluterData = hass.data[DOMAIN][config_entry.entry_id]
+@dataclass(frozen=True, kw_only=True)
+class SchluterSensorEntityDescription(SensorEntityDescription):
+    """Describe a sensor reading a value of a thermostat."""
 
-    # Add the Temperature Sensor
-    async_add_entities(
-        SchluterTemperatureSensor(data.coordinator, thermostat_id)
-        for thermostat_id in data.coordinator.data
-    )
+    value_fn: Callable[[SchluterThermostatView], float | int | None]
+    # Thermostat fields the value is derived from
+    source_fields: frozenset[str]
+    # Option holding the deadband of the sensor, None for no deadband
+    deadband_option: str | None = None
 
-    # Add the Target Temperature Sensor
-    async_add_entities(
-        SchluterTargetTemperatureSensor(data.coordinator, thermostat_id)
-        for thermostat_id in data.coordinator.data
-    )
 
-    # Add the Power Sensor
-    async_add_entities(
-        SchluterPowerSensor(data.coordinator, thermostat_id)
-        for thermostat_id in data.coordinator.data
-    )
+@dataclass(frozen=True, kw_only=True)
+class SchluterMetricSensorEntityDescription(SensorEntityDescription):
+    """Describe a runtime metric of the account."""
 
-    # Add the price per kwh Sensor
-    async_add_entities(
-        SchluterEnergyPriceSensor(data.coordinator, thermostat_id)
-        for thermostat_id in data.coordinator.data
-    )
+    value_fn: Callable[[SchluterDataUpdateCoordinator], float | int | datetime | None]
 
-    # Add the virtual/calculated KwH Sensor
-    async_add_entities(
-        SchluterEnergySensor(data.coordinator, thermostat_id)
-        for thermostat_id in data.coordinator.data
-    )
+
+@dataclass(frozen=True, kw_only=True)
+class SchluterAccountSensorEntityDescription(SensorEntityDescription):
+    """Describe a total of all thermostats of the account."""
+
+    value_fn: Callable[[SchluterAccountSummary], float | int | None]
+
+
+@dataclass(frozen=True, kw_only=True)
+class SchluterRuntimeSensorEntityDescription(SensorEntityDescription):
+    """Describe a heating runtime statistic of a thermostat."""
+
+    value_fn: Callable[[HeatingRuntime], float | None]
+
+
+def _duty_cycle(window: str) -> Callable[[HeatingRuntime], float | None]:
+    def _value(runtime: HeatingRuntime) -> float | None:
+        if (duty_cycle := runtime.windows[window].duty_cycle) is None:
+            return None
+        return round(duty_cycle, 1)
+
+    return _value
+
+
+def _average_power(runtime: HeatingRuntime) -> float | None:
+    if (power := runtime.windows["24h"].average_power) is None:
+        return None
+    return round(power)
+
+
+def _availability_changed(entity: Entity) -> bool:
+    """Return True when the availability differs from the written state."""
+    state = entity.hass.states.get(entity.entity_id)
+    return state is not None and (state.state == STATE_UNAVAILABLE) == entity.available
+
+
+async def _async_restore_cost(
+    sensor: RestoreSensor, accumulator: CostAccumulator
+) -> None:
+    """Restore the cost of the cycle that was running before the restart."""
+    if (
+        (last_sensor_data := await sensor.async_get_last_sensor_data()) is None
+        or last_sensor_data.native_value is None
+        or (last_state := await sensor.async_get_last_state()) is None
+        or (
+            last_reset := dt_util.parse_datetime(
+                str(last_state.attributes.get(ATTR_LAST_RESET))
+            )
+        )
+        is None
+    ):
+        return
+    accumulator.restore(float(last_sensor_data.native_value), last_reset)
+
+
+def _last_poll_duration(coordinator: SchluterDataUpdateCoordinator) -> float | None:
+    if (poll := coordinator.metrics.last_poll) is None:
+        return None
+    return round(sum(duration for _, duration in poll.phases), 3)
+
+
+# The keys complete the unique IDs, which were derived from the device class
+# of the sensors before and must stay the same
+THERMOSTAT_SENSORS = (
+    SchluterSensorEntityDescription(
+        key="temperature",
+        name="Current Temperature",
+        device_class=SensorDeviceClass.TEMPERATURE,
+        native_unit_of_measurement=UnitOfTemperature.CELSIUS,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda thermostat: thermostat.temperature,
+        source_fields=frozenset({"temperature", "is_online"}),
+        deadband_option=CONF_TEMPERATURE_DEADBAND,
+    ),
+    SchluterSensorEntityDescription(
+        key="target-temperature",
+        name="Target Temperature",
+        device_class=SensorDeviceClass.TEMPERATURE,
+        native_unit_of_measurement=UnitOfTemperature.CELSIUS,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda thermostat: thermostat.set_point_temp,
+        source_fields=frozenset({"set_point_temp", "is_online"}),
+        deadband_option=CONF_TEMPERATURE_DEADBAND,
+    ),
+    SchluterSensorEntityDescription(
+        key="power",
+        name="Power",
+        device_class=SensorDeviceClass.POWER,
+        native_unit_of_measurement=UnitOfPower.WATT,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda thermostat: thermostat.power,
+        source_fields=frozenset({"is_heating", "load_measured_watt", "is_online"}),
+        deadband_option=CONF_POWER_DEADBAND,
+    ),
+    SchluterSensorEntityDescription(
+        key="monetary",
+        name="Price",
+        device_class=SensorDeviceClass.MONETARY,
+        native_unit_of_measurement="$/kWh",
+        value_fn=lambda thermostat: thermostat.kwh_charge,
+        source_fields=frozenset({"kwh_charge", "is_online"}),
+    ),
+)
+
+ENERGY_SENSOR = SensorEntityDescription(
+    key="energy",
+    name="Energy",
+    device_class=SensorDeviceClass.ENERGY,
+    native_unit_of_measurement=UnitOfEnergy.KILO_WATT_HOUR,
+    state_class=SensorStateClass.TOTAL_INCREASING,
+    suggested_display_precision=2,
+)
+
+COST_SENSOR = SensorEntityDescription(
+    key="cost",
+    name="Cost",
+    device_class=SensorDeviceClass.MONETARY,
+    state_class=SensorStateClass.TOTAL,
+    suggested_display_precision=2,
+)
+
+METRIC_SENSORS = (
+    SchluterMetricSensorEntityDescription(
+        key="last_success",
+        name="Last successful update",
+        device_class=SensorDeviceClass.TIMESTAMP,
+        value_fn=lambda coordinator: coordinator.metrics.last_success,
+    ),
+    SchluterMetricSensorEntityDescription(
+        key="poll_duration",
+        name="Last poll duration",
+        device_class=SensorDeviceClass.DURATION,
+        native_unit_of_measurement=UnitOfTime.SECONDS,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=_last_poll_duration,
+    ),
+    SchluterMetricSensorEntityDescription(
+        key="api_errors",
+        name="API errors",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        value_fn=lambda coordinator: coordinator.metrics.api_errors,
+    ),
+    SchluterMetricSensorEntityDescription(
+        key="session_renewals",
+        name="Session renewals",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        value_fn=lambda coordinator: coordinator.metrics.session_renewals,
+    ),
+    SchluterMetricSensorEntityDescription(
+        key="suppressed_writes",
+        name="Suppressed writes",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        value_fn=lambda coordinator: coordinator.metrics.suppressed_writes.total(),
+    ),
+    SchluterMetricSensorEntityDescription(
+        key="unchanged_responses",
+        name="Unchanged responses",
+        native_unit_of_measurement=PERCENTAGE,
+        state_class=SensorStateClass.MEASUREMENT,
+        suggested_display_precision=1,
+        value_fn=lambda coordinator: coordinator.metrics.fingerprint_hit_rate(
+            "responses"
+        ),
+    ),
+    SchluterMetricSensorEntityDescription(
+        key="unchanged_thermostats",
+        name="Unchanged thermostats",
+        native_unit_of_measurement=PERCENTAGE,
+        state_class=SensorStateClass.MEASUREMENT,
+        suggested_display_precision=1,
+        value_fn=lambda coordinator: coordinator.metrics.fingerprint_hit_rate(
+            "thermostats"
+        ),
+    ),
+    SchluterMetricSensorEntityDescription(
+        key="queued_commands",
+        name="Queued commands",
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda coordinator: len(coordinator.commands),
+    ),
+    SchluterMetricSensorEntityDescription(
+        key="oldest_queued_command",
+        name="Oldest queued command",
+        device_class=SensorDeviceClass.TIMESTAMP,
+        value_fn=lambda coordinator: coordinator.commands.oldest,
+    ),
+)
+
+
+ACCOUNT_SENSORS = (
+    SchluterAccountSensorEntityDescription(
+        key="total-power",
+        name="Total Power",
+        device_class=SensorDeviceClass.POWER,
+        native_unit_of_measurement=UnitOfPower.WATT,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda summary: summary.power,
+    ),
+    SchluterAccountSensorEntityDescription(
+        key="heating-floors",
+        name="Heating Floors",
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda summary: summary.heating,
+    ),
+    SchluterAccountSensorEntityDescription(
+        key="offline-floors",
+        name="Offline Floors",
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda summary: summary.offline,
+    ),
+    SchluterAccountSensorEntityDescription(
+        key="average-temperature",
+        name="Average Temperature",
+        device_class=SensorDeviceClass.TEMPERATURE,
+        native_unit_of_measurement=UnitOfTemperature.CELSIUS,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda summary: summary.average_temperature,
+    ),
+)
+
+RUNTIME_SENSORS = (
+    *(
+        SchluterRuntimeSensorEntityDescription(
+            key=f"duty-cycle-{window}",
+            name=f"Duty Cycle {window}",
+            native_unit_of_measurement=PERCENTAGE,
+            state_class=SensorStateClass.MEASUREMENT,
+            value_fn=_duty_cycle(window),
+        )
+        for window in ("1h", "24h", "7d")
+    ),
+    SchluterRuntimeSensorEntityDescription(
+        key="heating-today",
+        name="Heating Today",
+        device_class=SensorDeviceClass.DURATION,
+        native_unit_of_measurement=UnitOfTime.MINUTES,
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        value_fn=lambda runtime: round(runtime.heating_today / 60),
+    ),
+    SchluterRuntimeSensorEntityDescription(
+        key="average-power-24h",
+        name="Average Power 24h",
+        device_class=SensorDeviceClass.POWER,
+        native_unit_of_measurement=UnitOfPower.WATT,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=_average_power,
+    ),
+)
 
 
-class SchluterTargetTemperatureSensor(
-    SchluterEntity, SensorEntity
-):
-    """Representation of a Sensor."""
+async def async_setup_entry(hass, config_entry, async_add_entities):
+    """Add sensors for passed config_entry in HA."""
+    data: SchluterData = hass.data[DOMAIN][config_entry.entry_id]
+    coordinator = data.coordinator
+    entry_id = config_entry.entry_id
+    options = config_entry.options
+    deadbands = {
+        CONF_TEMPERATURE_DEADBAND: options.get(
+            CONF_TEMPERATURE_DEADBAND, DEFAULT_TEMPERATURE_DEADBAND
+        ),
+        CONF_POWER_DEADBAND: options.get(CONF_POWER_DEADBAND, DEFAULT_POWER_DEADBAND),
+    }
+    heartbeat = options.get(CONF_HEARTBEAT, DEFAULT_HEARTBEAT)
+    cost_cycle = options.get(CONF_COST_CYCLE, DEFAULT_COST_CYCLE)
+    currency = hass.config.currency
+
+    # Every sensor is added in one batch, the entity platform then registers
+    # and writes them together instead of once per sensor type
+    entities: list[SensorEntity] = []
+    for thermostat_id in coordinator.data:
+        entities.extend(
+            SchluterSensor(
+                coordinator,
+                thermostat_id,
+                description,
+                deadbands.get(description.deadband_option, 0),
+                heartbeat,
+            )
+            for description in THERMOSTAT_SENSORS
+        )
+        # The energy is integrated from the measured load
+        entities.append(SchluterEnergySensor(coordinator, thermostat_id, ENERGY_SENSOR))
+        entities.append(
+            SchluterCostSensor(
+                coordinator, thermostat_id, COST_SENSOR, cost_cycle, currency
+            )
+        )
+        # The heating runtime statistics are disabled by default
+        entities.extend(
+            SchluterRuntimeSensor(coordinator, thermostat_id, description)
+            for description in RUNTIME_SENSORS
+        )
+    # The totals of the account are computed once per refresh
+    entities.extend(
+        SchluterAccountSensor(coordinator, entry_id, description)
+        for description in ACCOUNT_SENSORS
+    )
+    entities.append(SchluterAccountEnergySensor(coordinator, entry_id))
+    entities.append(
+        SchluterAccountCostSensor(coordinator, entry_id, cost_cycle, currency)
+    )
+    # The runtime metrics of the account are disabled by default
+    entities.extend(
+        SchluterMetricSensor(coordinator, entry_id, description)
+        for description in METRIC_SENSORS
+    )
+    async_add_entities(entities)
 
-    _attr_native_unit_of_measurement = UnitOfTemperature.CELSIUS
-    _attr_device_class = SensorDeviceClass.TEMPERATURE
-    _attr_state_class = SensorStateClass.MEASUREMENT
+
+class SchluterThermostatSensor(SchluterEntity, SensorEntity):
+    """Sensor of a thermostat named and identified by its description."""
 
     def __init__(
         self,
-        coordinator: DataUpdateCoordinator[dict[str, dict[str, Thermostat]]],
+        coordinator: DataUpdateCoordinator[dict[str, SchluterThermostatView]],
         thermostat_id: str,
+        description: SensorEntityDescription,
     ) -> None:
         """Initialize the sensor."""
         super().__init__(coordinator, thermostat_id)
-        self._attr_name = coordinator.data[thermostat_id].name + " Target Temperature"
-        self._thermostat_id = thermostat_id
-        self._attr_unique_id = (
-            f"{coordinator.data[thermostat_id].name}-target-{self._attr_device_class}"
-        )
+        self.entity_description = description
+        name = coordinator.data[thermostat_id].name
+        self._attr_name = f"{name} {description.name}"
+        self._attr_unique_id = f"{name}-{description.key}"
 
-    @property
-    def device_info(self):
-        """Return information to link this entity."""
-        return {
-            "identifiers": {(DOMAIN, self._thermostat_id)},
-        }
 
-    @property
-    def native_value(self) -> float:
-        """Return the state of the sensor."""
-        return self.coordinator.data[self._thermostat_id].set_point_temp
+class SchluterSensor(SchluterThermostatSensor):
+    """Sensor that skips state writes within a deadband of the last write.
 
+    A value that stays within the deadband is still written once the
+    heartbeat is due. Changes of the availability or the stale flag are
+    always written.
+    """
 
-class SchluterTemperatureSensor(SchluterEntity, SensorEntity):
-    """Representation of a Sensor."""
-
-    _attr_native_unit_of_measurement = UnitOfTemperature.CELSIUS
-    _attr_device_class = SensorDeviceClass.TEMPERATURE
-    _attr_state_class = SensorStateClass.MEASUREMENT
+    entity_description: SchluterSensorEntityDescription
 
     def __init__(
         self,
-        coordinator: DataUpdateCoordinator[dict[str, dict[str, Thermostat]]],
+        coordinator: DataUpdateCoordinator[dict[str, SchluterThermostatView]],
         thermostat_id: str,
+        description: SchluterSensorEntityDescription,
+        deadband: float = 0,
+        heartbeat: float = DEFAULT_HEARTBEAT,
     ) -> None:
         """Initialize the sensor."""
-        super().__init__(coordinator, thermostat_id)
-        self._attr_name = coordinator.data[thermostat_id].name + " Current Temperature"
-        self._thermostat_id = thermostat_id
-        self._attr_unique_id = (
-            f"{coordinator.data[thermostat_id].name}-{self._attr_device_class}"
-        )
-
-    @property
-    def device_info(self):
-        """Return information to link this entity."""
-        return {
-            "identifiers": {(DOMAIN, self._thermostat_id)},
-        }
+        self._source_fields = description.source_fields
+        super().__init__(coordinator, thermostat_id, description)
+        self._deadband = deadband
+        self._heartbeat = heartbeat
+        # Availability, stale flag and value of the last state written
+        self._written: tuple[bool, bool, float | None] | None = None
+        self._written_at = 0.0
+        self._unsub_heartbeat: CALLBACK_TYPE | None = None
 
     @property
-    def native_value(self) -> float:
+    def native_value(self) -> float | int | None:
         """Return the state of the sensor."""
-        return self.coordinator.data[self._thermostat_id].temperature
+        return self.entity_description.value_fn(self._thermostat)
+
+    async def async_will_remove_from_hass(self) -> None:
+        """Cancel a pending heartbeat."""
+        await super().async_will_remove_from_hass()
+        self._cancel_heartbeat()
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Write the state unless it is still within the deadband."""
+        self._update_thermostat()
+        if not self._within_deadband():
+            super()._handle_coordinator_update()
+            return
+        self.coordinator.metrics.suppressed_writes[self.entity_description.key] += 1
+        if self._unsub_heartbeat is None:
+            self._unsub_heartbeat = async_call_later(
+                self.hass,
+                max(self._written_at + self._heartbeat - time.monotonic(), 0),
+                self._async_heartbeat,
+            )
+
+    def _within_deadband(self) -> bool:
+        if self._written is None:
+            return False
+        available, stale, value = self._written
+        current = self.native_value
+        return (
+            available == self.available
+            and stale == self.coordinator.is_stale
+            and value is not None
+            and current is not None
+            and abs(current - value) < self._deadband
+            and time.monotonic() - self._written_at < self._heartbeat
+        )
+
+    @callback
+    def _async_heartbeat(self, _now: datetime) -> None:
+        self._unsub_heartbeat = None
+        self.async_write_ha_state()
+
+    @callback
+    def _cancel_heartbeat(self) -> None:
+        if self._unsub_heartbeat is not None:
+            self._unsub_heartbeat()
+            self._unsub_heartbeat = None
 
+    @callback
+    def async_write_ha_state(self) -> None:
+        """Write the state and remember it as reference for the deadband."""
+        self._cancel_heartbeat()
+        self._written = (self.available, self.coordinator.is_stale, self.native_value)
+        self._written_at = time.monotonic()
+        super().async_write_ha_state()
 
-class SchluterPowerSensor(SchluterEntity, SensorEntity):
-    """Representation of a Sensor."""
 
-    _attr_native_unit_of_measurement = UnitOfPower.WATT
-    _attr_device_class = SensorDeviceClass.POWER
-    _attr_state_class = SensorStateClass.MEASUREMENT
+class SchluterEnergySensor(SchluterThermostatSensor, RestoreSensor):
+    """Energy used by the floor, integrated from the measured load."""
 
     def __init__(
         self,
-        coordinator: DataUpdateCoordinator[dict[str, dict[str, Thermostat]]],
+        coordinator: DataUpdateCoordinator[dict[str, SchluterThermostatView]],
         thermostat_id: str,
+        description: SensorEntityDescription,
     ) -> None:
         """Initialize the sensor."""
-        super().__init__(coordinator, thermostat_id)
-        self._attr_name = coordinator.data[thermostat_id].name + " Power"
-        self._thermostat_id = thermostat_id
-        self._attr_unique_id = (
-            f"{coordinator.data[thermostat_id].name}-{self._attr_device_class}"
-        )
+        super().__init__(coordinator, thermostat_id, description)
+        self._integrator = EnergyIntegrator()
+
+    async def async_added_to_hass(self) -> None:
+        """Restore the energy used before the restart."""
+        await super().async_added_to_hass()
+        if (
+            last_sensor_data := await self.async_get_last_sensor_data()
+        ) is not None and last_sensor_data.native_value is not None:
+            self._integrator.total = float(last_sensor_data.native_value)
+        self._add_sample()
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Integrate the power reported by the latest coordinator update."""
+        self._update_thermostat()
+        native_value = self._attr_native_value
+        self._add_sample()
+        if self._attr_native_value != native_value or _availability_changed(self):
+            super()._handle_coordinator_update()
+
+    def _add_sample(self) -> None:
+        if not self.available:
+            self._integrator.reset_sample()
+        else:
+            self._integrator.add(self._thermostat.power, time.monotonic())
+        self._attr_native_value = round(self._integrator.total, 3)
+
+
+class SchluterCostSensor(SchluterThermostatSensor, RestoreSensor):
+    """Cost of the floor in the current cycle, priced as the energy is used.
+
+    Every update integrates the energy since the previous update and adds
+    it at the price reported with the update.
+    """
 
-    @property
-    def device_info(self):
-        """Return information to link this entity."""
-        return {
-            "identifiers": {(DOMAIN, self._thermostat_id)},
-        }
+    def __init__(
+        self,
+        coordinator: DataUpdateCoordinator[dict[str, SchluterThermostatView]],
+        thermostat_id: str,
+        description: SensorEntityDescription,
+        cycle: str,
+        currency: str,
+    ) -> None:
+        """Initialize the sensor."""
+        super().__init__(coordinator, thermostat_id, description)
+        self._attr_native_unit_of_measurement = currency
+        self._integrator = EnergyIntegrator()
+        self._accumulator = CostAccumulator(cycle)
+
+    async def async_added_to_hass(self) -> None:
+        """Restore the cost of the cycle before the restart."""
+        await super().async_added_to_hass()
+        await _async_restore_cost(self, self._accumulator)
+        self._add_sample()
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Add the cost of the energy used since the previous update."""
+        self._update_thermostat()
+        native_value = self._attr_native_value
+        last_reset = self._attr_last_reset
+        self._add_sample()
+        if (
+            self._attr_native_value != native_value
+            or self._attr_last_reset != last_reset
+            or _availability_changed(self)
+        ):
+            super()._handle_coordinator_update()
+
+    def _add_sample(self) -> None:
+        cost = 0.0
+        if not self.available:
+            self._integrator.reset_sample()
+        else:
+            energy = self._integrator.add(self._thermostat.power, time.monotonic())
+            cost = energy * self._thermostat.kwh_charge
+        self._accumulator.add(cost, dt_util.utcnow())
+        self._attr_native_value = round(self._accumulator.total, 2)
+        self._attr_last_reset = self._accumulator.last_reset
+
+
+class SchluterAccountSensor(CoordinatorEntity, SensorEntity):
+    """Total of all thermostats of the account."""
+
+    entity_description: SchluterAccountSensorEntityDescription
+
+    def __init__(
+        self,
+        coordinator: DataUpdateCoordinator[dict[str, SchluterThermostatView]],
+        entry_id: str,
+        description: SchluterAccountSensorEntityDescription,
+    ) -> None:
+        """Initialize the sensor."""
+        super().__init__(coordinator)
+        self.entity_description = description
+        self._attr_name = f"Schluter {description.name}"
+        self._attr_unique_id = f"{entry_id}-{description.key}"
+        self._attr_native_value = description.value_fn(coordinator.summary)
 
     @property
-    def native_value(self) -> int:
-        """Return the state of the sensor."""
-        if self.coordinator.data[self._thermostat_id].is_heating:
-            return self.coordinator.data[self._thermostat_id].load_measured_watt
-        return ZERO_WATTS
+    def available(self) -> bool:
+        """Return True while the thermostats may be served."""
+        return self.coordinator.data_available
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Write the state when the total or availability changed."""
+        native_value = self._attr_native_value
+        self._attr_native_value = self.entity_description.value_fn(
+            self.coordinator.summary
+        )
+        if self._attr_native_value != native_value or _availability_changed(self):
+            super()._handle_coordinator_update()
 
 
-class SchluterEnergySensor(SchluterEntity, SensorEntity):
-    """Representation of a PowerSensor."""
+class SchluterAccountEnergySensor(CoordinatorEntity, RestoreSensor):
+    """Energy used by all floors, integrated from their total power."""
 
     _attr_native_unit_of_measurement = UnitOfEnergy.KILO_WATT_HOUR
     _attr_device_class = SensorDeviceClass.ENERGY
     _attr_state_class = SensorStateClass.TOTAL_INCREASING
+    _attr_suggested_display_precision = 2
 
     def __init__(
         self,
-        coordinator: DataUpdateCoordinator[dict[str, dict[str, Thermostat]]],
-        thermostat_id: str,
-        values=60,
+        coordinator: DataUpdateCoordinator[dict[str, SchluterThermostatView]],
+        entry_id: str,
     ) -> None:
         """Initialize the sensor."""
-        super().__init__(coordinator, thermostat_id)
-        self._attr_name = coordinator.data[thermostat_id].name + " Energy"
-        self._thermostat_id = thermostat_id
-        self._attr_unique_id = (
-            f"{coordinator.data[thermostat_id].name}-{self._attr_device_class}"
-        )
-        self._wattage_list = []
-        self._values = values
-
-    def add(self, watt):
-        """Queue a number wattage for kwh calculation."""
-        self._wattage_list.insert(0, watt)
-        if len(self._wattage_list) == self._values:
-            self._wattage_list.pop()
+        super().__init__(coordinator)
+        self._attr_name = "Schluter Total Energy"
+        self._attr_unique_id = f"{entry_id}-total-energy"
+        self._integrator = EnergyIntegrator()
 
     @property
-    def device_info(self):
-        """Return information to link this entity."""
-        return {
-            "identifiers": {(DOMAIN, self._thermostat_id)},
-        }
+    def available(self) -> bool:
+        """Return True while the thermostats may be served."""
+        return self.coordinator.data_available
+
+    async def async_added_to_hass(self) -> None:
+        """Restore the energy used before the restart."""
+        await super().async_added_to_hass()
+        if (
+            last_sensor_data := await self.async_get_last_sensor_data()
+        ) is not None and last_sensor_data.native_value is not None:
+            self._integrator.total = float(last_sensor_data.native_value)
+        self._add_sample()
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Integrate the total power reported by the latest coordinator update."""
+        native_value = self._attr_native_value
+        self._add_sample()
+        if self._attr_native_value != native_value or _availability_changed(self):
+            super()._handle_coordinator_update()
+
+    def _add_sample(self) -> None:
+        if not self.available:
+            self._integrator.reset_sample()
+        else:
+            self._integrator.add(self.coordinator.summary.power, time.monotonic())
+        self._attr_native_value = round(self._integrator.total, 3)
+
+
+class SchluterAccountCostSensor(CoordinatorEntity, RestoreSensor):
+    """Cost of all floors in the current cycle, from their priced power."""
+
+    _attr_device_class = SensorDeviceClass.MONETARY
+    _attr_state_class = SensorStateClass.TOTAL
+    _attr_suggested_display_precision = 2
+
+    def __init__(
+        self,
+        coordinator: DataUpdateCoordinator[dict[str, SchluterThermostatView]],
+        entry_id: str,
+        cycle: str,
+        currency: str,
+    ) -> None:
+        """Initialize the sensor."""
+        super().__init__(coordinator)
+        self._attr_name = "Schluter Total Cost"
+        self._attr_unique_id = f"{entry_id}-total-cost"
+        self._attr_native_unit_of_measurement = currency
+        self._integrator = EnergyIntegrator()
+        self._accumulator = CostAccumulator(cycle)
 
     @property
-    def native_value(self) -> float:
-        """Return the state of the sensor."""
-        if self.coordinator.data[self._thermostat_id].is_heating:
-            self.add(self.coordinator.data[self._thermostat_id].load_measured_watt)
-        return round((sum(self._wattage_list) / self._values) / 1000, 2)
+    def available(self) -> bool:
+        """Return True while the thermostats may be served."""
+        return self.coordinator.data_available
+
+    async def async_added_to_hass(self) -> None:
+        """Restore the cost of the cycle before the restart."""
+        await super().async_added_to_hass()
+        await _async_restore_cost(self, self._accumulator)
+        self._add_sample()
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Add the cost of the energy used since the previous update."""
+        native_value = self._attr_native_value
+        last_reset = self._attr_last_reset
+        self._add_sample()
+        if (
+            self._attr_native_value != native_value
+            or self._attr_last_reset != last_reset
+            or _availability_changed(self)
+        ):
+            super()._handle_coordinator_update()
+
+    def _add_sample(self) -> None:
+        cost = 0.0
+        if not self.available:
+            self._integrator.reset_sample()
+        else:
+            # The priced power integrates to the cost directly
+            cost = self._integrator.add(
+                self.coordinator.summary.priced_power, time.monotonic()
+            )
+        self._accumulator.add(cost, dt_util.utcnow())
+        self._attr_native_value = round(self._accumulator.total, 2)
+        self._attr_last_reset = self._accumulator.last_reset
+
+
+class SchluterRuntimeSensor(SchluterThermostatSensor):
+    """Heating runtime statistic kept by the coordinator in constant time."""
+
+    entity_description: SchluterRuntimeSensorEntityDescription
+    _attr_entity_registry_enabled_default = False
 
+    def __init__(
+        self,
+        coordinator: DataUpdateCoordinator[dict[str, SchluterThermostatView]],
+        thermostat_id: str,
+        description: SchluterRuntimeSensorEntityDescription,
+    ) -> None:
+        """Initialize the sensor."""
+        super().__init__(coordinator, thermostat_id, description)
+        self._attr_native_value = self._runtime_value()
 
-class SchluterEnergyPriceSensor(SchluterEntity, SensorEntity):
-    """Representation of a Sensor."""
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Write the state when the rounded statistic or availability changed."""
+        self._update_thermostat()
+        native_value = self._attr_native_value
+        self._attr_native_value = self._runtime_value()
+        if self._attr_native_value != native_value or _availability_changed(self):
+            super()._handle_coordinator_update()
+
+    def _runtime_value(self) -> float | None:
+        if (runtime := self.coordinator.runtime.get(self._thermostat_id)) is None:
+            return None
+        return self.entity_description.value_fn(runtime)
 
-    _attr_native_unit_of_measurement = "$/kWh"
-    _attr_device_class = SensorDeviceClass.MONETARY
-    _attr_state_class = SensorStateClass.TOTAL_INCREASING
+
+class SchluterMetricSensor(CoordinatorEntity, SensorEntity):
+    """Runtime metric of the account, updated after every poll.
+
+    Entities are not notified of refreshes that returned the very same
+    thermostats, while the metrics change with every poll. The sensor is
+    written by a refresh listener of the coordinator instead.
+    """
+
+    coordinator: SchluterDataUpdateCoordinator
+    entity_description: SchluterMetricSensorEntityDescription
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_entity_registry_enabled_default = False
 
     def __init__(
         self,
-        coordinator: DataUpdateCoordinator[dict[str, dict[str, Thermostat]]],
-        thermostat_id: str,
+        coordinator: SchluterDataUpdateCoordinator,
+        entry_id: str,
+        description: SchluterMetricSensorEntityDescription,
     ) -> None:
         """Initialize the sensor."""
-        super().__init__(coordinator, thermostat_id)
-        self._attr_name = coordinator.data[thermostat_id].name + " Price"
-        self._thermostat_id = thermostat_id
-        self._attr_unique_id = (
-            f"{coordinator.data[thermostat_id].name}-{self._attr_device_class}"
+        super().__init__(coordinator)
+        self.entity_description = description
+        self._attr_name = f"Schluter {description.name}"
+        self._attr_unique_id = f"{entry_id}-{description.key}"
+
+    async def async_added_to_hass(self) -> None:
+        """Write the metrics after every refresh."""
+        await super().async_added_to_hass()
+        self.async_on_remove(
+            self.coordinator.async_add_refresh_listener(self.async_write_ha_state)
         )
 
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Leave the update to the refresh listener."""
+
     @property
-    def device_info(self):
-        """Return information to link this entity."""
-        return {
-            "identifiers": {(DOMAIN, self._thermostat_id)},
-        }
+    def available(self) -> bool:
+        """Return True, the metrics are most useful while polls fail."""
+        return True
 
     @property
-    def native_value(self) -> float:
+    def native_value(self) -> float | int | datetime | None:
         """Return the state of the sensor."""
-        return self.coordinator.data[self._thermostat_id].kwh_charge
+        return self.entity_description.value_fn(self.coordinator)
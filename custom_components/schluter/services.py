@@ -0,0 +1,260 @@
+"""Services of the schluter integration."""
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Awaitable, Callable
+from datetime import datetime
+import logging
+from typing import Any
+
+from aioschluter.const import (
+    REGULATION_MODE_AWAY,
+    REGULATION_MODE_MANUAL,
+    REGULATION_MODE_SCHEDULE,
+)
+import voluptuous as vol
+
+from homeassistant.components.climate import DOMAIN as CLIMATE_DOMAIN
+from homeassistant.const import ATTR_ENTITY_ID, ATTR_TEMPERATURE
+from homeassistant.core import (
+    HomeAssistant,
+    ServiceCall,
+    ServiceResponse,
+    SupportsResponse,
+)
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers import config_validation as cv, entity_registry as er
+from homeassistant.helpers.event import async_call_later
+from homeassistant.util import dt as dt_util
+
+from .const import (
+    BULK_WRITE_CONCURRENCY,
+    DEFAULT_PROFILE_CYCLES,
+    DEFAULT_TRACE_DURATION,
+    DOMAIN,
+)
+from .model import SchluterThermostatView
+from .profiler import SchluterProfiler
+from .trace import SchluterTraceRecorder
+from .write_queue import SchluterWriteQueue
+
+_LOGGER = logging.getLogger(__name__)
+
+SERVICE_SET_TEMPERATURES = "set_temperatures"
+SERVICE_SET_REGULATION_MODES = "set_regulation_modes"
+SERVICE_RECORD_TRACE = "record_trace"
+SERVICE_PROFILE = "profile"
+
+DATA_TRACE = f"{DOMAIN}_trace"
+DATA_PROFILE = f"{DOMAIN}_profile"
+
+ATTR_REGULATION_MODE = "regulation_mode"
+ATTR_DURATION = "duration"
+ATTR_CYCLES = "cycles"
+
+REGULATION_MODES = {
+    "schedule": REGULATION_MODE_SCHEDULE,
+    "manual": REGULATION_MODE_MANUAL,
+    "away": REGULATION_MODE_AWAY,
+}
+
+SET_TEMPERATURES_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_ENTITY_ID): cv.comp_entity_ids,
+        vol.Required(ATTR_TEMPERATURE): vol.Coerce(float),
+    }
+)
+SET_REGULATION_MODES_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_ENTITY_ID): cv.comp_entity_ids,
+        vol.Required(ATTR_REGULATION_MODE): vol.In(REGULATION_MODES),
+    }
+)
+
+RECORD_TRACE_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_DURATION, default=DEFAULT_TRACE_DURATION): vol.All(
+            vol.Coerce(int), vol.Range(min=1, max=86400)
+        ),
+    }
+)
+PROFILE_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_CYCLES, default=DEFAULT_PROFILE_CYCLES): vol.All(
+            vol.Coerce(int), vol.Range(min=1, max=100)
+        ),
+    }
+)
+
+
+def async_setup_services(hass: HomeAssistant) -> None:
+    """Register the bulk services of the schluter integration."""
+
+    async def async_set_temperatures(call: ServiceCall) -> ServiceResponse:
+        temperature: float = call.data[ATTR_TEMPERATURE]
+
+        def _write(
+            queue: SchluterWriteQueue, thermostat: SchluterThermostatView
+        ) -> Awaitable[None]:
+            if not thermostat.min_temp <= temperature <= thermostat.max_temp:
+                raise HomeAssistantError(
+                    f"{temperature} is outside of {thermostat.min_temp}"
+                    f" - {thermostat.max_temp}"
+                )
+            return queue.async_write(temperature=temperature)
+
+        return await _async_write_thermostats(hass, call, _write)
+
+    async def async_set_regulation_modes(call: ServiceCall) -> ServiceResponse:
+        regulation_mode = REGULATION_MODES[call.data[ATTR_REGULATION_MODE]]
+
+        def _write(
+            queue: SchluterWriteQueue, thermostat: SchluterThermostatView
+        ) -> Awaitable[None]:
+            return queue.async_write(regulation_mode=regulation_mode)
+
+        return await _async_write_thermostats(hass, call, _write)
+
+    async def async_record_trace(call: ServiceCall) -> ServiceResponse:
+        if DATA_TRACE in hass.data:
+            raise HomeAssistantError("A trace is already being recorded")
+        clients = [data.api for data in hass.data.get(DOMAIN, {}).values()]
+        if not clients:
+            raise HomeAssistantError("No Schluter account is loaded")
+
+        path = hass.config.path(
+            f"schluter_trace_{dt_util.utcnow():%Y%m%d%H%M%S}.jsonl"
+        )
+        recorder = SchluterTraceRecorder(path)
+        for client in clients:
+            client.recorder = recorder
+
+        async def _async_stop(_now: datetime) -> None:
+            for client in clients:
+                if client.recorder is recorder:
+                    client.recorder = None
+            hass.data.pop(DATA_TRACE, None)
+            calls = len(recorder)
+            await recorder.async_save(hass)
+            _LOGGER.info("Recorded %s Schluter API calls to %s", calls, path)
+
+        hass.data[DATA_TRACE] = async_call_later(
+            hass, call.data[ATTR_DURATION], _async_stop
+        )
+        _LOGGER.info("Recording Schluter API calls to %s", path)
+        if call.return_response:
+            return {"path": path}
+        return None
+
+    async def async_profile(call: ServiceCall) -> ServiceResponse:
+        if DATA_PROFILE in hass.data:
+            raise HomeAssistantError("A profile is already being recorded")
+        coordinators = [
+            data.coordinator for data in hass.data.get(DOMAIN, {}).values()
+        ]
+        if not coordinators:
+            raise HomeAssistantError("No Schluter account is loaded")
+
+        profiler = SchluterProfiler(
+            hass,
+            coordinators,
+            call.data[ATTR_CYCLES],
+            hass.config.path(f"schluter_profile_{dt_util.utcnow():%Y%m%d%H%M%S}"),
+            lambda: hass.data.pop(DATA_PROFILE, None),
+        )
+        profiler.async_start()
+        hass.data[DATA_PROFILE] = profiler
+        if call.return_response:
+            return {"profile": profiler.profile_path, "summary": profiler.summary_path}
+        return None
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_SET_TEMPERATURES,
+        async_set_temperatures,
+        schema=SET_TEMPERATURES_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_SET_REGULATION_MODES,
+        async_set_regulation_modes,
+        schema=SET_REGULATION_MODES_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_RECORD_TRACE,
+        async_record_trace,
+        schema=RECORD_TRACE_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_PROFILE,
+        async_profile,
+        schema=PROFILE_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+
+
+async def _async_write_thermostats(
+    hass: HomeAssistant,
+    call: ServiceCall,
+    write: Callable[[SchluterWriteQueue, SchluterThermostatView], Awaitable[None]],
+) -> ServiceResponse:
+    """Write many thermostats with bounded concurrency and refresh once.
+
+    Every thermostat gets its own result, a failed thermostat does not stop
+    the others. Each account is refreshed once after all its writes, unless
+    none of them succeeded.
+    """
+    registry = er.async_get(hass)
+    semaphore = asyncio.Semaphore(BULK_WRITE_CONCURRENCY)
+    results: dict[str, dict[str, Any]] = {}
+    coordinators: dict[str, Any] = {}
+
+    async def _async_write_one(entity_id: str) -> None:
+        try:
+            entry = registry.async_get(entity_id)
+            if (
+                entry is None
+                or entry.platform != DOMAIN
+                or entry.domain != CLIMATE_DOMAIN
+                or (data := hass.data.get(DOMAIN, {}).get(entry.config_entry_id))
+                is None
+                or (thermostat := data.coordinator.data.get(entry.unique_id)) is None
+            ):
+                raise HomeAssistantError("Not a loaded Schluter thermostat")
+            async with semaphore:
+                await write(
+                    data.coordinator.async_get_write_queue(thermostat.serial_number),
+                    thermostat,
+                )
+        except Exception as err:  # pylint: disable=broad-except
+            results[entity_id] = {"success": False, "error": str(err) or repr(err)}
+            return
+        results[entity_id] = {"success": True}
+        # Only accounts with a change to confirm are refreshed
+        coordinators[entry.config_entry_id] = data.coordinator
+
+    await asyncio.gather(
+        *(_async_write_one(entity_id) for entity_id in call.data[ATTR_ENTITY_ID])
+    )
+
+    for coordinator in coordinators.values():
+        coordinator.async_note_write()
+    await asyncio.gather(
+        *(coordinator.async_refresh() for coordinator in coordinators.values())
+    )
+
+    failed = [
+        entity_id for entity_id, result in results.items() if not result["success"]
+    ]
+    if failed:
+        _LOGGER.warning("Could not update %s", ", ".join(failed))
+        if not call.return_response:
+            raise HomeAssistantError(f"Could not update {', '.join(failed)}")
+    if call.return_response:
+        return {"thermostats": results}
+    return None
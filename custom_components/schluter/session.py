@@ -0,0 +1,204 @@
+"""Session handling for the Schluter cloud."""
+from __future__ import annotations
+
+import asyncio
+from datetime import datetime
+import logging
+from typing import Any
+
+from aioschluter import SchluterApi
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.event import async_call_later, async_track_point_in_utc_time
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util
+
+from .const import (
+    DOMAIN,
+    SESSION_LIFETIME,
+    SESSION_RENEW_MARGIN,
+    SESSION_RENEW_RETRY,
+    SESSION_STORAGE_KEY,
+    SESSION_STORAGE_VERSION,
+)
+from .metrics import SchluterMetrics
+
+_LOGGER = logging.getLogger(__name__)
+
+DATA_SESSION_STORE = f"{DOMAIN}_session_store"
+
+
+class SchluterSessionStore:
+    """Session IDs of all Schluter accounts, persisted across restarts."""
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the session store."""
+        self._store: Store[dict[str, dict[str, Any]]] = Store(
+            hass, SESSION_STORAGE_VERSION, SESSION_STORAGE_KEY
+        )
+        self._sessions: dict[str, dict[str, Any]] | None = None
+        self._lock = asyncio.Lock()
+
+    async def _async_load(self) -> dict[str, dict[str, Any]]:
+        async with self._lock:
+            if self._sessions is None:
+                self._sessions = await self._store.async_load() or {}
+        return self._sessions
+
+    async def async_get(self, username: str) -> tuple[str, datetime] | None:
+        """Return the cached session ID and its creation time."""
+        sessions = await self._async_load()
+        if (session := sessions.get(username)) is None:
+            return None
+        if (timestamp := dt_util.parse_datetime(session["timestamp"])) is None:
+            return None
+        return session["session_id"], timestamp
+
+    async def async_save(
+        self, username: str, sessionid: str, timestamp: datetime
+    ) -> None:
+        """Cache a new session ID."""
+        sessions = await self._async_load()
+        sessions[username] = {
+            "session_id": sessionid,
+            "timestamp": timestamp.isoformat(),
+        }
+        await self._store.async_save(sessions)
+
+    async def async_remove(self, username: str) -> None:
+        """Forget the session of an account."""
+        sessions = await self._async_load()
+        if sessions.pop(username, None) is not None:
+            await self._store.async_save(sessions)
+
+
+@callback
+def async_get_session_store(hass: HomeAssistant) -> SchluterSessionStore:
+    """Return the session store shared by all Schluter accounts."""
+    if (store := hass.data.get(DATA_SESSION_STORE)) is None:
+        store = hass.data[DATA_SESSION_STORE] = SchluterSessionStore(hass)
+    return store
+
+
+class SchluterSession:
+    """Keep a valid session ID for one Schluter account.
+
+    The session ID is restored from the store, renewed in the background
+    before it expires and every caller that needs a new one shares the
+    same login request.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        api: SchluterApi,
+        metrics: SchluterMetrics,
+        username: str,
+        password: str,
+    ) -> None:
+        """Initialize the session."""
+        self._hass = hass
+        self._api = api
+        self._metrics = metrics
+        self._store = async_get_session_store(hass)
+        self._username = username
+        self._password = password
+        self._sessionid: str | None = None
+        self._timestamp: datetime | None = None
+        self._login_task: asyncio.Task[str] | None = None
+        self._unsub_renew: CALLBACK_TYPE | None = None
+
+    @property
+    def sessionid(self) -> str | None:
+        """Return the current session ID."""
+        return self._sessionid
+
+    @property
+    def expires(self) -> datetime | None:
+        """Return when the current session ID expires."""
+        if self._timestamp is None:
+            return None
+        return self._timestamp + SESSION_LIFETIME
+
+    @property
+    def is_valid(self) -> bool:
+        """Return True while the current session ID has not expired."""
+        expires = self.expires
+        return (
+            self._sessionid is not None
+            and expires is not None
+            and dt_util.utcnow() < expires
+        )
+
+    async def async_load(self) -> None:
+        """Restore the session ID cached by a previous run or the config flow."""
+        if (cached := await self._store.async_get(self._username)) is None:
+            return
+        self._sessionid, self._timestamp = cached
+        if self.is_valid:
+            _LOGGER.debug("Restored Schluter session of %s", self._username)
+            self._schedule_renewal()
+
+    async def async_get_sessionid(self) -> str:
+        """Return a valid session ID, logging in only when there is none."""
+        if self.is_valid:
+            return self._sessionid
+        return await self.async_renew()
+
+    async def async_renew(self, rejected_sessionid: str | None = None) -> str:
+        """Log in again, sharing one login between all concurrent callers.
+
+        When a caller passes the session ID the cloud rejected and another
+        caller already replaced it, the newer session ID is returned instead.
+        """
+        if (
+            rejected_sessionid is not None
+            and self._sessionid != rejected_sessionid
+            and self.is_valid
+        ):
+            return self._sessionid
+        if self._login_task is None or self._login_task.done():
+            self._login_task = self._hass.async_create_background_task(
+                self._async_login(), name=f"{DOMAIN} login {self._username}"
+            )
+        return await asyncio.shield(self._login_task)
+
+    @callback
+    def async_shutdown(self) -> None:
+        """Stop renewing the session."""
+        if self._unsub_renew is not None:
+            self._unsub_renew()
+            self._unsub_renew = None
+
+    async def _async_login(self) -> str:
+        with self._metrics.phase("login"), self._metrics.api_call("login"):
+            sessionid = await self._api.async_get_sessionid(
+                self._username,
+                self._password,
+            )
+        if self._sessionid is not None:
+            self._metrics.session_renewals += 1
+        self._sessionid = sessionid
+        self._timestamp = dt_util.utcnow()
+        await self._store.async_save(self._username, sessionid, self._timestamp)
+        self._schedule_renewal()
+        return sessionid
+
+    @callback
+    def _schedule_renewal(self) -> None:
+        self.async_shutdown()
+        self._unsub_renew = async_track_point_in_utc_time(
+            self._hass,
+            self._async_scheduled_renewal,
+            self.expires - SESSION_RENEW_MARGIN,
+        )
+
+    async def _async_scheduled_renewal(self, _now: datetime) -> None:
+        self._unsub_renew = None
+        try:
+            await self.async_renew()
+        except Exception as err:  # pylint: disable=broad-except
+            _LOGGER.warning("Renewing Schluter session failed: %s", err)
+            self._unsub_renew = async_call_later(
+                self._hass, SESSION_RENEW_RETRY, self._async_scheduled_renewal
+            )
@@ -0,0 +1,75 @@
+"""Persist the last known thermostat state of a Schluter account."""
+from __future__ import annotations
+
+from datetime import datetime
+import logging
+from typing import Any
+
+from aioschluter import Thermostat
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util
+
+from .const import SNAPSHOT_SAVE_DELAY, SNAPSHOT_STORAGE_KEY, SNAPSHOT_STORAGE_VERSION
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class SchluterSnapshotStore:
+    """Raw thermostat payloads of the last successful refresh of an entry."""
+
+    def __init__(self, hass: HomeAssistant, entry_id: str) -> None:
+        """Initialize the snapshot store."""
+        self._store: Store[dict[str, Any]] = Store(
+            hass, SNAPSHOT_STORAGE_VERSION, f"{SNAPSHOT_STORAGE_KEY}.{entry_id}"
+        )
+        self._payloads: dict[str, dict[str, Any]] = {}
+        self._timestamp: datetime | None = None
+        self._save_pending = False
+
+    async def async_load(self) -> tuple[dict[str, Thermostat], datetime] | None:
+        """Return the saved thermostats and when they were fetched."""
+        if (snapshot := await self._store.async_load()) is None:
+            return None
+        try:
+            timestamp = dt_util.parse_datetime(snapshot["timestamp"])
+            thermostats = {
+                serial_number: Thermostat(payload)
+                for serial_number, payload in snapshot["thermostats"].items()
+            }
+        except (KeyError, TypeError, ValueError):
+            _LOGGER.warning("Ignoring invalid thermostat snapshot")
+            return None
+        if timestamp is None or not thermostats:
+            return None
+        return thermostats, timestamp
+
+    @callback
+    def async_delay_save(
+        self, payloads: dict[str, dict[str, Any]], timestamp: datetime
+    ) -> None:
+        """Save the payloads of a refresh, coalescing frequent saves.
+
+        The save is not postponed by later refreshes, which would keep it
+        from happening while they come in more often than the delay.
+        """
+        self._payloads = payloads
+        self._timestamp = timestamp
+        if self._save_pending:
+            return
+        self._save_pending = True
+        self._store.async_delay_save(self._data_to_save, SNAPSHOT_SAVE_DELAY)
+
+    async def async_remove(self) -> None:
+        """Delete the snapshot of a removed entry."""
+        await self._store.async_remove()
+
+    @callback
+    def _data_to_save(self) -> dict[str, Any]:
+        assert self._timestamp is not None
+        self._save_pending = False
+        return {
+            "timestamp": self._timestamp.isoformat(),
+            "thermostats": self._payloads,
+        }
@@ -0,0 +1,197 @@
+"""Import hourly energy and cost statistics of the Schluter thermostats."""
+from __future__ import annotations
+
+import asyncio
+from datetime import datetime
+import logging
+from typing import Any
+
+from homeassistant.components.recorder import get_instance
+from homeassistant.components.recorder.models import StatisticData, StatisticMetaData
+from homeassistant.components.recorder.statistics import (
+    async_add_external_statistics,
+    get_last_statistics,
+)
+from homeassistant.const import UnitOfEnergy
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util
+
+from .const import (
+    DOMAIN,
+    STATISTICS_IMPORT_CHUNK,
+    STATISTICS_MAX_PENDING_HOURS,
+    STATISTICS_SAVE_DELAY,
+    STATISTICS_STORAGE_KEY,
+    STATISTICS_STORAGE_VERSION,
+)
+from .energy import EnergyIntegrator
+from .model import SchluterThermostatView
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def statistic_id(kind: str, serial_number: str) -> str:
+    """Return the ID of the external statistic of a thermostat."""
+    return f"{DOMAIN}:{kind}_{serial_number.lower()}"
+
+
+class SchluterStatisticsImporter:
+    """Buffer energy and cost per hour and import them in bulk.
+
+    The energy is integrated from the polled power like the energy sensor,
+    summed per thermostat and hour and kept in a store until the hour is
+    over. Completed hours are then added as external statistics, many
+    hours per recorder call, so hours buffered while the recorder was not
+    available are filled in afterwards.
+    """
+
+    def __init__(self, hass: HomeAssistant, entry_id: str) -> None:
+        """Initialize the importer."""
+        self.hass = hass
+        self._store: Store[dict[str, Any]] = Store(
+            hass, STATISTICS_STORAGE_VERSION, f"{STATISTICS_STORAGE_KEY}.{entry_id}"
+        )
+        self._integrators: dict[str, EnergyIntegrator] = {}
+        # Energy in kWh and cost per thermostat and start of the hour
+        self._pending: dict[str, dict[str, list[float]]] = {}
+        self._names: dict[str, str] = {}
+        # Start of the last imported hour and the sums up to it per statistic
+        self._sums: dict[str, tuple[str, float]] = {}
+        self._import_lock = asyncio.Lock()
+
+    async def async_load(self) -> None:
+        """Restore the hours buffered before the restart."""
+        if (data := await self._store.async_load()) is None:
+            return
+        try:
+            self._pending = data["pending"]
+            self._names = data["names"]
+            self._sums = {
+                statistic: (start, total)
+                for statistic, (start, total) in data["sums"].items()
+            }
+        except (KeyError, TypeError, ValueError):
+            _LOGGER.warning("Ignoring invalid buffered statistics")
+            self._pending, self._names, self._sums = {}, {}, {}
+
+    @callback
+    def async_add(
+        self, data: dict[str, SchluterThermostatView], timestamp: datetime
+    ) -> None:
+        """Add the thermostats of a refresh to the hour they were polled in."""
+        posix = timestamp.timestamp()
+        hour = timestamp.replace(minute=0, second=0, microsecond=0).isoformat()
+        for serial_number, thermostat in data.items():
+            if (integrator := self._integrators.get(serial_number)) is None:
+                integrator = self._integrators[serial_number] = EnergyIntegrator()
+            if not thermostat.is_online:
+                integrator.reset_sample()
+                continue
+            energy = integrator.add(thermostat.power, posix)
+            self._names[serial_number] = thermostat.name
+            hours = self._pending.setdefault(serial_number, {})
+            bucket = hours.setdefault(hour, [0.0, 0.0])
+            bucket[0] += energy
+            bucket[1] += energy * thermostat.kwh_charge
+            if len(hours) > STATISTICS_MAX_PENDING_HOURS:
+                del hours[min(hours)]
+        self._store.async_delay_save(self._data_to_save, STATISTICS_SAVE_DELAY)
+
+    def has_completed_hours(self, now: datetime) -> bool:
+        """Return True when hours before the current one wait to be imported."""
+        hour = now.replace(minute=0, second=0, microsecond=0).isoformat()
+        return any(
+            start < hour for hours in self._pending.values() for start in hours
+        )
+
+    async def async_import(self, now: datetime | None = None) -> None:
+        """Import every completed hour into the recorder."""
+        if "recorder" not in self.hass.config.components:
+            return
+        now = now or dt_util.utcnow()
+        hour = now.replace(minute=0, second=0, microsecond=0).isoformat()
+        async with self._import_lock:
+            for serial_number, hours in self._pending.items():
+                completed = sorted(start for start in hours if start < hour)
+                if not completed:
+                    continue
+                rows = [(start, *hours[start]) for start in completed]
+                name = self._names.get(serial_number, serial_number)
+                await self._async_import_statistic(
+                    statistic_id("energy", serial_number),
+                    f"{name} Energy",
+                    UnitOfEnergy.KILO_WATT_HOUR,
+                    [(start, energy) for start, energy, _ in rows],
+                )
+                await self._async_import_statistic(
+                    statistic_id("cost", serial_number),
+                    f"{name} Cost",
+                    self.hass.config.currency,
+                    [(start, cost) for start, _, cost in rows],
+                )
+                for start in completed:
+                    del hours[start]
+            self._store.async_delay_save(self._data_to_save, STATISTICS_SAVE_DELAY)
+
+    async def async_save(self) -> None:
+        """Save the buffered hours right away."""
+        await self._store.async_save(self._data_to_save())
+
+    async def async_remove(self) -> None:
+        """Delete the buffered hours of a removed entry."""
+        await self._store.async_remove()
+
+    async def _async_import_statistic(
+        self,
+        statistic: str,
+        name: str,
+        unit: str,
+        rows: list[tuple[str, float]],
+    ) -> None:
+        if (last := self._sums.get(statistic)) is None:
+            last = await self._async_get_last_sum(statistic)
+        last_start, total = last
+        metadata = StatisticMetaData(
+            has_mean=False,
+            has_sum=True,
+            name=name,
+            source=DOMAIN,
+            statistic_id=statistic,
+            unit_of_measurement=unit,
+        )
+        statistics: list[StatisticData] = []
+        for start, value in rows:
+            # An hour imported before the restart is not added twice
+            if start <= last_start:
+                continue
+            total += value
+            statistics.append(
+                StatisticData(
+                    start=dt_util.parse_datetime(start), state=total, sum=total
+                )
+            )
+            last_start = start
+        for chunk in range(0, len(statistics), STATISTICS_IMPORT_CHUNK):
+            async_add_external_statistics(
+                self.hass, metadata, statistics[chunk : chunk + STATISTICS_IMPORT_CHUNK]
+            )
+        self._sums[statistic] = (last_start, total)
+
+    async def _async_get_last_sum(self, statistic: str) -> tuple[str, float]:
+        last = await get_instance(self.hass).async_add_executor_job(
+            get_last_statistics, self.hass, 1, statistic, True, {"sum"}
+        )
+        if not (rows := last.get(statistic)):
+            return "", 0.0
+        start = dt_util.utc_from_timestamp(rows[0]["start"])
+        return start.isoformat(), rows[0].get("sum") or 0.0
+
+    @callback
+    def _data_to_save(self) -> dict[str, Any]:
+        return {
+            "pending": self._pending,
+            "names": self._names,
+            "sums": self._sums,
+        }
+
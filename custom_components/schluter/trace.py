@@ -0,0 +1,89 @@
+"""Record the traffic with the Schluter cloud into a redacted JSONL trace."""
+from __future__ import annotations
+
+import json
+import re
+import time
+from typing import Any
+
+from homeassistant.core import HomeAssistant
+
+REDACTED = "**REDACTED**"
+
+# Thermostat payload fields that identify the owner of the account
+REDACTED_FIELDS = ("Email",)
+
+# aiohttp errors quote the request URL, which carries the session ID
+_URL_QUERY = re.compile(r"(https?://[^\s?'\"]*)\?[^\s'\"]*")
+_SESSION_ID = re.compile(r"(sessionid=)[^&\s'\"]+", re.IGNORECASE)
+
+
+def redact_payload(payload: dict[str, Any]) -> dict[str, Any]:
+    """Return a thermostat payload without personal data."""
+    return {
+        key: REDACTED if key in REDACTED_FIELDS else value
+        for key, value in payload.items()
+    }
+
+
+def redact_message(message: str) -> str:
+    """Return an error message without URL queries and session IDs."""
+    return _SESSION_ID.sub(rf"\1{REDACTED}", _URL_QUERY.sub(r"\1", message))
+
+
+class SchluterTraceRecorder:
+    """Collect the calls made to the Schluter cloud with their timings.
+
+    Every call becomes one JSON line with its offset from the start of the
+    recording, the account, the call and its request, how long it took and
+    its result or error. Credentials and session IDs are never recorded, not
+    even as part of an error message, thermostat payloads are redacted.
+    Lines are kept in memory and written to the file in the executor when
+    the recording stops.
+    """
+
+    def __init__(self, path: str) -> None:
+        """Initialize the recorder."""
+        self.path = path
+        self._started = time.monotonic()
+        self._lines: list[str] = []
+
+    def __len__(self) -> int:
+        """Return the number of recorded calls."""
+        return len(self._lines)
+
+    def record(
+        self,
+        account: str,
+        call: str,
+        started: float,
+        request: dict[str, Any] | None = None,
+        result: Any = None,
+        error: BaseException | None = None,
+    ) -> None:
+        """Record a call that started at a monotonic timestamp."""
+        line: dict[str, Any] = {
+            "t": round(started - self._started, 4),
+            "account": account,
+            "call": call,
+            "duration": round(time.monotonic() - started, 4),
+        }
+        if request is not None:
+            line["request"] = request
+        if error is not None:
+            line["error"] = type(error).__name__
+            line["message"] = redact_message(str(error))
+            if isinstance(status := getattr(error, "status", None), int):
+                line["status"] = status
+        elif result is not None:
+            line["result"] = result
+        self._lines.append(json.dumps(line))
+
+    async def async_save(self, hass: HomeAssistant) -> None:
+        """Write the trace to its file."""
+        lines, self._lines = self._lines, []
+        await hass.async_add_executor_job(self._write, lines)
+
+    def _write(self, lines: list[str]) -> None:
+        with open(self.path, "a", encoding="utf-8") as file:
+            file.writelines(f"{line}\n" for line in lines)
@@ -0,0 +1,212 @@
+"""Coalesce bursts of writes to a Schluter thermostat into a single flush."""
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Awaitable, Callable
+from datetime import datetime
+import logging
+from typing import TYPE_CHECKING
+
+from aioschluter import InvalidSessionIdError, SchluterApi
+from aioschluter.const import REGULATION_MODE_MANUAL
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.event import async_call_later
+
+from .commands import SchluterCommand
+from .const import WRITE_COALESCE_DELAY
+from .resilience import SchluterUnreachable
+
+if TYPE_CHECKING:
+    from . import SchluterDataUpdateCoordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class SchluterWriteQueue:
+    """Per thermostat queue that merges set-point and mode changes.
+
+    Every write waits for the next flush. All writes queued before the flush
+    are merged so that only the final set-point and mode reach the cloud,
+    followed by a single coordinator refresh. When the cloud cannot be
+    reached, the merged command is kept in the command store of the
+    coordinator and written after its next successful refresh. A write the
+    cloud rejected is raised to the callers instead.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        api: SchluterApi,
+        coordinator: SchluterDataUpdateCoordinator,
+        serial_number: str,
+        delay: float = WRITE_COALESCE_DELAY,
+    ) -> None:
+        """Initialize the write queue."""
+        self._hass = hass
+        self._api = api
+        self._coordinator = coordinator
+        self._serial_number = serial_number
+        self._delay = delay
+        self._command: SchluterCommand | None = None
+        self._waiters: list[asyncio.Future[None]] = []
+        self._unsub_flush: CALLBACK_TYPE | None = None
+
+    async def async_set_temperature(self, temperature: float) -> None:
+        """Queue a new target temperature and wait for it to be written."""
+        self._pending_command().set_temperature(temperature)
+        await self._async_enqueue()
+
+    async def async_set_regulation_mode(self, regulation_mode: int) -> None:
+        """Queue a new regulation mode and wait for it to be written."""
+        self._pending_command().set_regulation_mode(regulation_mode)
+        await self._async_enqueue()
+
+    async def async_write(
+        self,
+        temperature: float | None = None,
+        regulation_mode: int | None = None,
+        mode_after_temperature: bool = True,
+    ) -> None:
+        """Write right away, leaving the refresh to the caller.
+
+        Used by the bulk services, which refresh once after all writes. A
+        command still queued for the thermostat is merged into the write and
+        dropped once written, so that it cannot overwrite this write when it
+        is replayed later.
+        """
+        await self._async_write_command(
+            *self._merge_queued(
+                SchluterCommand(
+                    temperature=temperature,
+                    regulation_mode=regulation_mode,
+                    mode_after_temperature=mode_after_temperature,
+                )
+            )
+        )
+
+    async def async_write_queued(self, command: SchluterCommand) -> None:
+        """Write a command of the command store as it is.
+
+        Used to replay queued commands, leaving the refresh to the caller.
+        The command is dropped from the store once written, unless a newer
+        one replaced it meanwhile.
+        """
+        await self._async_write_command(command, command)
+
+    @callback
+    def async_shutdown(self) -> None:
+        """Drop pending writes when the config entry is unloaded."""
+        if self._unsub_flush is not None:
+            self._unsub_flush()
+            self._unsub_flush = None
+        for waiter in self._waiters:
+            waiter.cancel()
+        self._waiters = []
+
+    def _pending_command(self) -> SchluterCommand:
+        if self._command is None:
+            self._command = SchluterCommand()
+        return self._command
+
+    async def _async_enqueue(self) -> None:
+        waiter: asyncio.Future[None] = self._hass.loop.create_future()
+        self._waiters.append(waiter)
+        if self._unsub_flush is None:
+            self._unsub_flush = async_call_later(
+                self._hass, self._delay, self._async_scheduled_flush
+            )
+        await waiter
+
+    async def _async_scheduled_flush(self, _now: datetime) -> None:
+        self._unsub_flush = None
+        command = self._command or SchluterCommand()
+        waiters = self._waiters
+        self._command = None
+        self._waiters = []
+
+        _LOGGER.debug(
+            "Flushing %s queued writes for thermostat %s",
+            len(waiters),
+            self._serial_number,
+        )
+        command, queued = self._merge_queued(command)
+        try:
+            await self._async_write_command(command, queued)
+        except SchluterUnreachable as err:
+            _LOGGER.info(
+                "Queueing change to thermostat %s until the Schluter cloud "
+                "is reachable: %s",
+                self._serial_number,
+                err,
+            )
+            await self._coordinator.commands.async_put(self._serial_number, command)
+        except Exception as err:  # pylint: disable=broad-except
+            for waiter in waiters:
+                if not waiter.done():
+                    waiter.set_exception(err)
+            return
+        else:
+            self._coordinator.async_note_write()
+            await self._coordinator.async_request_refresh()
+
+        for waiter in waiters:
+            if not waiter.done():
+                waiter.set_result(None)
+
+    def _merge_queued(
+        self, command: SchluterCommand
+    ) -> tuple[SchluterCommand, SchluterCommand | None]:
+        # A command still waiting for the cloud is superseded by this one
+        if (queued := self._coordinator.commands.get(self._serial_number)) is None:
+            return command, None
+        return queued.merged(command), queued
+
+    async def _async_write_command(
+        self, command: SchluterCommand, queued: SchluterCommand | None
+    ) -> None:
+        await self._async_write(
+            command.temperature,
+            command.regulation_mode,
+            command.mode_after_temperature,
+        )
+        if queued is not None:
+            await self._coordinator.commands.async_remove(self._serial_number, queued)
+
+    async def _async_write(
+        self,
+        temperature: float | None,
+        regulation_mode: int | None,
+        mode_after_temperature: bool,
+    ) -> None:
+        # Setting a temperature switches the thermostat to manual, so a mode
+        # change only needs its own call when it was requested afterwards.
+        calls: list[tuple[str, Callable[..., Awaitable[bool]], float | int]] = []
+        if temperature is not None:
+            calls.append(
+                ("set_temperature", self._api.async_set_temperature, temperature)
+            )
+        if regulation_mode is not None and (
+            temperature is None
+            or (mode_after_temperature and regulation_mode != REGULATION_MODE_MANUAL)
+        ):
+            calls.append(
+                (
+                    "set_regulation_mode",
+                    self._api.async_set_regulation_mode,
+                    regulation_mode,
+                )
+            )
+
+        session = self._coordinator.session
+        metrics = self._coordinator.metrics
+        async with self._coordinator.resilience.async_guard():
+            sessionid = await session.async_get_sessionid()
+            for endpoint, method, value in calls:
+                try:
+                    with metrics.api_call(endpoint):
+                        await method(sessionid, self._serial_number, value)
+                except InvalidSessionIdError:
+                    sessionid = await session.async_renew(sessionid)
+                    with metrics.api_call(endpoint):
+                        await method(sessionid, self._serial_number, value)
@@ -0,0 +1,63 @@
+"""Tests for the schluter integration."""
+from typing import Any
+
+from homeassistant.const import CONF_PASSWORD, CONF_USERNAME
+from homeassistant.core import HomeAssistant
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.schluter.const import DOMAIN
+
+
+def thermostat_payload(serial_number: str, **overrides: Any) -> dict[str, Any]:
+    """Return a thermostat as reported by the Schluter cloud."""
+    payload = {
+        "SerialNumber": serial_number,
+        "Room": f"Floor {serial_number}",
+        "GroupName": "Home",
+        "GroupId": 1,
+        "Temperature": 2150,
+        "SetPointTemp": 2200,
+        "RegulationMode": 1,
+        "VacationEnabled": False,
+        "VacationBeginDay": "1970-01-01T00:00:00",
+        "VacationEndDay": "1970-01-01T00:00:00",
+        "VacationTemperature": 500,
+        "ComfortTemperature": 2400,
+        "ComfortEndTime": "1970-01-01T00:00:00",
+        "ManualTemperature": 2200,
+        "Online": True,
+        "Heating": False,
+        "EarlyStartOfHeating": False,
+        "MaxTemp": 4000,
+        "MinTemp": 500,
+        "ErrorCode": 0,
+        "Confirmed": True,
+        "Email": "user@example.com",
+        "TZOffset": "-05:00",
+        "KwhCharge": 0.12,
+        "LoadMeasuringActive": True,
+        "LoadManuallySetWatt": 0,
+        "LoadMeasuredWatt": 800,
+        "SWVersion": "1.0.0",
+        "HasBeenAssigned": True,
+        "DistributerId": 0,
+        "Support": None,
+    }
+    payload.update(overrides)
+    return payload
+
+
+async def async_setup_integration(
+    hass: HomeAssistant, username: str, password: str, **options: Any
+) -> MockConfigEntry:
+    """Set up the integration for an account and wait for its entities."""
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        unique_id=username,
+        data={CONF_USERNAME: username, CONF_PASSWORD: password},
+        options=options,
+    )
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+    return entry
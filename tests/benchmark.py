@@ -0,0 +1,76 @@
+"""Measurement helpers for the benchmark suite."""
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from unittest.mock import patch
+
+from homeassistant.helpers.entity import Entity
+
+# Results reported in the pytest terminal summary
+RESULTS: list[BenchmarkResult] = []
+
+
+@dataclass
+class BenchmarkResult:
+    """Measurements of one benchmark run."""
+
+    name: str
+    thermostats: int
+    metrics: dict[str, float] = field(default_factory=dict)
+
+    def format(self) -> str:
+        """Return the result as a single line."""
+        metrics = ", ".join(
+            f"{name}={value:.4g}" for name, value in sorted(self.metrics.items())
+        )
+        return f"{self.name}[{self.thermostats}]: {metrics}"
+
+
+class LoopBlockingMonitor:
+    """Measure the longest time the event loop did not get to run a task."""
+
+    def __init__(self, interval: float = 0.001) -> None:
+        """Initialize the monitor."""
+        self.interval = interval
+        self.max_blocking = 0.0
+        self._task: asyncio.Task[None] | None = None
+
+    async def __aenter__(self) -> LoopBlockingMonitor:
+        """Start sampling the event loop."""
+        self._task = asyncio.create_task(self._async_sample())
+        await asyncio.sleep(0)
+        return self
+
+    async def __aexit__(self, *exc_info: object) -> None:
+        """Stop sampling the event loop."""
+        assert self._task is not None
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+
+    async def _async_sample(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            start = loop.time()
+            await asyncio.sleep(self.interval)
+            blocked = loop.time() - start - self.interval
+            self.max_blocking = max(self.max_blocking, blocked)
+
+
+@contextmanager
+def count_state_writes() -> Iterator[list[Entity]]:
+    """Collect every entity that writes its state."""
+    writes: list[Entity] = []
+    original = Entity._async_write_ha_state
+
+    def _count(entity: Entity) -> None:
+        writes.append(entity)
+        original(entity)
+
+    with patch.object(Entity, "_async_write_ha_state", _count):
+        yield writes
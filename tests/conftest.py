@@ -1,4 +1,5 @@
 """Fixtures for testing"""
+import pycares
 import pytest
 
 
@@ -6,3 +7,51 @@ import pytest
 def auto_enable_custom_integrations(enable_custom_integrations):  # noqa: F811
     """Auto add enable_custom_integrations."""
     yield
+
+
+@pytest.fixture(scope="session", autouse=True)
+def start_dns_shutdown_thread():
+    """Create a DNS channel before the first test runs.
+
+    pycares starts a daemon thread with its first channel, which the hass
+    fixture would otherwise report as a thread left behind by the test.
+    """
+    pycares.Channel().close()
+
+
+def pytest_addoption(parser):
+    """Add the option running the benchmark suite."""
+    parser.addoption(
+        "--benchmark",
+        action="store_true",
+        default=False,
+        help="run the schluter benchmarks",
+    )
+
+
+def pytest_configure(config):
+    """Register the benchmark marker."""
+    config.addinivalue_line(
+        "markers", "benchmark: measure the performance of the integration"
+    )
+
+
+def pytest_collection_modifyitems(config, items):
+    """Skip the benchmarks unless asked for with --benchmark or -m benchmark."""
+    if config.getoption("--benchmark") or "benchmark" in config.option.markexpr:
+        return
+    skip = pytest.mark.skip(reason="use --benchmark or -m benchmark to run")
+    for item in items:
+        if "benchmark" in item.keywords:
+            item.add_marker(skip)
+
+
+def pytest_terminal_summary(terminalreporter):
+    """Report the results of the benchmark suite."""
+    from .benchmark import RESULTS
+
+    if not RESULTS:
+        return
+    terminalreporter.section("schluter benchmarks")
+    for result in RESULTS:
+        terminalreporter.write_line(result.format())
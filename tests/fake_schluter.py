@@ -0,0 +1,175 @@
+"""A local stand-in for the Schluter cloud used by tests and benchmarks."""
+from __future__ import annotations
+
+import asyncio
+from collections import Counter
+from dataclasses import dataclass
+import random
+import time
+from typing import Any
+from unittest.mock import patch
+import uuid
+
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from . import thermostat_payload
+
+FAKE_USERNAME = "user@example.com"
+FAKE_PASSWORD = "secret"
+
+
+@dataclass
+class FakeSchluterConfig:
+    """Behaviour of the fake Schluter cloud."""
+
+    thermostats: int = 1
+    groups: int = 1
+    # Seconds every request is delayed
+    latency: float = 0.0
+    # Share of requests answered with HTTP 500
+    error_rate: float = 0.0
+    # Share of requests answered with HTTP 429 and a Retry-After header
+    rate_limit_rate: float = 0.0
+    retry_after: int = 30
+    # Seconds after which a session ID is rejected, None keeps it valid
+    session_ttl: float | None = None
+    seed: int = 0
+
+
+class FakeSchluterCloud:
+    """Implement the Schluter endpoints used by aioschluter."""
+
+    def __init__(self, config: FakeSchluterConfig | None = None) -> None:
+        """Initialize the fake cloud."""
+        self.config = config or FakeSchluterConfig()
+        self.requests: Counter[str] = Counter()
+        self.responses: Counter[tuple[str, int]] = Counter()
+        self.sessions: dict[str, float] = {}
+        self.thermostats: dict[str, dict[str, Any]] = {
+            f"{index:06d}": thermostat_payload(
+                f"{index:06d}", GroupId=index % self.config.groups
+            )
+            for index in range(self.config.thermostats)
+        }
+        # Weekly schedules reported with the state of a single thermostat
+        self.schedules: dict[str, dict[str, Any]] = {}
+        self._random = random.Random(self.config.seed)
+        self._server: TestServer | None = None
+
+    @property
+    def base_url(self) -> str:
+        """Return the URL the fake cloud listens on."""
+        assert self._server is not None
+        return str(self._server.make_url("")).rstrip("/")
+
+    def application(self) -> web.Application:
+        """Return the aiohttp application of the fake cloud."""
+        app = web.Application(middlewares=[self._middleware])
+        app.router.add_post("/api/authenticate/user", self._authenticate)
+        app.router.add_get("/api/thermostats", self._thermostats)
+        app.router.add_get("/api/thermostat", self._thermostat)
+        app.router.add_post("/api/thermostat", self._set_thermostat)
+        return app
+
+    async def __aenter__(self) -> FakeSchluterCloud:
+        """Start the server and point aioschluter at it."""
+        self._server = TestServer(self.application(), host="127.0.0.1")
+        await self._server.start_server()
+        self._patches = [
+            patch(f"aioschluter.{name}", f"{self.base_url}{path}")
+            for name, path in (
+                ("API_AUTH_URL", "/api/authenticate/user"),
+                ("API_GET_THERMOSTATS_URL", "/api/thermostats"),
+                ("API_SET_THERMOSTAT_URL", "/api/thermostat"),
+            )
+        ]
+        for url_patch in self._patches:
+            url_patch.start()
+        return self
+
+    async def __aexit__(self, *exc_info: object) -> None:
+        """Stop the server."""
+        for url_patch in self._patches:
+            url_patch.stop()
+        assert self._server is not None
+        await self._server.close()
+
+    def expire_sessions(self) -> None:
+        """Invalidate every session ID handed out so far."""
+        self.sessions.clear()
+
+    @web.middleware
+    async def _middleware(self, request: web.Request, handler) -> web.StreamResponse:
+        endpoint = request.path
+        self.requests[endpoint] += 1
+        if self.config.latency:
+            await asyncio.sleep(self.config.latency)
+        if self._random.random() < self.config.rate_limit_rate:
+            response: web.StreamResponse = web.Response(
+                status=429, headers={"Retry-After": str(self.config.retry_after)}
+            )
+        elif self._random.random() < self.config.error_rate:
+            response = web.Response(status=500)
+        else:
+            response = await handler(request)
+        self.responses[(endpoint, response.status)] += 1
+        return response
+
+    def _session_valid(self, request: web.Request) -> bool:
+        created = self.sessions.get(request.query.get("sessionId", ""))
+        if created is None:
+            return False
+        ttl = self.config.session_ttl
+        return ttl is None or time.monotonic() - created < ttl
+
+    async def _authenticate(self, request: web.Request) -> web.Response:
+        body = await request.json()
+        if body["Email"] != FAKE_USERNAME or body["Password"] != FAKE_PASSWORD:
+            return web.json_response({"SessionId": "", "ErrorCode": 1})
+        sessionid = uuid.uuid4().hex
+        self.sessions[sessionid] = time.monotonic()
+        return web.json_response({"SessionId": sessionid, "ErrorCode": 0})
+
+    async def _thermostats(self, request: web.Request) -> web.Response:
+        if not self._session_valid(request):
+            return web.Response(status=401)
+        groups: dict[int, list[dict[str, Any]]] = {}
+        for thermostat in self.thermostats.values():
+            groups.setdefault(thermostat["GroupId"], []).append(thermostat)
+        return web.json_response(
+            {
+                "Groups": [
+                    {"GroupId": group_id, "GroupName": "Home", "Thermostats": members}
+                    for group_id, members in groups.items()
+                ]
+            }
+        )
+
+    async def _thermostat(self, request: web.Request) -> web.Response:
+        if not self._session_valid(request):
+            return web.Response(status=401)
+        serial_number = request.query.get("serialnumber", "")
+        if (thermostat := self.thermostats.get(serial_number)) is None:
+            return web.Response(status=404)
+        return web.json_response(
+            {**thermostat, "Schedule": self.schedules.get(serial_number)}
+        )
+
+    async def _set_thermostat(self, request: web.Request) -> web.Response:
+        if not self._session_valid(request):
+            return web.Response(status=401)
+        thermostat = self.thermostats.get(request.query.get("serialnumber", ""))
+        if thermostat is None:
+            return web.json_response({"Success": False})
+        body = await request.json()
+        if "ManualTemperature" in body:
+            # Setting a temperature puts the thermostat into manual mode
+            thermostat["ManualTemperature"] = body["ManualTemperature"]
+            thermostat["SetPointTemp"] = body["ManualTemperature"]
+            thermostat["RegulationMode"] = 2
+        else:
+            thermostat["RegulationMode"] = body["RegulationMode"]
+            if body["RegulationMode"] == 2:
+                thermostat["SetPointTemp"] = thermostat["ManualTemperature"]
+        return web.json_response({"Success": True})
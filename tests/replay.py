@@ -0,0 +1,182 @@
+"""Replay a recorded Schluter trace through the integration without the cloud."""
+from __future__ import annotations
+
+import asyncio
+from collections import defaultdict, deque
+from dataclasses import dataclass, field
+import json
+import time
+from typing import Any
+from unittest.mock import patch
+
+from aioschluter import (
+    ApiError,
+    InvalidSessionIdError,
+    InvalidUserPasswordError,
+    Thermostat,
+)
+
+from homeassistant.const import CONF_PASSWORD, CONF_USERNAME
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.update_coordinator import UpdateFailed
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.schluter.const import DOMAIN
+
+from .benchmark import count_state_writes
+
+ERRORS: dict[str, type[Exception]] = {
+    "ApiError": ApiError,
+    "InvalidSessionIdError": InvalidSessionIdError,
+    "InvalidUserPasswordError": InvalidUserPasswordError,
+    "TimeoutError": TimeoutError,
+}
+
+
+def load_trace(path: str) -> dict[str, list[dict[str, Any]]]:
+    """Return the recorded calls of every account in the order they started."""
+    accounts: dict[str, list[dict[str, Any]]] = defaultdict(list)
+    with open(path, encoding="utf-8") as file:
+        for line in file:
+            record = json.loads(line)
+            accounts[record["account"]].append(record)
+    for records in accounts.values():
+        records.sort(key=lambda record: record["t"])
+    return dict(accounts)
+
+
+class ReplayClient:
+    """Answer the calls of the integration from a recorded trace.
+
+    Calls are answered in the order they were recorded, after their
+    recorded duration divided by ``speed``. The last thermostat listing is
+    repeated once the trace runs out of them.
+    """
+
+    def __init__(self, records: list[dict[str, Any]], speed: float) -> None:
+        """Initialize the client."""
+        self.account = ""
+        self.payloads: dict[str, dict[str, Any]] = {}
+        self.recorder = None
+        self.replayed: set[int] = set()
+        self._speed = speed
+        self._calls: dict[str, deque[dict[str, Any]]] = defaultdict(deque)
+        for record in records:
+            self._calls[record["call"]].append(record)
+
+    async def async_get_sessionid(self, username: str, password: str) -> str:
+        """Log in."""
+        await self._async_replay("login")
+        return "replay"
+
+    async def async_get_current_thermostats(self, sessionid: str) -> dict[str, Any]:
+        """Return the next recorded thermostat listing."""
+        record = await self._async_replay("thermostats")
+        assert record is not None, "the trace has no thermostat listing"
+        self.payloads = {
+            payload["SerialNumber"]: payload for payload in record["result"]
+        }
+        return {
+            serial_number: Thermostat(payload)
+            for serial_number, payload in self.payloads.items()
+        }
+
+    async def async_set_temperature(self, sessionid, serialnumber, temperature) -> bool:
+        """Set the target temperature of a thermostat."""
+        record = await self._async_replay("set_temperature")
+        return record is None or record["result"]
+
+    async def async_set_regulation_mode(self, sessionid, serialnumber, mode) -> bool:
+        """Set the regulation mode of a thermostat."""
+        record = await self._async_replay("set_regulation_mode")
+        return record is None or record["result"]
+
+    async def async_get_schedule(self, sessionid, serialnumber) -> dict | None:
+        """Return the next recorded schedule."""
+        record = await self._async_replay("schedule")
+        return None if record is None else record["result"]
+
+    async def _async_replay(self, call: str) -> dict[str, Any] | None:
+        calls = self._calls[call]
+        if not calls:
+            return None
+        # Keep answering with the last thermostat listing
+        if call == "thermostats" and len(calls) == 1:
+            record = calls[0]
+        else:
+            record = calls.popleft()
+        self.replayed.add(id(record))
+        if self._speed:
+            await asyncio.sleep(record["duration"] / self._speed)
+        if "error" in record:
+            raise ERRORS.get(record["error"], ApiError)(record["message"])
+        return record
+
+
+@dataclass
+class ReplayResult:
+    """Measurements of a replayed trace."""
+
+    refreshes: int = 0
+    writes: int = 0
+    failed_writes: int = 0
+    state_writes: int = 0
+    refresh_latency: list[float] = field(default_factory=list)
+
+
+async def async_replay_trace(
+    hass: HomeAssistant, path: str, account: str | None = None, speed: float = 10.0
+) -> tuple[MockConfigEntry, ReplayResult]:
+    """Set up the integration from a trace and replay its refreshes and writes.
+
+    Polling is disabled, every recorded thermostat listing not used by the
+    setup becomes a coordinator refresh and every recorded write is sent
+    through the write queue of its thermostat, after the recorded gap
+    divided by ``speed``.
+    """
+    accounts = load_trace(path)
+    records = accounts[account or next(iter(accounts))]
+    client = ReplayClient(records, speed)
+    result = ReplayResult()
+
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={CONF_USERNAME: "replay@example.com", CONF_PASSWORD: "replay"},
+        pref_disable_polling=True,
+    )
+    entry.add_to_hass(hass)
+    with patch("custom_components.schluter.SchluterClient", return_value=client):
+        assert await hass.config_entries.async_setup(entry.entry_id)
+        await hass.async_block_till_done()
+    coordinator = hass.data[DOMAIN][entry.entry_id].coordinator
+
+    previous = 0.0
+    with count_state_writes() as state_writes:
+        for record in records:
+            # Skip what was already answered, e.g. by the setup or the
+            # retry of a listing rejected for an expired session, schedules
+            # are fetched by the coordinator on its own
+            if id(record) in client.replayed or record["call"] in ("login", "schedule"):
+                continue
+            if speed:
+                await asyncio.sleep(max(record["t"] - previous, 0) / speed)
+            previous = record["t"]
+            if record["call"] == "thermostats":
+                start = time.perf_counter()
+                await coordinator.async_refresh()
+                await hass.async_block_till_done()
+                result.refresh_latency.append(time.perf_counter() - start)
+                result.refreshes += 1
+                continue
+            request = record["request"]
+            queue = coordinator.async_get_write_queue(request["serial_number"])
+            try:
+                await queue.async_write(
+                    temperature=request.get("temperature"),
+                    regulation_mode=request.get("regulation_mode"),
+                )
+            except UpdateFailed:
+                result.failed_writes += 1
+            result.writes += 1
+    result.state_writes = len(state_writes)
+    return entry, result
@@ -0,0 +1,174 @@
+"""Benchmark the integration against the fake Schluter cloud."""
+import asyncio
+from pathlib import Path
+import sys
+import time
+import tracemalloc
+
+import pytest
+
+from homeassistant.helpers import entity_registry as er
+
+from custom_components.schluter.const import DOMAIN
+
+from . import async_setup_integration
+from .benchmark import RESULTS, BenchmarkResult, LoopBlockingMonitor, count_state_writes
+from .fake_schluter import (
+    FAKE_PASSWORD,
+    FAKE_USERNAME,
+    FakeSchluterCloud,
+    FakeSchluterConfig,
+)
+
+pytestmark = [pytest.mark.benchmark, pytest.mark.usefixtures("socket_enabled")]
+
+REFRESHES = 5
+RELOADS = 2
+
+IMPORT_PLATFORMS = """
+import time
+start = time.perf_counter()
+import custom_components.schluter.climate
+import custom_components.schluter.sensor
+print(time.perf_counter() - start)
+"""
+
+
+async def _async_import_time() -> float:
+    """Return the seconds to import the platforms in a fresh interpreter."""
+    process = await asyncio.create_subprocess_exec(
+        sys.executable,
+        "-c",
+        IMPORT_PLATFORMS,
+        cwd=Path(__file__).parent.parent,
+        stdout=asyncio.subprocess.PIPE,
+    )
+    stdout, _ = await process.communicate()
+    assert process.returncode == 0
+    return float(stdout)
+
+
+@pytest.mark.parametrize("thermostats", [50, 500])
+async def test_setup(hass, thermostats):
+    """Measure importing, setting up and reloading the platforms."""
+    result = BenchmarkResult("setup", thermostats)
+    result.metrics["import_ms"] = await _async_import_time() * 1000
+    config = FakeSchluterConfig(thermostats=thermostats)
+
+    async with FakeSchluterCloud(config):
+        start = time.perf_counter()
+        entry = await async_setup_integration(hass, FAKE_USERNAME, FAKE_PASSWORD)
+        result.metrics["setup_ms"] = (time.perf_counter() - start) * 1000
+        registered = er.async_entries_for_config_entry(
+            er.async_get(hass), entry.entry_id
+        )
+        assert len(registered) == thermostats * 12 + 15
+        result.metrics["entities"] = len(registered)
+
+        # Changing the options reloads the entry
+        start = time.perf_counter()
+        for _ in range(RELOADS):
+            assert await hass.config_entries.async_reload(entry.entry_id)
+            await hass.async_block_till_done()
+        result.metrics["reload_ms"] = (time.perf_counter() - start) / RELOADS * 1000
+
+        assert await hass.config_entries.async_unload(entry.entry_id)
+        await hass.async_block_till_done()
+
+    RESULTS.append(result)
+
+
+@pytest.mark.parametrize("thermostats", [1, 50, 500])
+async def test_refresh(hass, thermostats):
+    """Measure setup and refreshes of the coordinator and all platforms."""
+    result = BenchmarkResult("refresh", thermostats)
+    config = FakeSchluterConfig(thermostats=thermostats, latency=0.005)
+
+    async with FakeSchluterCloud(config) as cloud:
+        tracemalloc.start()
+        baseline = tracemalloc.get_traced_memory()[0]
+        entry = await async_setup_integration(hass, FAKE_USERNAME, FAKE_PASSWORD)
+        result.metrics["memory_per_thermostat_kb"] = (
+            (tracemalloc.get_traced_memory()[0] - baseline) / thermostats / 1024
+        )
+        tracemalloc.stop()
+
+        coordinator = hass.data[DOMAIN][entry.entry_id].coordinator
+        assert len(coordinator.data) == thermostats
+        assert len(hass.states.async_all()) == thermostats * 7 + 6
+
+        latencies = []
+        writes_per_refresh = []
+        async with LoopBlockingMonitor() as monitor:
+            for refresh in range(REFRESHES):
+                # Change one floor per refresh, like a quiet house would
+                thermostat = list(cloud.thermostats.values())[refresh % thermostats]
+                thermostat["Temperature"] += 50
+                with count_state_writes() as writes:
+                    start = time.perf_counter()
+                    await coordinator.async_refresh()
+                    await hass.async_block_till_done()
+                    latencies.append(time.perf_counter() - start)
+                writes_per_refresh.append(len(writes))
+
+        # A quiet night, the cloud reports the very same thermostats
+        start = time.perf_counter()
+        await coordinator.async_refresh()
+        await hass.async_block_till_done()
+        result.metrics["quiet_refresh_latency_ms"] = (
+            time.perf_counter() - start
+        ) * 1000
+        result.metrics["unchanged_thermostats_pct"] = (
+            coordinator.metrics.fingerprint_hit_rate("thermostats")
+        )
+
+        assert coordinator.last_update_success
+        result.metrics["refresh_latency_ms"] = sum(latencies) / REFRESHES * 1000
+        result.metrics["loop_blocking_ms"] = monitor.max_blocking * 1000
+        result.metrics["state_writes_per_refresh"] = sum(writes_per_refresh) / REFRESHES
+
+        assert await hass.config_entries.async_unload(entry.entry_id)
+        await hass.async_block_till_done()
+
+    RESULTS.append(result)
+
+
+@pytest.mark.parametrize("thermostats", [1, 50])
+async def test_set_temperature(hass, thermostats):
+    """Measure a set-point change on every floor."""
+    result = BenchmarkResult("set_temperature", thermostats)
+    config = FakeSchluterConfig(thermostats=thermostats, latency=0.005)
+
+    async with FakeSchluterCloud(config) as cloud:
+        entry = await async_setup_integration(hass, FAKE_USERNAME, FAKE_PASSWORD)
+        entity_ids = hass.states.async_entity_ids("climate")
+
+        with count_state_writes() as writes:
+            start = time.perf_counter()
+            await hass.services.async_call(
+                "climate",
+                "set_temperature",
+                {"entity_id": entity_ids, "temperature": 25},
+                blocking=True,
+            )
+            result.metrics["service_latency_ms"] = (
+                time.perf_counter() - start
+            ) * 1000
+            await hass.async_block_till_done(wait_background_tasks=True)
+            result.metrics["total_latency_ms"] = (time.perf_counter() - start) * 1000
+        result.metrics["state_writes"] = len(writes)
+        result.metrics["cloud_requests"] = cloud.requests.total()
+
+        assert all(
+            thermostat["SetPointTemp"] == 2500
+            for thermostat in cloud.thermostats.values()
+        )
+        assert all(
+            hass.states.get(entity_id).attributes["temperature"] == 25
+            for entity_id in entity_ids
+        )
+
+        assert await hass.config_entries.async_unload(entry.entry_id)
+        await hass.async_block_till_done()
+
+    RESULTS.append(result)
@@ -0,0 +1,132 @@
+"""Test the optimistic state of the schluter climate entities."""
+from datetime import timedelta
+from unittest.mock import patch
+
+from aioschluter import ApiError, InvalidUserPasswordError
+from aioschluter.const import REGULATION_MODE_MANUAL
+import pytest
+
+from homeassistant.config_entries import SOURCE_REAUTH
+from homeassistant.util import dt as dt_util
+from pytest_homeassistant_custom_component.common import async_fire_time_changed
+
+from custom_components.schluter.const import DOMAIN, OPTIMISTIC_TIMEOUT
+
+from . import async_setup_integration
+from .fake_schluter import FAKE_PASSWORD, FAKE_USERNAME, FakeSchluterCloud
+
+pytestmark = pytest.mark.usefixtures("socket_enabled")
+
+ENTITY_ID = "climate.floor_000000"
+
+
+async def _set_temperature(hass, temperature):
+    await hass.services.async_call(
+        "climate",
+        "set_temperature",
+        {"entity_id": ENTITY_ID, "temperature": temperature},
+        blocking=True,
+    )
+
+
+async def _advance(hass, seconds):
+    async_fire_time_changed(hass, dt_util.utcnow() + timedelta(seconds=seconds))
+    await hass.async_block_till_done(wait_background_tasks=True)
+
+
+async def test_optimistic_state_is_confirmed(hass, caplog):
+    """Test a change is shown right away and kept once the cloud reports it."""
+    async with FakeSchluterCloud() as cloud:
+        entry = await async_setup_integration(hass, FAKE_USERNAME, FAKE_PASSWORD)
+
+        await _set_temperature(hass, 25)
+
+        state = hass.states.get(ENTITY_ID)
+        assert state.attributes["temperature"] == 25
+        assert state.state == "heat"
+        assert cloud.thermostats["000000"]["SetPointTemp"] == 2200
+
+        await _advance(hass, 2)
+        assert cloud.thermostats["000000"]["SetPointTemp"] == 2500
+
+        await _advance(hass, OPTIMISTIC_TIMEOUT * 2)
+        assert hass.states.get(ENTITY_ID).attributes["temperature"] == 25
+        assert "Rolling back" not in caplog.text
+
+        assert await hass.config_entries.async_unload(entry.entry_id)
+        await hass.async_block_till_done()
+
+
+async def test_change_in_effect_is_confirmed(hass, caplog):
+    """Test a change matching the cloud is confirmed without a notification."""
+    async with FakeSchluterCloud() as cloud:
+        entry = await async_setup_integration(hass, FAKE_USERNAME, FAKE_PASSWORD)
+        cloud.thermostats["000000"]["RegulationMode"] = REGULATION_MODE_MANUAL
+        await hass.data[DOMAIN][entry.entry_id].coordinator.async_refresh()
+
+        await _set_temperature(hass, 22)
+        await _advance(hass, 2)
+        await _advance(hass, OPTIMISTIC_TIMEOUT * 2)
+
+        assert hass.states.get(ENTITY_ID).attributes["temperature"] == 22
+        assert "Rolling back" not in caplog.text
+
+        assert await hass.config_entries.async_unload(entry.entry_id)
+        await hass.async_block_till_done()
+
+
+async def test_unconfirmed_state_is_rolled_back(hass, caplog):
+    """Test a change the cloud never reports is rolled back after the timeout."""
+    async with FakeSchluterCloud():
+        entry = await async_setup_integration(hass, FAKE_USERNAME, FAKE_PASSWORD)
+
+        with patch("aioschluter.SchluterApi.async_set_temperature", return_value=True):
+            await _set_temperature(hass, 25)
+            await _advance(hass, 2)
+        assert hass.states.get(ENTITY_ID).attributes["temperature"] == 25
+
+        await _advance(hass, OPTIMISTIC_TIMEOUT)
+
+        assert hass.states.get(ENTITY_ID).attributes["temperature"] == 22
+        assert "not confirmed by the Schluter cloud" in caplog.text
+
+        assert await hass.config_entries.async_unload(entry.entry_id)
+        await hass.async_block_till_done()
+
+
+async def test_failed_write_is_rolled_back(hass, caplog):
+    """Test a change the cloud rejects is rolled back right away."""
+    async with FakeSchluterCloud():
+        entry = await async_setup_integration(hass, FAKE_USERNAME, FAKE_PASSWORD)
+
+        with patch(
+            "aioschluter.SchluterApi.async_set_temperature",
+            side_effect=ApiError("Invalid Response: 400"),
+        ):
+            await _set_temperature(hass, 25)
+            await _advance(hass, 2)
+
+        assert hass.states.get(ENTITY_ID).attributes["temperature"] == 22
+        assert "Invalid Response: 400" in caplog.text
+
+        assert await hass.config_entries.async_unload(entry.entry_id)
+        await hass.async_block_till_done()
+
+
+async def test_rejected_credentials_start_reauth(hass):
+    """Test a write failing authentication rolls back and starts a reauth."""
+    async with FakeSchluterCloud():
+        entry = await async_setup_integration(hass, FAKE_USERNAME, FAKE_PASSWORD)
+
+        with patch(
+            "aioschluter.SchluterApi.async_set_temperature",
+            side_effect=InvalidUserPasswordError("Invalid username or password"),
+        ):
+            await _set_temperature(hass, 25)
+            await _advance(hass, 2)
+
+        assert hass.states.get(ENTITY_ID).attributes["temperature"] == 22
+        assert entry.async_get_active_flows(hass, {SOURCE_REAUTH})
+
+        assert await hass.config_entries.async_unload(entry.entry_id)
+        await hass.async_block_till_done()
@@ -1,6 +1,20 @@
 """Test config flow."""
+import pytest
+
 from homeassistant import config_entries, setup
-from custom_components.schluter.const import DOMAIN
+from homeassistant.const import CONF_PASSWORD, CONF_USERNAME
+from homeassistant.data_entry_flow import InvalidData
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.schluter.const import (
+    CONF_FAST_DURATION,
+    CONF_FAST_INTERVAL,
+    CONF_IDLE_INTERVAL,
+    CONF_NORMAL_INTERVAL,
+    CONF_STALE_WINDOW,
+    DOMAIN,
+    MAX_POLL_INTERVAL,
+)
 
 
 async def test_form(hass):
@@ -11,3 +25,52 @@ async def test_form(hass):
     )
     assert result["type"] == "form"
     assert result["errors"] == {}
+
+
+async def test_options_flow(hass):
+    """Test the polling intervals can be changed."""
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={CONF_USERNAME: "user@example.com", CONF_PASSWORD: "secret"},
+    )
+    entry.add_to_hass(hass)
+
+    result = await hass.config_entries.options.async_init(entry.entry_id)
+    assert result["type"] == "form"
+    assert result["step_id"] == "init"
+
+    result = await hass.config_entries.options.async_configure(
+        result["flow_id"],
+        user_input={
+            CONF_FAST_INTERVAL: 15,
+            CONF_FAST_DURATION: 90,
+            CONF_NORMAL_INTERVAL: 60,
+            CONF_IDLE_INTERVAL: MAX_POLL_INTERVAL,
+            CONF_STALE_WINDOW: 300,
+        },
+    )
+    assert result["type"] == "create_entry"
+    assert entry.options[CONF_IDLE_INTERVAL] == MAX_POLL_INTERVAL
+    assert entry.options[CONF_STALE_WINDOW] == 300
+
+
+async def test_options_flow_caps_intervals(hass):
+    """Test no interval may leave gaps the energy sensors skip."""
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={CONF_USERNAME: "user@example.com", CONF_PASSWORD: "secret"},
+    )
+    entry.add_to_hass(hass)
+
+    result = await hass.config_entries.options.async_init(entry.entry_id)
+    with pytest.raises(InvalidData):
+        await hass.config_entries.options.async_configure(
+            result["flow_id"],
+            user_input={
+                CONF_FAST_INTERVAL: 15,
+                CONF_FAST_DURATION: 90,
+                CONF_NORMAL_INTERVAL: 60,
+                CONF_IDLE_INTERVAL: MAX_POLL_INTERVAL + 1,
+                CONF_STALE_WINDOW: 300,
+            },
+        )
@@ -0,0 +1,141 @@
+"""Test the Schluter data update coordinator."""
+from datetime import timedelta
+from unittest.mock import AsyncMock, MagicMock
+
+from aioschluter import Thermostat
+
+from homeassistant.const import CONF_PASSWORD, CONF_USERNAME
+from homeassistant.core import callback
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.schluter import SchluterDataUpdateCoordinator
+from custom_components.schluter.api import SchluterClient
+from custom_components.schluter.const import (
+    CONF_IDLE_INTERVAL,
+    CONF_NORMAL_INTERVAL,
+    DOMAIN,
+)
+from custom_components.schluter.metrics import SchluterMetrics
+from custom_components.schluter.resilience import (
+    SchluterRateLimit,
+    SchluterResilience,
+)
+
+from . import thermostat_payload
+
+
+def _thermostats(*payloads):
+    return {payload["SerialNumber"]: Thermostat(payload) for payload in payloads}
+
+
+def _mock_coordinator(hass, *responses):
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={CONF_USERNAME: "user@example.com", CONF_PASSWORD: "secret"},
+        options={CONF_NORMAL_INTERVAL: 60, CONF_IDLE_INTERVAL: 300},
+    )
+    entry.add_to_hass(hass)
+    api = MagicMock()
+    api.payloads = {}
+    api.async_get_current_thermostats = AsyncMock(side_effect=list(responses))
+    api.async_get_schedule = AsyncMock(return_value=None)
+    session = MagicMock()
+    session.async_get_sessionid = AsyncMock(return_value="session")
+    resilience = SchluterResilience(SchluterRateLimit())
+    return SchluterDataUpdateCoordinator(
+        hass, entry, api, session, SchluterMetrics(), resilience
+    )
+
+
+async def test_only_changed_entities_are_notified(hass):
+    """Test listeners are only called when their source fields changed."""
+    coordinator = _mock_coordinator(
+        hass,
+        _thermostats(thermostat_payload("1"), thermostat_payload("2")),
+        _thermostats(
+            thermostat_payload("1", Temperature=2300), thermostat_payload("2")
+        ),
+    )
+    calls = []
+
+    def _listen(thermostat_id, source_fields):
+        @callback
+        def _update():
+            calls.append((thermostat_id, source_fields))
+
+        coordinator.async_add_listener(_update, (thermostat_id, source_fields))
+
+    for thermostat_id in ("1", "2"):
+        _listen(thermostat_id, frozenset({"temperature"}))
+        _listen(thermostat_id, frozenset({"set_point_temp"}))
+        _listen(thermostat_id, None)
+
+    await coordinator.async_refresh()
+    assert len(calls) == 6
+
+    calls.clear()
+    await coordinator.async_refresh()
+    assert sorted(calls, key=str) == sorted(
+        [("1", frozenset({"temperature"})), ("1", None), ("2", None)], key=str
+    )
+    assert coordinator.notified_entities == 3
+    assert coordinator.skipped_entities == 3
+    await coordinator.async_shutdown()
+
+
+async def test_polling_interval_adapts(hass):
+    """Test the coordinator backs off while idle and polls fast after writes."""
+    idle = _thermostats(thermostat_payload("1"))
+    heating = _thermostats(thermostat_payload("1", Heating=True))
+    coordinator = _mock_coordinator(hass, idle, idle, heating, heating)
+
+    await coordinator.async_refresh()
+    assert coordinator.current_interval == timedelta(seconds=60)
+    await coordinator.async_refresh()
+    assert coordinator.current_interval == timedelta(seconds=300)
+    await coordinator.async_refresh()
+    assert coordinator.current_interval == timedelta(seconds=60)
+
+    coordinator.async_note_write()
+    assert coordinator.current_interval == timedelta(seconds=10)
+    await coordinator.async_refresh()
+    assert coordinator.current_interval == timedelta(seconds=10)
+    await coordinator.async_shutdown()
+
+
+async def test_unchanged_thermostats_are_reused(hass, freezer):
+    """Test a repeated response keeps the data and leaves the entities alone."""
+    client = SchluterClient(MagicMock())
+    response = {"Groups": [{"Thermostats": [thermostat_payload("1")]}]}
+    quiet = client._extract_thermostats_from_data(response)
+    assert client._extract_thermostats_from_data(response)["1"] is quiet["1"]
+    changed = client._extract_thermostats_from_data(
+        {"Groups": [{"Thermostats": [thermostat_payload("1", Temperature=2300)]}]}
+    )
+    assert changed["1"] is not quiet["1"]
+
+    coordinator = _mock_coordinator(hass, quiet, quiet, quiet, changed)
+    calls = []
+    coordinator.async_add_listener(lambda: calls.append(1), ("1", None))
+    refreshes = []
+    coordinator.async_add_refresh_listener(lambda: refreshes.append(1))
+
+    await coordinator.async_refresh()
+    data = coordinator.data
+    await coordinator.async_refresh()
+    assert coordinator.data is data
+    assert calls == [1]
+    assert coordinator.skipped_entities == 1
+    assert coordinator.metrics.fingerprint_hit_rate("responses") == 50
+
+    # The entities still hear from the coordinator now and then
+    freezer.tick(timedelta(minutes=10))
+    await coordinator.async_refresh()
+    assert calls == [1, 1]
+
+    await coordinator.async_refresh()
+    assert coordinator.data["1"].temperature == 23.0
+    assert calls == [1, 1, 1]
+    assert refreshes == [1, 1, 1, 1]
+    assert coordinator.metrics.fingerprint_hit_rate("thermostats") == 50
+    await coordinator.async_shutdown()
@@ -0,0 +1,90 @@
+"""Test the schluter diagnostics and runtime metrics."""
+import json
+from unittest.mock import patch
+
+from aiohttp import ClientResponseError, RequestInfo
+from multidict import CIMultiDict, CIMultiDictProxy
+import pytest
+from yarl import URL
+
+from homeassistant.components.diagnostics import REDACTED
+
+from custom_components.schluter.api import SchluterClient
+from custom_components.schluter.const import DOMAIN
+from custom_components.schluter.diagnostics import async_get_config_entry_diagnostics
+
+from . import async_setup_integration
+from .fake_schluter import FAKE_PASSWORD, FAKE_USERNAME, FakeSchluterCloud
+
+pytestmark = pytest.mark.usefixtures("socket_enabled")
+
+
+async def test_diagnostics(hass):
+    """Test metrics are reported and credentials are redacted."""
+    async with FakeSchluterCloud() as cloud:
+        entry = await async_setup_integration(hass, FAKE_USERNAME, FAKE_PASSWORD)
+        coordinator = hass.data[DOMAIN][entry.entry_id].coordinator
+
+        cloud.expire_sessions()
+        cloud.thermostats["000000"]["SetPointTemp"] = 2300
+        await coordinator.async_refresh()
+        diagnostics = await async_get_config_entry_diagnostics(hass, entry)
+
+        assert diagnostics["entry"]["data"] == {
+            "username": REDACTED,
+            "password": REDACTED,
+        }
+        assert coordinator.session.sessionid not in json.dumps(diagnostics)
+
+        metrics = diagnostics["metrics"]
+        assert metrics["session_renewals"] == 1
+        assert {
+            "endpoint": "thermostats",
+            "outcome": "invalid_session",
+            "count": 1,
+        } in metrics["api_calls"]
+        assert {"endpoint": "thermostats", "outcome": "ok", "count": 2} in metrics[
+            "api_calls"
+        ]
+        assert metrics["phase_latency"]["fetch"]["count"] == 3
+        assert [poll["outcome"] for poll in metrics["polls"]] == ["ok", "ok"]
+        assert {"session", "login", "fetch", "entities"} <= {
+            phase["phase"] for phase in metrics["polls"][-1]["phases"]
+        }
+        assert metrics["fingerprints"]["responses"] == {
+            "checks": 2,
+            "hits": 0,
+            "hit_rate": 0.0,
+        }
+        assert diagnostics["thermostats"]["000000"]["temperature"] == 21.5
+
+        assert await hass.config_entries.async_unload(entry.entry_id)
+        await hass.async_block_till_done()
+
+
+async def test_diagnostics_redact_http_errors(hass):
+    """Test the session ID quoted by the last HTTP error is not reported."""
+    async with FakeSchluterCloud():
+        entry = await async_setup_integration(hass, FAKE_USERNAME, FAKE_PASSWORD)
+        coordinator = hass.data[DOMAIN][entry.entry_id].coordinator
+        sessionid = coordinator.session.sessionid
+
+        url = URL(f"https://example.com/api/thermostats?sessionId={sessionid}")
+        error = ClientResponseError(
+            RequestInfo(url, "GET", CIMultiDictProxy(CIMultiDict()), url),
+            (),
+            status=502,
+            message="Bad Gateway",
+        )
+        with patch.object(
+            SchluterClient, "async_get_current_thermostats", side_effect=error
+        ):
+            await coordinator.async_refresh()
+        diagnostics = await async_get_config_entry_diagnostics(hass, entry)
+
+        last_exception = diagnostics["coordinator"]["last_exception"]
+        assert "Bad Gateway" in last_exception
+        assert sessionid not in last_exception
+
+        assert await hass.config_entries.async_unload(entry.entry_id)
+        await hass.async_block_till_done()
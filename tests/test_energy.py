@@ -0,0 +1,64 @@
+"""Test the energy integration helpers."""
+from datetime import datetime
+
+import pytest
+
+from homeassistant.util import dt as dt_util
+
+from custom_components.schluter.const import COST_CYCLE_YEARLY
+from custom_components.schluter.energy import CostAccumulator, EnergyIntegrator
+
+
+def test_trapezoidal_integration():
+    """Test power samples are integrated with the trapezoidal rule."""
+    integrator = EnergyIntegrator(max_gap=3600)
+
+    assert integrator.add(0, 0) == 0
+    integrator.add(1000, 1800)
+    integrator.add(1000, 3600)
+
+    # 0.25 kWh while ramping up, 0.5 kWh at a constant 1 kW
+    assert integrator.total == pytest.approx(0.75)
+
+
+def test_gaps_are_not_integrated():
+    """Test samples too far apart do not add energy."""
+    integrator = EnergyIntegrator(total=1.0, max_gap=900)
+
+    integrator.add(1000, 0)
+    assert integrator.add(1000, 3600) == 0
+    assert integrator.add(1000, 3960) == pytest.approx(0.1)
+    assert integrator.total == pytest.approx(1.1)
+
+
+def test_reset_sample():
+    """Test the next sample after a reset only starts a new interval."""
+    integrator = EnergyIntegrator()
+
+    integrator.add(1000, 0)
+    integrator.reset_sample()
+    assert integrator.add(1000, 60) == 0
+    assert integrator.total == 0
+
+
+def test_cost_accumulator_starts_over_each_cycle():
+    """Test the cost is summed per cycle and restored within a cycle only."""
+    zone = dt_util.get_default_time_zone()
+    accumulator = CostAccumulator(COST_CYCLE_YEARLY)
+
+    accumulator.add(1.0, datetime(2024, 6, 1, tzinfo=zone))
+    accumulator.add(0.5, datetime(2024, 12, 31, 23, 59, tzinfo=zone))
+    assert accumulator.total == pytest.approx(1.5)
+    assert accumulator.last_reset == datetime(2024, 1, 1, tzinfo=zone)
+
+    accumulator.add(0.25, datetime(2025, 1, 1, tzinfo=zone))
+    assert accumulator.total == pytest.approx(0.25)
+    assert accumulator.last_reset == datetime(2025, 1, 1, tzinfo=zone)
+
+    accumulator.restore(2.0, datetime(2025, 1, 1, tzinfo=zone))
+    accumulator.add(0.5, datetime(2025, 3, 1, tzinfo=zone))
+    assert accumulator.total == pytest.approx(2.5)
+
+    accumulator.restore(2.0, datetime(2024, 1, 1, tzinfo=zone))
+    accumulator.add(0.5, datetime(2025, 3, 1, tzinfo=zone))
+    assert accumulator.total == pytest.approx(0.5)
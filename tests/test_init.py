@@ -0,0 +1,298 @@
+"""Test the schluter integration setup against the fake cloud."""
+from datetime import timedelta
+from unittest.mock import patch
+
+import pytest
+
+from homeassistant.config_entries import ConfigEntryState
+from homeassistant.const import CONF_PASSWORD, CONF_USERNAME
+from homeassistant.util import dt as dt_util
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    async_fire_time_changed,
+)
+
+from custom_components.schluter.api import SchluterClient
+from custom_components.schluter.commands import SchluterCommand
+from custom_components.schluter.const import (
+    DOMAIN,
+    OPTIMISTIC_TIMEOUT,
+    SNAPSHOT_SAVE_DELAY,
+    SNAPSHOT_STORAGE_KEY,
+)
+
+from . import async_setup_integration, thermostat_payload
+from .fake_schluter import (
+    FAKE_PASSWORD,
+    FAKE_USERNAME,
+    FakeSchluterCloud,
+    FakeSchluterConfig,
+)
+
+pytestmark = pytest.mark.usefixtures("socket_enabled")
+
+
+async def test_setup_and_unload(hass):
+    """Test all entities are created and removed with the entry."""
+    async with FakeSchluterCloud(FakeSchluterConfig(thermostats=2)):
+        entry = await async_setup_integration(hass, FAKE_USERNAME, FAKE_PASSWORD)
+        assert entry.state is ConfigEntryState.LOADED
+        assert len(hass.states.async_entity_ids("climate")) == 2
+        assert len(hass.states.async_entity_ids("sensor")) == 18
+
+        assert await hass.config_entries.async_unload(entry.entry_id)
+        await hass.async_block_till_done()
+        assert entry.state is ConfigEntryState.NOT_LOADED
+
+
+async def test_setup_from_snapshot(hass, hass_storage):
+    """Test entities start from the snapshot while the cloud is slow."""
+    hass_storage[f"{SNAPSHOT_STORAGE_KEY}.snapshot"] = {
+        "version": 1,
+        "minor_version": 1,
+        "key": f"{SNAPSHOT_STORAGE_KEY}.snapshot",
+        "data": {
+            "timestamp": dt_util.utcnow().isoformat(),
+            "thermostats": {"000000": thermostat_payload("000000", Temperature=1800)},
+        },
+    }
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        entry_id="snapshot",
+        unique_id=FAKE_USERNAME,
+        data={CONF_USERNAME: FAKE_USERNAME, CONF_PASSWORD: FAKE_PASSWORD},
+    )
+    entry.add_to_hass(hass)
+
+    async with FakeSchluterCloud(FakeSchluterConfig(latency=0.2)):
+        assert await hass.config_entries.async_setup(entry.entry_id)
+        state = hass.states.get("climate.floor_000000")
+        assert state.attributes["current_temperature"] == 18
+        assert state.attributes["stale"] is True
+
+        await hass.async_block_till_done(wait_background_tasks=True)
+        state = hass.states.get("climate.floor_000000")
+        assert state.attributes["current_temperature"] == 21.5
+        assert "stale" not in state.attributes
+
+        assert await hass.config_entries.async_unload(entry.entry_id)
+        await hass.async_block_till_done()
+
+
+async def test_snapshot_is_saved_without_changes(hass, hass_storage, freezer):
+    """Test the snapshot keeps the time of the last refresh, changed or not."""
+    async with FakeSchluterCloud():
+        entry = await async_setup_integration(
+            hass,
+            FAKE_USERNAME,
+            FAKE_PASSWORD,
+            normal_interval=7200,
+            idle_interval=7200,
+        )
+        coordinator = hass.data[DOMAIN][entry.entry_id].coordinator
+        key = f"{SNAPSHOT_STORAGE_KEY}.{entry.entry_id}"
+
+        # Refreshes more often than the save delay do not postpone the save
+        for _ in range(SNAPSHOT_SAVE_DELAY // 60):
+            freezer.tick(60)
+            await coordinator.async_refresh()
+            async_fire_time_changed(hass)
+            await hass.async_block_till_done()
+
+        assert key in hass_storage
+        timestamp = hass_storage[key]["data"]["timestamp"]
+        assert timestamp == coordinator.data_updated.isoformat()
+
+        assert await hass.config_entries.async_unload(entry.entry_id)
+        await hass.async_block_till_done()
+
+
+async def test_expired_session_is_renewed(hass):
+    """Test a rejected session ID is replaced without failing the refresh."""
+    async with FakeSchluterCloud() as cloud:
+        entry = await async_setup_integration(hass, FAKE_USERNAME, FAKE_PASSWORD)
+        coordinator = hass.data[DOMAIN][entry.entry_id].coordinator
+
+        cloud.expire_sessions()
+        await coordinator.async_refresh()
+
+        assert coordinator.last_update_success
+        assert cloud.requests["/api/authenticate/user"] == 2
+
+        assert await hass.config_entries.async_unload(entry.entry_id)
+        await hass.async_block_till_done()
+
+
+async def test_cloud_errors_serve_stale_data(hass, freezer):
+    """Test failed refreshes keep the last state until the stale window ends."""
+    async with FakeSchluterCloud() as cloud:
+        entry = await async_setup_integration(
+            hass, FAKE_USERNAME, FAKE_PASSWORD, stale_window=600
+        )
+        coordinator = hass.data[DOMAIN][entry.entry_id].coordinator
+
+        cloud.config.error_rate = 1.0
+        data_updated = coordinator.data_updated
+        freezer.tick(30)
+        await coordinator.async_refresh()
+
+        assert not coordinator.last_update_success
+        state = hass.states.get("climate.floor_000000")
+        assert state.state == "auto"
+        assert state.attributes["stale"] is True
+        assert state.attributes["data_updated"] == data_updated.isoformat()
+
+        # Further failures leave the stale state as it is
+        freezer.tick(30)
+        await coordinator.async_refresh()
+        assert hass.states.get("climate.floor_000000").last_updated == (
+            state.last_updated
+        )
+
+        freezer.tick(540)
+        async_fire_time_changed(hass)
+        await hass.async_block_till_done()
+        assert hass.states.get("climate.floor_000000").state == "unavailable"
+
+        cloud.config.error_rate = 0.0
+        await coordinator.async_refresh()
+        state = hass.states.get("climate.floor_000000")
+        assert state.state == "auto"
+        assert "stale" not in state.attributes
+
+        assert await hass.config_entries.async_unload(entry.entry_id)
+        await hass.async_block_till_done()
+
+
+async def test_cloud_errors_without_stale_window(hass):
+    """Test entities become unavailable right away without a stale window."""
+    async with FakeSchluterCloud() as cloud:
+        entry = await async_setup_integration(
+            hass, FAKE_USERNAME, FAKE_PASSWORD, stale_window=0
+        )
+        coordinator = hass.data[DOMAIN][entry.entry_id].coordinator
+
+        cloud.config.error_rate = 1.0
+        await coordinator.async_refresh()
+
+        assert not coordinator.last_update_success
+        assert hass.states.get("climate.floor_000000").state == "unavailable"
+
+        assert await hass.config_entries.async_unload(entry.entry_id)
+        await hass.async_block_till_done()
+
+
+async def test_commands_are_replayed_after_outage(hass):
+    """Test a change made while the cloud fails is written once it recovers."""
+    async with FakeSchluterCloud() as cloud:
+        entry = await async_setup_integration(hass, FAKE_USERNAME, FAKE_PASSWORD)
+        coordinator = hass.data[DOMAIN][entry.entry_id].coordinator
+
+        cloud.config.error_rate = 1.0
+        await hass.services.async_call(
+            "climate",
+            "set_temperature",
+            {"entity_id": "climate.floor_000000", "temperature": 25},
+            blocking=True,
+        )
+        async_fire_time_changed(hass, dt_util.utcnow() + timedelta(seconds=2))
+        await hass.async_block_till_done(wait_background_tasks=True)
+        assert len(coordinator.commands) == 1
+
+        cloud.config.error_rate = 0.0
+        await coordinator.async_refresh()
+        await hass.async_block_till_done(wait_background_tasks=True)
+
+        assert cloud.thermostats["000000"]["SetPointTemp"] == 2500
+        assert not coordinator.commands
+
+        assert await hass.config_entries.async_unload(entry.entry_id)
+        await hass.async_block_till_done()
+
+
+async def test_queued_command_stays_optimistic(hass):
+    """Test a change queued during an outage is not rolled back meanwhile."""
+    async with FakeSchluterCloud() as cloud:
+        entry = await async_setup_integration(hass, FAKE_USERNAME, FAKE_PASSWORD)
+        coordinator = hass.data[DOMAIN][entry.entry_id].coordinator
+
+        cloud.config.error_rate = 1.0
+        await hass.services.async_call(
+            "climate",
+            "set_temperature",
+            {"entity_id": "climate.floor_000000", "temperature": 25},
+            blocking=True,
+        )
+        for seconds in (2, OPTIMISTIC_TIMEOUT * 3):
+            async_fire_time_changed(hass, dt_util.utcnow() + timedelta(seconds=seconds))
+            await hass.async_block_till_done(wait_background_tasks=True)
+        assert coordinator.commands.get("000000") is not None
+        state = hass.states.get("climate.floor_000000")
+        assert state.attributes["temperature"] == 25
+
+        # A dropped command is rolled back once the timeout passes
+        await coordinator.commands.async_remove(
+            "000000", coordinator.commands.get("000000")
+        )
+        async_fire_time_changed(
+            hass, dt_util.utcnow() + timedelta(seconds=OPTIMISTIC_TIMEOUT * 5)
+        )
+        await hass.async_block_till_done(wait_background_tasks=True)
+        state = hass.states.get("climate.floor_000000")
+        assert state.attributes["temperature"] == 22
+
+        assert await hass.config_entries.async_unload(entry.entry_id)
+        await hass.async_block_till_done()
+
+
+async def test_write_during_replay_is_kept(hass):
+    """Test a change written while queued commands replay is not overwritten."""
+    async with FakeSchluterCloud(FakeSchluterConfig(thermostats=2)) as cloud:
+        entry = await async_setup_integration(hass, FAKE_USERNAME, FAKE_PASSWORD)
+        coordinator = hass.data[DOMAIN][entry.entry_id].coordinator
+        now = dt_util.utcnow()
+        await coordinator.commands.async_put(
+            "000000", SchluterCommand(18.0, queued=now)
+        )
+        await coordinator.commands.async_put(
+            "000001", SchluterCommand(19.0, queued=now + timedelta(seconds=1))
+        )
+
+        writes = []
+        set_temperature = SchluterClient.async_set_temperature
+
+        async def _async_set_temperature(self, sessionid, serial_number, value):
+            writes.append((serial_number, value))
+            if len(writes) == 1:
+                # The user changes the second thermostat during the replay
+                await coordinator.async_get_write_queue("000001").async_write(25.0)
+            return await set_temperature(self, sessionid, serial_number, value)
+
+        with patch.object(
+            SchluterClient, "async_set_temperature", _async_set_temperature
+        ):
+            await coordinator.async_refresh()
+            await hass.async_block_till_done(wait_background_tasks=True)
+
+        assert writes == [("000000", 18.0), ("000001", 25.0)]
+        assert cloud.thermostats["000001"]["SetPointTemp"] == 2500
+        assert not coordinator.commands
+
+        assert await hass.config_entries.async_unload(entry.entry_id)
+        await hass.async_block_till_done()
+
+
+async def test_unknown_queued_commands_are_dropped(hass):
+    """Test a command queued for a thermostat that is gone is not retried."""
+    async with FakeSchluterCloud():
+        entry = await async_setup_integration(hass, FAKE_USERNAME, FAKE_PASSWORD)
+        coordinator = hass.data[DOMAIN][entry.entry_id].coordinator
+
+        await coordinator.commands.async_put("removed", SchluterCommand(21.0))
+        await coordinator.async_refresh()
+        await hass.async_block_till_done(wait_background_tasks=True)
+
+        assert not coordinator.commands
+
+        assert await hass.config_entries.async_unload(entry.entry_id)
+        await hass.async_block_till_done()
@@ -0,0 +1,50 @@
+"""Test the thermostat view model."""
+from aioschluter import Thermostat
+
+from homeassistant.components.climate import HVACAction, HVACMode
+
+from custom_components.schluter.model import (
+    SchluterAccountSummary,
+    SchluterThermostatView,
+)
+
+from . import thermostat_payload
+
+
+def test_view_derives_entity_state():
+    """Test the HVAC mode, action and power are derived once."""
+    view = SchluterThermostatView(
+        Thermostat(thermostat_payload("1234", RegulationMode=2, Heating=True))
+    )
+    assert view.hvac_mode is HVACMode.HEAT
+    assert view.hvac_action is HVACAction.HEATING
+    assert view.power == 800
+    assert view.device_info["identifiers"] == {("schluter", "1234")}
+
+    view = SchluterThermostatView(
+        Thermostat(thermostat_payload("1234", RegulationMode=3, Heating=False))
+    )
+    assert view.hvac_mode is HVACMode.OFF
+    assert view.hvac_action is HVACAction.IDLE
+    assert view.power == 0
+    assert not hasattr(view, "__dict__")
+
+
+def test_account_summary():
+    """Test the totals of an account skip offline thermostats."""
+    data = {
+        serial_number: SchluterThermostatView(Thermostat(payload))
+        for serial_number, payload in (
+            ("1", thermostat_payload("1", Heating=True, Temperature=2000)),
+            ("2", thermostat_payload("2", Heating=False, Temperature=2200)),
+            ("3", thermostat_payload("3", Heating=True, Online=False)),
+        )
+    }
+    summary = SchluterAccountSummary(data)
+
+    assert summary.thermostats == 3
+    assert summary.power == 800
+    assert summary.heating == 1
+    assert summary.offline == 1
+    assert summary.average_temperature == 21
+    assert SchluterAccountSummary({}).average_temperature is None
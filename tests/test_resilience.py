@@ -0,0 +1,122 @@
+"""Test the backoff and circuit breaker for the Schluter cloud."""
+from unittest.mock import patch
+
+from aiohttp import ClientError
+from aioschluter import ApiError, InvalidUserPasswordError
+import pytest
+
+from homeassistant.exceptions import ConfigEntryAuthFailed
+from homeassistant.helpers.update_coordinator import UpdateFailed
+
+from custom_components.schluter.const import DOMAIN
+from custom_components.schluter.resilience import (
+    SchluterRateLimit,
+    SchluterResilience,
+    SchluterUnreachable,
+    parse_retry_after,
+)
+
+from . import async_setup_integration
+from .fake_schluter import (
+    FAKE_PASSWORD,
+    FAKE_USERNAME,
+    FakeSchluterCloud,
+    FakeSchluterConfig,
+)
+
+
+async def _fail(resilience, err=None):
+    with pytest.raises(UpdateFailed):
+        async with resilience.async_guard():
+            raise err or ApiError("Invalid Response: 500")
+
+
+async def test_circuit_opens_and_probes():
+    """Test the circuit fails fast after repeated failures until a probe."""
+    resilience = SchluterResilience(
+        SchluterRateLimit(), threshold=2, base=10, maximum=100
+    )
+    with patch("time.monotonic", return_value=1000.0) as monotonic:
+        await _fail(resilience)
+        assert not resilience.is_open
+        await _fail(resilience)
+        assert resilience.is_open
+        assert 10 <= resilience.retry_delay() <= 20
+
+        # Calls fail fast without reaching the cloud while the circuit is open
+        with pytest.raises(UpdateFailed, match="unavailable"):
+            async with resilience.async_guard():
+                pytest.fail("call was not rejected")
+
+        # A failed probe re-opens the circuit with a longer delay
+        monotonic.return_value = 1021.0
+        await _fail(resilience)
+        assert resilience.is_open
+        assert 20 <= resilience.retry_delay() <= 40
+
+        monotonic.return_value = 1062.0
+        async with resilience.async_guard():
+            pass
+        assert not resilience.is_open
+        assert resilience.failures == 0
+
+
+async def test_auth_errors_do_not_open_the_circuit():
+    """Test rejected credentials start a reauth instead of a backoff."""
+    resilience = SchluterResilience(SchluterRateLimit(), threshold=1)
+    with pytest.raises(ConfigEntryAuthFailed):
+        async with resilience.async_guard():
+            raise InvalidUserPasswordError("Invalid username or password")
+    assert not resilience.is_open
+
+
+@pytest.mark.parametrize(
+    ("err", "unreachable"),
+    [
+        (ApiError("Invalid Response: 500"), True),
+        (ApiError("Invalid Response from Schluter API: 503"), True),
+        (ApiError("Invalid Response: 429"), True),
+        (ApiError("Invalid Response: 400"), False),
+        (ApiError("Unknown ErrorCode was returned by Schluter Api"), False),
+        (ClientError(), True),
+        (TimeoutError(), True),
+    ],
+)
+async def test_unreachable_errors(err, unreachable):
+    """Test only failures worth retrying are reported as unreachable."""
+    resilience = SchluterResilience(SchluterRateLimit())
+    with pytest.raises(UpdateFailed) as exc_info:
+        async with resilience.async_guard():
+            raise err
+    assert isinstance(exc_info.value, SchluterUnreachable) is unreachable
+
+
+def test_parse_retry_after():
+    """Test both forms of the Retry-After header are understood."""
+    assert parse_retry_after("120") == 120
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0
+    assert parse_retry_after("soon") is None
+    assert parse_retry_after("nan") is None
+    assert parse_retry_after(None) is None
+
+
+@pytest.mark.usefixtures("socket_enabled")
+async def test_rate_limit_honours_retry_after(hass):
+    """Test a 429 opens the circuit for at least the Retry-After."""
+    async with FakeSchluterCloud(FakeSchluterConfig(retry_after=600)) as cloud:
+        entry = await async_setup_integration(hass, FAKE_USERNAME, FAKE_PASSWORD)
+        coordinator = hass.data[DOMAIN][entry.entry_id].coordinator
+
+        cloud.config.rate_limit_rate = 1.0
+        await coordinator.async_refresh()
+        assert coordinator.resilience.is_open
+        assert coordinator.update_interval.total_seconds() > 590
+
+        requests = cloud.requests.total()
+        cloud.config.rate_limit_rate = 0.0
+        await coordinator.async_refresh()
+        assert not coordinator.last_update_success
+        assert cloud.requests.total() == requests
+
+        assert await hass.config_entries.async_unload(entry.entry_id)
+        await hass.async_block_till_done()
@@ -0,0 +1,95 @@
+"""Test the heating runtime statistics."""
+from datetime import UTC, date, datetime, timedelta
+from unittest.mock import MagicMock
+
+import pytest
+
+from homeassistant.util import dt as dt_util
+
+from custom_components.schluter.runtime import (
+    HeatingRuntime,
+    RuntimeWindow,
+    SchluterRuntimeStats,
+)
+
+TODAY = date(2024, 1, 1)
+
+
+def _midnight(day: date) -> float:
+    return dt_util.start_of_local_day(day).timestamp()
+
+
+def _thermostat(heating: bool, online: bool = True):
+    return MagicMock(is_online=online, is_heating=heating, power=800 if heating else 0)
+
+
+def test_window_drops_expired_buckets():
+    """Test intervals leave the window once their bucket expired."""
+    window = RuntimeWindow(bucket_seconds=60, buckets=60)
+
+    window.add(60, 60, True, 1000)
+    window.add(120, 60, False, 0)
+    assert window.duty_cycle == pytest.approx(50)
+    assert window.average_power == pytest.approx(500)
+
+    window.advance(60 * 61)
+    assert window.duty_cycle == 0
+    window.advance(60 * 200)
+    assert window.duty_cycle is None
+
+
+def test_duty_cycle_and_heating_today():
+    """Test intervals are accounted with the state of their first sample."""
+    runtime = HeatingRuntime(max_gap=900)
+    midnight = _midnight(TODAY)
+
+    runtime.add(midnight, TODAY, _thermostat(True))
+    runtime.add(midnight + 300, TODAY, _thermostat(False))
+    runtime.add(midnight + 900, TODAY, _thermostat(True))
+
+    assert runtime.windows["1h"].duty_cycle == pytest.approx(100 / 3)
+    assert runtime.windows["24h"].average_power == pytest.approx(800 / 3)
+    assert runtime.heating_today == 300
+
+
+def test_heating_today_starts_at_midnight():
+    """Test an interval crossing midnight only counts its part after midnight."""
+    runtime = HeatingRuntime(max_gap=900)
+    tomorrow = _midnight(TODAY + timedelta(days=1))
+
+    runtime.add(tomorrow - 600, TODAY, _thermostat(True))
+    runtime.add(tomorrow - 300, TODAY, _thermostat(True))
+    assert runtime.heating_today == 300
+
+    runtime.add(tomorrow + 120, TODAY + timedelta(days=1), _thermostat(True))
+    assert runtime.heating_today == 120
+    assert runtime.windows["7d"].heating == 720
+
+
+def test_gaps_and_offline_thermostats_are_skipped():
+    """Test outages are not accounted as heating or idle time."""
+    runtime = HeatingRuntime(max_gap=900)
+    midnight = _midnight(TODAY)
+
+    runtime.add(midnight, TODAY, _thermostat(True))
+    runtime.add(midnight + 3600, TODAY, _thermostat(True, online=False))
+    runtime.add(midnight + 3900, TODAY, _thermostat(True))
+
+    assert runtime.windows["24h"].observed == 0
+    assert runtime.heating_today == 0
+
+
+async def test_statistics_are_restored(hass):
+    """Test the statistics survive a restart."""
+    now = datetime(2024, 1, 1, 20, tzinfo=UTC)
+    stats = SchluterRuntimeStats(hass, "entry")
+    stats.async_add({"000000": _thermostat(True)}, now)
+    stats.async_add({"000000": _thermostat(True)}, now + timedelta(minutes=10))
+    await stats.async_save()
+
+    restored = SchluterRuntimeStats(hass, "entry")
+    await restored.async_load()
+
+    runtime = restored.get("000000")
+    assert runtime.windows["1h"].duty_cycle == 100
+    assert runtime.heating_today == 600
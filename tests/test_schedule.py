@@ -0,0 +1,178 @@
+"""Test the weekly schedules of the thermostats."""
+from datetime import datetime, timedelta, timezone
+from unittest.mock import patch
+
+from aioschluter import ApiError
+import pytest
+
+from homeassistant.util import dt as dt_util
+from pytest_homeassistant_custom_component.common import async_fire_time_changed
+
+from custom_components.schluter.api import SchluterClient
+from custom_components.schluter.const import DOMAIN, SCHEDULE_REFRESH_INTERVAL
+from custom_components.schluter.schedule import SchluterSchedule, parse_tz_offset
+
+from . import async_setup_integration
+from .fake_schluter import (
+    FAKE_PASSWORD,
+    FAKE_USERNAME,
+    FakeSchluterCloud,
+    FakeSchluterConfig,
+)
+
+SCHEDULE = {
+    "Days": [
+        {
+            "WeekDayGrpNo": weekday,
+            "Events": [
+                {"Clock": "06:00:00", "Temperature": 2400, "Active": True},
+                {"Clock": "08:30:00", "Temperature": 1000, "Active": False},
+                {"Clock": "22:00:00", "Temperature": 1800, "Active": True},
+            ],
+        }
+        for weekday in range(1, 8)
+    ]
+}
+
+
+# TZOffset of the thermostats of the fake cloud
+THERMOSTAT_TIME_ZONE = timezone(timedelta(hours=-5))
+
+
+def _local(*args: int) -> datetime:
+    return datetime(*args, tzinfo=dt_util.get_default_time_zone())
+
+
+def _thermostat_time(*args: int) -> datetime:
+    return datetime(*args, tzinfo=THERMOSTAT_TIME_ZONE)
+
+
+async def test_next_transition(hass):
+    """Test the next active set-point change is found across days and weeks."""
+    schedule = SchluterSchedule(SCHEDULE)
+
+    # Monday 1 January 2024
+    assert schedule.next_transition(_local(2024, 1, 1, 5, 0)) == (
+        _local(2024, 1, 1, 6, 0),
+        24,
+    )
+    assert schedule.next_transition(_local(2024, 1, 1, 6, 0)) == (
+        _local(2024, 1, 1, 22, 0),
+        18,
+    )
+    assert schedule.next_transition(_local(2024, 1, 7, 23, 0)) == (
+        _local(2024, 1, 8, 6, 0),
+        24,
+    )
+    assert SchluterSchedule({"Days": []}).next_transition(_local(2024, 1, 1)) is None
+
+
+async def test_next_transition_of_thermostat_time_zone(hass):
+    """Test the clock times are read in the time zone of the thermostat."""
+    schedule = SchluterSchedule(SCHEDULE)
+    time_zone = parse_tz_offset("-05:00")
+
+    assert time_zone == THERMOSTAT_TIME_ZONE
+    assert schedule.next_transition(
+        _thermostat_time(2024, 1, 1, 5, 0), time_zone
+    ) == (_thermostat_time(2024, 1, 1, 6, 0), 24)
+    assert parse_tz_offset("+05:30") == timezone(timedelta(hours=5, minutes=30))
+    assert parse_tz_offset("EST") is None
+    assert parse_tz_offset(None) is None
+
+
+@pytest.mark.usefixtures("socket_enabled")
+async def test_refresh_after_transition(hass, freezer):
+    """Test the thermostats are refreshed right after a scheduled change."""
+    freezer.move_to(_thermostat_time(2024, 1, 1, 5, 0))
+    async with FakeSchluterCloud() as cloud:
+        cloud.schedules["000000"] = SCHEDULE
+        # Poll less often than the schedule changes
+        entry = await async_setup_integration(
+            hass,
+            FAKE_USERNAME,
+            FAKE_PASSWORD,
+            normal_interval=7200,
+            idle_interval=7200,
+        )
+        await hass.async_block_till_done(wait_background_tasks=True)
+
+        state = hass.states.get("climate.floor_000000")
+        assert state.attributes["next_set_point"] == 24
+        assert state.attributes["next_transition"] == (
+            _thermostat_time(2024, 1, 1, 6, 0).isoformat()
+        )
+
+        cloud.thermostats["000000"]["SetPointTemp"] = 2400
+        freezer.tick(timedelta(hours=1, seconds=30))
+        async_fire_time_changed(hass)
+        await hass.async_block_till_done()
+
+        state = hass.states.get("climate.floor_000000")
+        assert state.attributes["temperature"] == 24
+        assert state.attributes["next_set_point"] == 18
+
+        assert await hass.config_entries.async_unload(entry.entry_id)
+        await hass.async_block_till_done()
+
+
+@pytest.mark.usefixtures("socket_enabled")
+async def test_transition_without_data_change(hass, freezer):
+    """Test the next set-point is updated when the thermostat data is not."""
+    freezer.move_to(_thermostat_time(2024, 1, 1, 5, 0))
+    async with FakeSchluterCloud() as cloud:
+        cloud.schedules["000000"] = SCHEDULE
+        entry = await async_setup_integration(
+            hass,
+            FAKE_USERNAME,
+            FAKE_PASSWORD,
+            normal_interval=7200,
+            idle_interval=7200,
+        )
+        await hass.async_block_till_done(wait_background_tasks=True)
+        state = hass.states.get("climate.floor_000000")
+        assert state.attributes["next_set_point"] == 24
+
+        freezer.tick(timedelta(hours=1, seconds=30))
+        async_fire_time_changed(hass)
+        await hass.async_block_till_done()
+
+        state = hass.states.get("climate.floor_000000")
+        assert state.attributes["next_set_point"] == 18
+        assert state.attributes["next_transition"] == (
+            _thermostat_time(2024, 1, 1, 22, 0).isoformat()
+        )
+
+        assert await hass.config_entries.async_unload(entry.entry_id)
+        await hass.async_block_till_done()
+
+
+@pytest.mark.usefixtures("socket_enabled")
+async def test_schedule_fetch_counts_towards_the_circuit(hass, freezer):
+    """Test a failing schedule fetch backs off like any other call."""
+    # No scheduled change until 22:00 refreshes the thermostats in between
+    freezer.move_to(_thermostat_time(2024, 1, 1, 9, 0))
+    async with FakeSchluterCloud(FakeSchluterConfig(thermostats=3)) as cloud:
+        for serial_number in cloud.thermostats:
+            cloud.schedules[serial_number] = SCHEDULE
+        entry = await async_setup_integration(hass, FAKE_USERNAME, FAKE_PASSWORD)
+        await hass.async_block_till_done(wait_background_tasks=True)
+        coordinator = hass.data[DOMAIN][entry.entry_id].coordinator
+        assert len(coordinator.schedules) == 3
+
+        with patch.object(
+            SchluterClient,
+            "async_get_schedule",
+            side_effect=ApiError("Invalid Response: 500"),
+        ) as get_schedule:
+            freezer.tick(timedelta(seconds=SCHEDULE_REFRESH_INTERVAL))
+            async_fire_time_changed(hass)
+            await hass.async_block_till_done(wait_background_tasks=True)
+
+        # The cloud is failing, the other schedules are not asked for
+        assert get_schedule.call_count == 1
+        assert coordinator.resilience.failures == 1
+        assert len(coordinator.schedules) == 3
+
+        assert await hass.config_entries.async_unload(entry.entry_id)
+        await hass.async_block_till_done()
@@ -0,0 +1,109 @@
+"""Test the poll scheduler shared by all Schluter accounts."""
+import time
+
+import pytest
+
+from homeassistant.const import CONF_PASSWORD, CONF_USERNAME
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    async_fire_time_changed,
+)
+
+from custom_components.schluter.const import DOMAIN
+from custom_components.schluter.scheduler import SchluterScheduler
+
+from .fake_schluter import FAKE_PASSWORD, FAKE_USERNAME, FakeSchluterCloud
+
+
+async def test_refreshes_are_spread_over_the_interval(hass):
+    """Test every account refreshes on its own slot of the interval."""
+    scheduler = SchluterScheduler(hass)
+    members = [object(), object(), object()]
+    for member in members:
+        scheduler.async_register(member)
+
+    for now in (0, 7, 1234, 98765):
+        refreshes = []
+        for member in members:
+            delay = scheduler.phase_delay(member, 60, now)
+            # Refreshes are only moved earlier, never further apart
+            assert -60 < delay <= 0
+            refreshes.append((now + 60 + delay) % 60)
+        assert refreshes == [0, 20, 40]
+
+
+async def test_single_account_is_not_shifted(hass):
+    """Test a single account keeps its plain interval."""
+    scheduler = SchluterScheduler(hass)
+    member = object()
+    scheduler.async_register(member)
+    assert scheduler.phase_delay(member, 60, 1234) == 0
+
+
+@pytest.mark.usefixtures("socket_enabled")
+async def test_accounts_share_one_session(hass):
+    """Test all accounts use one HTTP session that closes with the last."""
+    entries = [
+        MockConfigEntry(
+            domain=DOMAIN,
+            unique_id=f"{site}-{FAKE_USERNAME}",
+            data={CONF_USERNAME: FAKE_USERNAME, CONF_PASSWORD: FAKE_PASSWORD},
+        )
+        for site in ("home", "cabin")
+    ]
+    async with FakeSchluterCloud():
+        for entry in entries:
+            entry.add_to_hass(hass)
+            assert await hass.config_entries.async_setup(entry.entry_id)
+        await hass.async_block_till_done()
+
+        websessions = {
+            hass.data[DOMAIN][entry.entry_id].api._session for entry in entries
+        }
+        assert len(websessions) == 1
+        websession = websessions.pop()
+
+        for entry in entries:
+            assert await hass.config_entries.async_unload(entry.entry_id)
+        await hass.async_block_till_done()
+        assert websession.closed
+
+
+@pytest.mark.usefixtures("socket_enabled")
+async def test_accounts_refresh_on_their_slots(hass, freezer):
+    """Test the polls of two accounts are half an interval apart."""
+    entries = [
+        MockConfigEntry(
+            domain=DOMAIN,
+            unique_id=f"{site}-{FAKE_USERNAME}",
+            data={CONF_USERNAME: FAKE_USERNAME, CONF_PASSWORD: FAKE_PASSWORD},
+            options={"normal_interval": 60, "idle_interval": 60},
+        )
+        for site in ("home", "cabin")
+    ]
+    refreshes: dict[str, list[float]] = {}
+    async with FakeSchluterCloud():
+        for entry in entries:
+            entry.add_to_hass(hass)
+            assert await hass.config_entries.async_setup(entry.entry_id)
+            coordinator = hass.data[DOMAIN][entry.entry_id].coordinator
+            times = refreshes[entry.entry_id] = []
+            coordinator.async_add_refresh_listener(
+                lambda times=times: times.append(time.monotonic())
+            )
+        await hass.async_block_till_done()
+
+        # The first refreshes move the accounts onto their slots
+        for _ in range(240):
+            freezer.tick(1)
+            async_fire_time_changed(hass)
+            await hass.async_block_till_done(wait_background_tasks=True)
+
+        home, cabin = (refreshes[entry.entry_id] for entry in entries)
+        assert home[-1] - home[-2] == pytest.approx(60, abs=1)
+        assert cabin[-1] - cabin[-2] == pytest.approx(60, abs=1)
+        assert (home[-1] - cabin[-1]) % 60 == pytest.approx(30, abs=1)
+
+        for entry in entries:
+            assert await hass.config_entries.async_unload(entry.entry_id)
+        await hass.async_block_till_done()
@@ -0,0 +1,242 @@
+"""Test the schluter sensors against the fake cloud."""
+from datetime import datetime, timedelta
+
+import pytest
+
+from homeassistant.core import State
+from homeassistant.helpers import entity_registry as er
+from homeassistant.util import dt as dt_util
+from pytest_homeassistant_custom_component.common import (
+    async_fire_time_changed,
+    mock_restore_cache_with_extra_data,
+)
+
+from custom_components.schluter.const import DOMAIN, MAX_POLL_INTERVAL
+
+from . import async_setup_integration
+from .fake_schluter import (
+    FAKE_PASSWORD,
+    FAKE_USERNAME,
+    FakeSchluterCloud,
+    FakeSchluterConfig,
+)
+
+pytestmark = pytest.mark.usefixtures("socket_enabled")
+
+TEMPERATURE = "sensor.floor_000000_current_temperature"
+COST = "sensor.floor_000000_cost"
+TOTAL_COST = "sensor.schluter_total_cost"
+
+
+def _local(*args: int) -> datetime:
+    return datetime(*args, tzinfo=dt_util.get_default_time_zone())
+
+
+async def test_temperature_deadband(hass, freezer):
+    """Test small changes are held back until the heartbeat is due."""
+    async with FakeSchluterCloud() as cloud:
+        entry = await async_setup_integration(
+            hass,
+            FAKE_USERNAME,
+            FAKE_PASSWORD,
+            temperature_deadband=1.0,
+            heartbeat=600,
+        )
+        coordinator = hass.data[DOMAIN][entry.entry_id].coordinator
+        thermostat = cloud.thermostats["000000"]
+        assert hass.states.get(TEMPERATURE).state == "21.5"
+
+        thermostat["Temperature"] = 2200
+        await coordinator.async_refresh()
+        assert hass.states.get(TEMPERATURE).state == "21.5"
+        assert coordinator.metrics.suppressed_writes["temperature"] == 1
+
+        thermostat["Temperature"] = 2300
+        await coordinator.async_refresh()
+        assert hass.states.get(TEMPERATURE).state == "23.0"
+
+        thermostat["Temperature"] = 2250
+        await coordinator.async_refresh()
+        assert hass.states.get(TEMPERATURE).state == "23.0"
+
+        freezer.tick(601)
+        async_fire_time_changed(hass)
+        await hass.async_block_till_done()
+        assert hass.states.get(TEMPERATURE).state == "22.5"
+        assert coordinator.metrics.suppressed_writes["temperature"] == 2
+
+        assert await hass.config_entries.async_unload(entry.entry_id)
+        await hass.async_block_till_done()
+
+
+async def test_availability_bypasses_deadband(hass):
+    """Test a thermostat going offline is written despite the deadband."""
+    async with FakeSchluterCloud() as cloud:
+        entry = await async_setup_integration(
+            hass, FAKE_USERNAME, FAKE_PASSWORD, temperature_deadband=5.0
+        )
+        coordinator = hass.data[DOMAIN][entry.entry_id].coordinator
+
+        cloud.thermostats["000000"]["Online"] = False
+        await coordinator.async_refresh()
+
+        assert hass.states.get(TEMPERATURE).state == "unavailable"
+        assert not coordinator.metrics.suppressed_writes
+
+        assert await hass.config_entries.async_unload(entry.entry_id)
+        await hass.async_block_till_done()
+
+
+async def test_account_totals(hass):
+    """Test the totals of the account follow the thermostats."""
+    async with FakeSchluterCloud(FakeSchluterConfig(thermostats=3)) as cloud:
+        entry = await async_setup_integration(hass, FAKE_USERNAME, FAKE_PASSWORD)
+        coordinator = hass.data[DOMAIN][entry.entry_id].coordinator
+        assert hass.states.get("sensor.schluter_total_power").state == "0"
+
+        cloud.thermostats["000000"]["Heating"] = True
+        cloud.thermostats["000001"]["Heating"] = True
+        cloud.thermostats["000002"]["Online"] = False
+        await coordinator.async_refresh()
+
+        assert hass.states.get("sensor.schluter_total_power").state == "1600"
+        assert hass.states.get("sensor.schluter_heating_floors").state == "2"
+        assert hass.states.get("sensor.schluter_offline_floors").state == "1"
+        assert hass.states.get("sensor.schluter_average_temperature").state == "21.5"
+
+        assert await hass.config_entries.async_unload(entry.entry_id)
+        await hass.async_block_till_done()
+
+
+async def test_metrics_follow_unchanged_refreshes(hass):
+    """Test the metric sensors update when the other entities are left alone."""
+    async with FakeSchluterCloud():
+        entry = await async_setup_integration(hass, FAKE_USERNAME, FAKE_PASSWORD)
+        er.async_get(hass).async_update_entity(
+            "sensor.schluter_unchanged_responses", disabled_by=None
+        )
+        assert await hass.config_entries.async_reload(entry.entry_id)
+        await hass.async_block_till_done()
+        coordinator = hass.data[DOMAIN][entry.entry_id].coordinator
+
+        await coordinator.async_refresh()
+
+        assert coordinator.skipped_entities
+        assert hass.states.get("sensor.schluter_unchanged_responses").state == "50.0"
+
+        assert await hass.config_entries.async_unload(entry.entry_id)
+        await hass.async_block_till_done()
+
+
+async def test_unique_ids(hass):
+    """Test the sensors keep the unique IDs of earlier versions."""
+    async with FakeSchluterCloud():
+        entry = await async_setup_integration(hass, FAKE_USERNAME, FAKE_PASSWORD)
+        registry = er.async_get(hass)
+
+        for entity_id, unique_id in (
+            (TEMPERATURE, "Floor 000000-temperature"),
+            (
+                "sensor.floor_000000_target_temperature",
+                "Floor 000000-target-temperature",
+            ),
+            ("sensor.floor_000000_power", "Floor 000000-power"),
+            ("sensor.floor_000000_price", "Floor 000000-monetary"),
+            ("sensor.floor_000000_energy", "Floor 000000-energy"),
+        ):
+            assert registry.async_get(entity_id).unique_id == unique_id
+
+        assert await hass.config_entries.async_unload(entry.entry_id)
+        await hass.async_block_till_done()
+
+
+async def test_cost_resets_with_the_cycle(hass, freezer):
+    """Test the cost adds up the priced energy and starts over monthly."""
+    freezer.move_to(_local(2024, 1, 31, 23, 15))
+    async with FakeSchluterCloud() as cloud:
+        cloud.thermostats["000000"]["Heating"] = True
+        entry = await async_setup_integration(hass, FAKE_USERNAME, FAKE_PASSWORD)
+        coordinator = hass.data[DOMAIN][entry.entry_id].coordinator
+
+        # 800 W for 15 minutes at 0.12 per kWh
+        for _ in range(2):
+            freezer.tick(timedelta(minutes=15))
+            await coordinator.async_refresh()
+        state = hass.states.get(COST)
+        assert state.state == "0.05"
+        assert state.attributes["last_reset"] == _local(2024, 1, 1).isoformat()
+        assert state.attributes["state_class"] == "total"
+        assert hass.states.get(TOTAL_COST).state == "0.05"
+
+        freezer.tick(timedelta(minutes=15))
+        await coordinator.async_refresh()
+        state = hass.states.get(COST)
+        assert state.state == "0.02"
+        assert state.attributes["last_reset"] == _local(2024, 2, 1).isoformat()
+        assert hass.states.get(TOTAL_COST).state == "0.02"
+
+        assert "state_class" not in hass.states.get(
+            "sensor.floor_000000_price"
+        ).attributes
+
+        assert await hass.config_entries.async_unload(entry.entry_id)
+        await hass.async_block_till_done()
+
+
+async def test_energy_at_the_longest_interval(hass, freezer):
+    """Test unchanged refreshes at the longest interval still count energy."""
+    freezer.move_to(_local(2024, 1, 10, 12))
+    async with FakeSchluterCloud() as cloud:
+        cloud.thermostats["000000"]["Heating"] = True
+        # Saved before the intervals were capped
+        entry = await async_setup_integration(
+            hass,
+            FAKE_USERNAME,
+            FAKE_PASSWORD,
+            fast_duration=0,
+            normal_interval=900,
+            idle_interval=900,
+        )
+        coordinator = hass.data[DOMAIN][entry.entry_id].coordinator
+        assert coordinator.current_interval == timedelta(seconds=MAX_POLL_INTERVAL)
+
+        # 800 W for 30 minutes at 0.12 per kWh, every refresh is unchanged
+        for _ in range(4):
+            freezer.tick(timedelta(seconds=MAX_POLL_INTERVAL))
+            async_fire_time_changed(hass)
+            await hass.async_block_till_done(wait_background_tasks=True)
+        assert coordinator.data_updated == _local(2024, 1, 10, 12, 30)
+        assert hass.states.get(COST).state == "0.05"
+
+        assert await hass.config_entries.async_unload(entry.entry_id)
+        await hass.async_block_till_done()
+
+
+async def test_cost_is_restored(hass, freezer):
+    """Test the cost of the running cycle survives a restart, an old one not."""
+    freezer.move_to(_local(2024, 2, 10, 12))
+    mock_restore_cache_with_extra_data(
+        hass,
+        [
+            (
+                State(COST, "1.5", {"last_reset": _local(2024, 2, 1).isoformat()}),
+                {"native_value": 1.5, "native_unit_of_measurement": "EUR"},
+            ),
+            (
+                State(
+                    TOTAL_COST, "9.0", {"last_reset": _local(2024, 1, 1).isoformat()}
+                ),
+                {"native_value": 9.0, "native_unit_of_measurement": "EUR"},
+            ),
+        ],
+    )
+    async with FakeSchluterCloud():
+        entry = await async_setup_integration(
+            hass, FAKE_USERNAME, FAKE_PASSWORD, cost_cycle="monthly"
+        )
+
+        assert hass.states.get(COST).state == "1.5"
+        assert hass.states.get(TOTAL_COST).state == "0.0"
+
+        assert await hass.config_entries.async_unload(entry.entry_id)
+        await hass.async_block_till_done()
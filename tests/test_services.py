@@ -0,0 +1,201 @@
+"""Test the bulk services of the schluter integration."""
+from datetime import timedelta
+import pstats
+
+import pytest
+
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers import entity_registry as er
+from homeassistant.setup import async_setup_component
+from homeassistant.util import dt as dt_util
+from pytest_homeassistant_custom_component.common import async_fire_time_changed
+
+from custom_components.schluter.const import DOMAIN
+
+from . import async_setup_integration
+from .fake_schluter import (
+    FAKE_PASSWORD,
+    FAKE_USERNAME,
+    FakeSchluterCloud,
+    FakeSchluterConfig,
+)
+
+pytestmark = pytest.mark.usefixtures("socket_enabled")
+
+
+async def test_set_regulation_modes(hass):
+    """Test all thermostats are written and refreshed once."""
+    async with FakeSchluterCloud(FakeSchluterConfig(thermostats=6)) as cloud:
+        entry = await async_setup_integration(hass, FAKE_USERNAME, FAKE_PASSWORD)
+        await hass.async_block_till_done(wait_background_tasks=True)
+        entity_ids = hass.states.async_entity_ids("climate")
+        fetches = cloud.requests["/api/thermostats"]
+        # The schedules are fetched from the same endpoint
+        writes = cloud.requests["/api/thermostat"]
+
+        response = await hass.services.async_call(
+            DOMAIN,
+            "set_regulation_modes",
+            {"entity_id": entity_ids, "regulation_mode": "away"},
+            blocking=True,
+            return_response=True,
+        )
+
+        assert response == {
+            "thermostats": {entity_id: {"success": True} for entity_id in entity_ids}
+        }
+        assert cloud.requests["/api/thermostat"] == writes + 6
+        assert cloud.requests["/api/thermostats"] == fetches + 1
+        assert all(
+            hass.states.get(entity_id).state == "off" for entity_id in entity_ids
+        )
+
+        assert await hass.config_entries.async_unload(entry.entry_id)
+        await hass.async_block_till_done()
+
+
+async def test_set_temperatures_reports_each_thermostat(hass):
+    """Test a failing thermostat does not stop the others."""
+    async with FakeSchluterCloud(FakeSchluterConfig(thermostats=2)) as cloud:
+        entry = await async_setup_integration(hass, FAKE_USERNAME, FAKE_PASSWORD)
+        cloud.thermostats["000001"]["MaxTemp"] = 2000
+        await hass.data[DOMAIN][entry.entry_id].coordinator.async_refresh()
+
+        response = await hass.services.async_call(
+            DOMAIN,
+            "set_temperatures",
+            {
+                "entity_id": ["climate.floor_000000", "climate.floor_000001"],
+                "temperature": 24,
+            },
+            blocking=True,
+            return_response=True,
+        )
+
+        results = response["thermostats"]
+        assert results["climate.floor_000000"] == {"success": True}
+        assert not results["climate.floor_000001"]["success"]
+        assert cloud.thermostats["000000"]["SetPointTemp"] == 2400
+        assert cloud.thermostats["000001"]["SetPointTemp"] == 2200
+
+        # Nothing changed, so nothing is refreshed
+        fetches = cloud.requests["/api/thermostats"]
+        with pytest.raises(HomeAssistantError):
+            await hass.services.async_call(
+                DOMAIN,
+                "set_temperatures",
+                {"entity_id": "climate.floor_000001", "temperature": 24},
+                blocking=True,
+            )
+        assert cloud.requests["/api/thermostats"] == fetches
+
+        assert await hass.config_entries.async_unload(entry.entry_id)
+        await hass.async_block_till_done()
+
+
+async def test_set_temperatures_without_loaded_account(hass):
+    """Test a thermostat of an account that is not loaded is reported as such."""
+    assert await async_setup_component(hass, DOMAIN, {})
+    er.async_get(hass).async_get_or_create(
+        "climate", DOMAIN, "000000", suggested_object_id="floor_000000"
+    )
+
+    response = await hass.services.async_call(
+        DOMAIN,
+        "set_temperatures",
+        {"entity_id": "climate.floor_000000", "temperature": 24},
+        blocking=True,
+        return_response=True,
+    )
+
+    assert response == {
+        "thermostats": {
+            "climate.floor_000000": {
+                "success": False,
+                "error": "Not a loaded Schluter thermostat",
+            }
+        }
+    }
+
+
+async def test_bulk_write_supersedes_queued_command(hass):
+    """Test a command queued during an outage does not undo a later bulk write."""
+    async with FakeSchluterCloud() as cloud:
+        entry = await async_setup_integration(hass, FAKE_USERNAME, FAKE_PASSWORD)
+        coordinator = hass.data[DOMAIN][entry.entry_id].coordinator
+
+        cloud.config.error_rate = 1.0
+        await hass.services.async_call(
+            "climate",
+            "set_temperature",
+            {"entity_id": "climate.floor_000000", "temperature": 25},
+            blocking=True,
+        )
+        async_fire_time_changed(hass, dt_util.utcnow() + timedelta(seconds=2))
+        await hass.async_block_till_done(wait_background_tasks=True)
+        assert coordinator.commands.get("000000").temperature == 25
+
+        cloud.config.error_rate = 0.0
+        await hass.services.async_call(
+            DOMAIN,
+            "set_temperatures",
+            {"entity_id": "climate.floor_000000", "temperature": 20},
+            blocking=True,
+        )
+        await hass.async_block_till_done(wait_background_tasks=True)
+
+        assert not coordinator.commands
+        assert cloud.thermostats["000000"]["SetPointTemp"] == 2000
+
+        assert await hass.config_entries.async_unload(entry.entry_id)
+        await hass.async_block_till_done()
+
+
+async def test_profile(hass, tmp_path):
+    """Test the profile is written after the requested refreshes."""
+    hass.config.config_dir = str(tmp_path)
+    async with FakeSchluterCloud():
+        entry = await async_setup_integration(hass, FAKE_USERNAME, FAKE_PASSWORD)
+        coordinator = hass.data[DOMAIN][entry.entry_id].coordinator
+
+        response = await hass.services.async_call(
+            DOMAIN, "profile", {"cycles": 2}, blocking=True, return_response=True
+        )
+        with pytest.raises(HomeAssistantError):
+            await hass.services.async_call(DOMAIN, "profile", blocking=True)
+
+        await coordinator.async_refresh()
+        await coordinator.async_refresh()
+        await hass.async_block_till_done()
+
+        summary = (tmp_path / response["summary"]).read_text(encoding="utf-8")
+        assert "_async_update_data" in summary
+        assert "Poll phases" in summary
+        assert (tmp_path / response["profile"]).stat().st_size
+
+        assert await hass.config_entries.async_unload(entry.entry_id)
+        await hass.async_block_till_done()
+
+
+async def test_profile_covers_state_writes(hass, tmp_path):
+    """Test the state writes of the last profiled refresh are profiled."""
+    hass.config.config_dir = str(tmp_path)
+    async with FakeSchluterCloud() as cloud:
+        entry = await async_setup_integration(hass, FAKE_USERNAME, FAKE_PASSWORD)
+        coordinator = hass.data[DOMAIN][entry.entry_id].coordinator
+
+        response = await hass.services.async_call(
+            DOMAIN, "profile", {"cycles": 1}, blocking=True, return_response=True
+        )
+        cloud.thermostats["000000"]["SetPointTemp"] = 2300
+        await coordinator.async_refresh()
+        await hass.async_block_till_done()
+
+        stats = pstats.Stats(str(tmp_path / response["profile"]))
+        assert any(
+            function == "async_write_ha_state"
+            for _, _, function in stats.stats
+        )
+
+        assert await hass.config_entries.async_unload(entry.entry_id)
+        await hass.async_block_till_done()
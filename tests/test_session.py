@@ -0,0 +1,88 @@
+"""Test the Schluter session handling."""
+import asyncio
+from datetime import timedelta
+from unittest.mock import AsyncMock, MagicMock
+
+from homeassistant.util import dt as dt_util
+
+from custom_components.schluter.metrics import SchluterMetrics
+from custom_components.schluter.session import (
+    SchluterSession,
+    async_get_session_store,
+)
+
+
+def _session(hass, api):
+    return SchluterSession(hass, api, SchluterMetrics(), "user@example.com", "secret")
+
+
+def _mock_api():
+    api = MagicMock()
+    api.async_get_sessionid = AsyncMock(side_effect=["first", "second", "third"])
+    return api
+
+
+async def test_concurrent_callers_share_one_login(hass):
+    """Test concurrent callers wait for the same login."""
+    login = asyncio.Event()
+
+    async def _slow_login(username, password):
+        await login.wait()
+        return "first"
+
+    api = MagicMock()
+    api.async_get_sessionid = AsyncMock(side_effect=_slow_login)
+    session = _session(hass, api)
+
+    callers = asyncio.gather(
+        session.async_get_sessionid(),
+        session.async_get_sessionid(),
+        session.async_renew(),
+    )
+    await asyncio.sleep(0)
+    login.set()
+
+    assert await callers == ["first", "first", "first"]
+    api.async_get_sessionid.assert_awaited_once()
+    session.async_shutdown()
+
+
+async def test_rejected_session_is_renewed_once(hass):
+    """Test a rejected session ID already replaced is not renewed again."""
+    api = _mock_api()
+    session = _session(hass, api)
+
+    rejected = await session.async_get_sessionid()
+    assert await session.async_renew(rejected) == "second"
+    assert await session.async_renew(rejected) == "second"
+    assert api.async_get_sessionid.await_count == 2
+    session.async_shutdown()
+
+
+async def test_cached_session_is_restored(hass):
+    """Test a cached session avoids a login after a restart."""
+    await async_get_session_store(hass).async_save(
+        "user@example.com", "cached", dt_util.utcnow()
+    )
+    api = _mock_api()
+    session = _session(hass, api)
+
+    await session.async_load()
+
+    assert await session.async_get_sessionid() == "cached"
+    api.async_get_sessionid.assert_not_awaited()
+    session.async_shutdown()
+
+
+async def test_expired_session_is_not_used(hass):
+    """Test an expired cached session triggers a login."""
+    await async_get_session_store(hass).async_save(
+        "user@example.com", "cached", dt_util.utcnow() - timedelta(days=2)
+    )
+    api = _mock_api()
+    session = _session(hass, api)
+
+    await session.async_load()
+
+    assert await session.async_get_sessionid() == "first"
+    session.async_shutdown()
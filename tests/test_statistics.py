@@ -0,0 +1,78 @@
+"""Test the import of hourly energy and cost statistics."""
+from datetime import UTC, datetime, timedelta
+from unittest.mock import MagicMock
+
+import pytest
+
+from homeassistant.components.recorder import get_instance
+from homeassistant.components.recorder.statistics import statistics_during_period
+from pytest_homeassistant_custom_component.components.recorder.common import (
+    async_wait_recording_done,
+)
+
+from custom_components.schluter.statistics import (
+    SchluterStatisticsImporter,
+    statistic_id,
+)
+
+
+@pytest.fixture(autouse=True)
+def auto_enable_custom_integrations(recorder_mock, enable_custom_integrations):
+    """Set up the recorder before the custom integrations are enabled."""
+    yield
+
+
+START = datetime(2024, 1, 1, 10, tzinfo=UTC)
+ENERGY = statistic_id("energy", "000000")
+COST = statistic_id("cost", "000000")
+
+
+def _data():
+    thermostat = MagicMock(is_online=True, power=800, kwh_charge=0.1)
+    thermostat.name = "Floor"
+    return {"000000": thermostat}
+
+
+async def _async_get_sums(hass, statistic):
+    stats = await get_instance(hass).async_add_executor_job(
+        statistics_during_period, hass, START, None, {statistic}, "hour", None, {"sum"}
+    )
+    return [row["sum"] for row in stats.get(statistic, [])]
+
+
+async def test_completed_hours_are_imported(hass):
+    """Test buffered hours are imported with a running sum."""
+    importer = SchluterStatisticsImporter(hass, "entry")
+    for minute in range(0, 125, 5):
+        importer.async_add(_data(), START + timedelta(minutes=minute))
+
+    assert importer.has_completed_hours(START + timedelta(hours=2))
+    await importer.async_import(START + timedelta(hours=2))
+    await async_wait_recording_done(hass)
+
+    assert await _async_get_sums(hass, ENERGY) == pytest.approx(
+        [800 * 55 / 60 / 1000, 800 * 115 / 60 / 1000]
+    )
+    assert await _async_get_sums(hass, COST) == pytest.approx(
+        [80 * 55 / 60 / 1000, 80 * 115 / 60 / 1000]
+    )
+    assert not importer.has_completed_hours(START + timedelta(hours=2))
+
+
+async def test_import_continues_the_recorded_sum(hass):
+    """Test a new importer continues from the sum in the recorder."""
+    importer = SchluterStatisticsImporter(hass, "entry")
+    for minute in range(0, 65, 5):
+        importer.async_add(_data(), START + timedelta(minutes=minute))
+    await importer.async_import(START + timedelta(hours=1))
+    await async_wait_recording_done(hass)
+
+    importer = SchluterStatisticsImporter(hass, "entry")
+    for minute in range(120, 185, 5):
+        importer.async_add(_data(), START + timedelta(minutes=minute))
+    await importer.async_import(START + timedelta(hours=3))
+    await async_wait_recording_done(hass)
+
+    assert await _async_get_sums(hass, ENERGY) == pytest.approx(
+        [800 * 55 / 60 / 1000, 800 * 110 / 60 / 1000]
+    )
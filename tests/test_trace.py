@@ -0,0 +1,116 @@
+"""Test recording Schluter API traffic and replaying it offline."""
+from datetime import timedelta
+import json
+import time
+
+from aiohttp import ClientResponseError, RequestInfo
+from multidict import CIMultiDict, CIMultiDictProxy
+import pytest
+from yarl import URL
+
+from homeassistant.util import dt as dt_util
+from pytest_homeassistant_custom_component.common import async_fire_time_changed
+
+from custom_components.schluter.const import DOMAIN
+from custom_components.schluter.trace import SchluterTraceRecorder
+
+from . import async_setup_integration
+from .fake_schluter import (
+    FAKE_PASSWORD,
+    FAKE_USERNAME,
+    FakeSchluterCloud,
+    FakeSchluterConfig,
+)
+from .replay import async_replay_trace, load_trace
+
+
+@pytest.mark.usefixtures("socket_enabled")
+async def test_record_and_replay(hass, tmp_path):
+    """Test a recorded trace is redacted and reproduces the states."""
+    hass.config.config_dir = str(tmp_path)
+
+    async with FakeSchluterCloud(FakeSchluterConfig(thermostats=2)) as cloud:
+        entry = await async_setup_integration(hass, FAKE_USERNAME, FAKE_PASSWORD)
+        coordinator = hass.data[DOMAIN][entry.entry_id].coordinator
+
+        response = await hass.services.async_call(
+            DOMAIN,
+            "record_trace",
+            {"duration": 60},
+            blocking=True,
+            return_response=True,
+        )
+        path = response["path"]
+
+        cloud.expire_sessions()
+        cloud.thermostats["000001"]["Temperature"] = 1900
+        await coordinator.async_refresh()
+        await hass.services.async_call(
+            DOMAIN,
+            "set_temperatures",
+            {"entity_id": "climate.floor_000000", "temperature": 25},
+            blocking=True,
+        )
+
+        async_fire_time_changed(hass, dt_util.utcnow() + timedelta(seconds=61))
+        await hass.async_block_till_done(wait_background_tasks=True)
+        # The replay sets up a new entry, only the thermostat entities keep
+        # their entity IDs
+        recorded = {
+            entity_id: hass.states.get(entity_id).state
+            for entity_id in hass.states.async_entity_ids()
+            if "floor_" in entity_id
+        }
+
+        assert await hass.config_entries.async_unload(entry.entry_id)
+        await hass.async_block_till_done()
+
+    with open(path, encoding="utf-8") as file:
+        trace = file.read()
+    assert FAKE_USERNAME not in trace
+    assert FAKE_PASSWORD not in trace
+    assert not any(sessionid in trace for sessionid in cloud.sessions)
+    (records,) = load_trace(path).values()
+    assert [record["call"] for record in records] == [
+        "thermostats",
+        "login",
+        "thermostats",
+        "set_temperature",
+        "thermostats",
+    ]
+    assert records[0]["error"] == "InvalidSessionIdError"
+
+    entry, result = await async_replay_trace(hass, path, speed=0)
+    assert result.refreshes == 1
+    assert result.writes == 1
+    replayed = {
+        entity_id: hass.states.get(entity_id).state
+        for entity_id in hass.states.async_entity_ids()
+        if "floor_" in entity_id
+    }
+    assert replayed == recorded
+
+    assert await hass.config_entries.async_unload(entry.entry_id)
+    await hass.async_block_till_done()
+
+
+async def test_errors_are_redacted(hass, tmp_path):
+    """Test the session ID quoted by an HTTP error is not recorded."""
+    url = URL("https://example.com/api/thermostats?sessionId=secret-session")
+    error = ClientResponseError(
+        RequestInfo(url, "GET", CIMultiDictProxy(CIMultiDict()), url),
+        (),
+        status=500,
+        message="Internal Server Error",
+    )
+    assert "secret-session" in str(error)
+    recorder = SchluterTraceRecorder(str(tmp_path / "trace.jsonl"))
+
+    recorder.record("account", "thermostats", time.monotonic(), error=error)
+    await recorder.async_save(hass)
+
+    trace = (tmp_path / "trace.jsonl").read_text(encoding="utf-8")
+    assert "secret-session" not in trace
+    (record,) = (json.loads(line) for line in trace.splitlines())
+    assert record["error"] == "ClientResponseError"
+    assert record["status"] == 500
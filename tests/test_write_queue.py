@@ -0,0 +1,138 @@
+"""Test the coalescing thermostat write queue."""
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+from aioschluter import ApiError, InvalidUserPasswordError
+from aioschluter.const import REGULATION_MODE_MANUAL, REGULATION_MODE_SCHEDULE
+import pytest
+
+from homeassistant.exceptions import ConfigEntryAuthFailed
+from homeassistant.helpers.update_coordinator import UpdateFailed
+
+from custom_components.schluter.commands import SchluterCommandStore
+from custom_components.schluter.metrics import SchluterMetrics
+from custom_components.schluter.resilience import (
+    SchluterRateLimit,
+    SchluterResilience,
+)
+from custom_components.schluter.write_queue import SchluterWriteQueue
+
+
+def _mock_queue(hass):
+    api = MagicMock()
+    api.async_set_temperature = AsyncMock(return_value=True)
+    api.async_set_regulation_mode = AsyncMock(return_value=True)
+    coordinator = MagicMock()
+    coordinator.async_request_refresh = AsyncMock()
+    coordinator.metrics = SchluterMetrics()
+    coordinator.commands = SchluterCommandStore(hass, "entry")
+    coordinator.resilience = SchluterResilience(SchluterRateLimit())
+    coordinator.session.async_get_sessionid = AsyncMock(return_value="session")
+    return api, coordinator, SchluterWriteQueue(hass, api, coordinator, "1234", 0)
+
+
+async def test_burst_is_merged_into_one_write(hass):
+    """Test only the last set-point of a burst is written."""
+    api, coordinator, queue = _mock_queue(hass)
+
+    await asyncio.gather(
+        queue.async_set_temperature(20.0),
+        queue.async_set_temperature(20.5),
+        queue.async_set_temperature(21.0),
+    )
+
+    api.async_set_temperature.assert_awaited_once_with("session", "1234", 21.0)
+    api.async_set_regulation_mode.assert_not_awaited()
+    coordinator.async_request_refresh.assert_awaited_once()
+
+
+async def test_mode_before_temperature_is_superseded(hass):
+    """Test a set-point written after a mode change implies manual mode."""
+    api, _, queue = _mock_queue(hass)
+
+    await asyncio.gather(
+        queue.async_set_regulation_mode(REGULATION_MODE_MANUAL),
+        queue.async_set_temperature(22.0),
+    )
+
+    api.async_set_temperature.assert_awaited_once_with("session", "1234", 22.0)
+    api.async_set_regulation_mode.assert_not_awaited()
+
+
+async def test_mode_after_temperature_is_written(hass):
+    """Test a schedule request after a set-point is sent in the same flush."""
+    api, coordinator, queue = _mock_queue(hass)
+
+    await asyncio.gather(
+        queue.async_set_temperature(22.0),
+        queue.async_set_regulation_mode(REGULATION_MODE_SCHEDULE),
+    )
+
+    api.async_set_temperature.assert_awaited_once()
+    api.async_set_regulation_mode.assert_awaited_once_with(
+        "session", "1234", REGULATION_MODE_SCHEDULE
+    )
+    coordinator.async_request_refresh.assert_awaited_once()
+
+
+async def test_errors_reach_every_caller(hass):
+    """Test a rejected flush is raised to all merged callers."""
+    api, coordinator, queue = _mock_queue(hass)
+    api.async_set_temperature.side_effect = InvalidUserPasswordError("rejected")
+
+    results = await asyncio.gather(
+        queue.async_set_temperature(20.0),
+        queue.async_set_temperature(21.0),
+        return_exceptions=True,
+    )
+
+    assert all(isinstance(result, ConfigEntryAuthFailed) for result in results)
+    assert not coordinator.commands
+    coordinator.async_request_refresh.assert_not_awaited()
+
+
+async def test_unreachable_cloud_queues_the_command(hass):
+    """Test a command is kept while the cloud fails and merged into the next."""
+    api, coordinator, queue = _mock_queue(hass)
+    api.async_set_temperature.side_effect = ApiError("Invalid Response: 500")
+
+    await asyncio.gather(
+        queue.async_set_temperature(20.0),
+        queue.async_set_temperature(21.0),
+    )
+
+    assert coordinator.commands.get("1234").temperature == 21.0
+    coordinator.async_request_refresh.assert_not_awaited()
+
+    api.async_set_temperature.side_effect = None
+    await queue.async_set_regulation_mode(REGULATION_MODE_SCHEDULE)
+
+    api.async_set_temperature.assert_awaited_with("session", "1234", 21.0)
+    api.async_set_regulation_mode.assert_awaited_once_with(
+        "session", "1234", REGULATION_MODE_SCHEDULE
+    )
+    assert not coordinator.commands
+    coordinator.async_request_refresh.assert_awaited_once()
+
+
+async def test_rejected_command_is_not_queued(hass):
+    """Test a write the cloud answered with a client error reaches the callers."""
+    api, coordinator, queue = _mock_queue(hass)
+    api.async_set_temperature.side_effect = ApiError("Invalid Response: 400")
+
+    with pytest.raises(UpdateFailed):
+        await queue.async_set_temperature(20.0)
+
+    assert not coordinator.commands
+    coordinator.async_request_refresh.assert_not_awaited()
+
+
+@pytest.mark.parametrize("calls", [1, 3])
+async def test_sequential_flushes(hass, calls):
+    """Test writes awaited one after another are flushed separately."""
+    api, _, queue = _mock_queue(hass)
+
+    for step in range(calls):
+        await queue.async_set_temperature(20.0 + step)
+
+    assert api.async_set_temperature.await_count == calls